@@ -9,6 +9,12 @@ from ..extensions import db
 from app.auth.decorators import token_required, role_required, kyc_required, otp_required
 from app.services.analytics_service import AnalyticsService
 from app.services.kyc_service import KYCService
+from app.services.user_search import UserSearch
+from app.pagination import paginate
+from app.serializers import (
+    TransactionRowSerializer, AuditLogRowSerializer, KYCVerificationSerializer, UserSerializer, WalletSerializer,
+    parse_fields
+)
 
 admin_bp = Blueprint('admin', __name__, url_prefix='/api/v1/admin')
 
@@ -34,33 +40,35 @@ def get_all_users(current_user):
     if kyc_status:
         query = query.filter_by(kyc_status=KYCStatus(kyc_status))
     
-    # Search
+    # Search, ranked by closeness of match unless an order is asked for
     search = request.args.get('search')
     if search:
-        query = query.filter(
-            (User.email.ilike(f'%{search}%')) |
-            (User.username.ilike(f'%{search}%')) |
-            (User.phone_number.ilike(f'%{search}%')) |
-            (User.first_name.ilike(f'%{search}%')) |
-            (User.last_name.ilike(f'%{search}%'))
-        )
+        query = UserSearch.filter(query, search)
     
     # Order by
-    order_by = request.args.get('order_by', 'created_at')
+    order_by = request.args.get('order_by', 'relevance' if search else 'created_at')
     order_dir = request.args.get('order_dir', 'desc')
     
-    if order_by == 'created_at':
+    if order_by == 'relevance' and search:
+        query = query.order_by(*UserSearch.ranking(search))
+    elif order_by == 'created_at':
         query = query.order_by(desc(User.created_at) if order_dir == 'desc' else User.created_at)
     elif order_by == 'last_login':
         query = query.order_by(desc(User.last_login_at) if order_dir == 'desc' else User.last_login_at)
     
-    pagination = query.paginate(page=page, per_page=per_page, error_out=False)
+    serializer = UserSerializer(
+        include_wallet=True,
+        include_kyc=True,
+        include_accounts=request.args.get('include_accounts', False, type=lambda v: v.lower() == 'true')
+    )
+    try:
+        pagination = paginate(serializer.apply(query), page, per_page, request.args.get('count', 'exact'))
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
     
     return jsonify({
-        'users': [user.to_dict(include_wallet=True, include_kyc=True) for user in pagination.items],
-        'total': pagination.total,
-        'pages': pagination.pages,
-        'current_page': page
+        'users': serializer.dump_many(pagination.items),
+        **pagination.to_dict()
     }), 200
 
 # Toggle user status
@@ -119,25 +127,17 @@ def get_all_wallets(current_user):
     # Search by user
     search = request.args.get('search')
     if search:
-        query = query.filter(
-            (User.email.ilike(f'%{search}%')) |
-            (User.username.ilike(f'%{search}%')) |
-            (User.phone_number.ilike(f'%{search}%'))
-        )
+        query = UserSearch.search(query, search)
     
-    pagination = query.paginate(page=page, per_page=per_page, error_out=False)
-    
-    wallets_data = []
-    for wallet in pagination.items:
-        wallet_dict = wallet.to_dict()
-        wallet_dict['user'] = wallet.user.to_dict()
-        wallets_data.append(wallet_dict)
+    try:
+        serializer = WalletSerializer(include_user=True, fields=parse_fields(request.args.get('fields')))
+        pagination = paginate(serializer.apply(query), page, per_page, request.args.get('count', 'exact'))
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
     
     return jsonify({
-        'wallets': wallets_data,
-        'total': pagination.total,
-        'pages': pagination.pages,
-        'current_page': page
+        'wallets': serializer.dump_many(pagination.items),
+        **pagination.to_dict()
     }), 200
 
 # Update wallet status
@@ -212,13 +212,15 @@ def get_all_transactions(current_user):
     # Order by
     query = query.order_by(desc(Transaction.created_at))
     
-    pagination = query.paginate(page=page, per_page=per_page, error_out=False)
+    try:
+        serializer = TransactionRowSerializer(include_wallets=True, fields=parse_fields(request.args.get('fields')))
+        pagination = paginate(serializer.apply(query), page, per_page, request.args.get('count', 'exact'))
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
     
     return jsonify({
-        'transactions': [tx.to_dict(include_wallets=True) for tx in pagination.items],
-        'total': pagination.total,
-        'pages': pagination.pages,
-        'current_page': page
+        'transactions': serializer.dump_many(pagination.items),
+        **pagination.to_dict()
     }), 200
 
 # Get system statistics
@@ -226,9 +228,18 @@ def get_all_transactions(current_user):
 @token_required
 @role_required('admin')
 def get_system_stats(current_user):
-    stats = AnalyticsService.get_system_analytics()
+    from app.services.analytics_snapshot import AnalyticsSnapshot
+    stats = AnalyticsSnapshot.get()
     return jsonify(stats), 200
 
+# Get FX rate freshness metrics
+@admin_bp.route('/fx/metrics', methods=['GET'])
+@token_required
+@role_required('admin')
+def get_fx_metrics(current_user):
+    from app.services.fx_refresher import FXRateRefresher
+    return jsonify(FXRateRefresher.get_metrics()), 200
+
 # Reverse transaction
 @admin_bp.route('/transactions/<int:tx_id>/reverse', methods=['POST'])
 @token_required
@@ -294,6 +305,25 @@ def reverse_transaction(tx_id, current_user):
         db.session.rollback()
         return jsonify({'message': f'Failed to reverse transaction: {str(e)}'}), 500
 
+# Approve or reject a transfer held by the risk engine
+@admin_bp.route('/holds/<hold_id>/review', methods=['POST'])
+@token_required
+@role_required('admin')
+def review_risk_hold(current_user, hold_id):
+    from app.services.transfer_service import TransferService
+    
+    data = request.get_json() or {}
+    action = data.get('action')
+    if action not in ('approve', 'reject'):
+        return jsonify({'message': "action must be 'approve' or 'reject'"}), 400
+    
+    result = TransferService.review_risk_hold(hold_id, current_user.id, action == 'approve', reason=data.get('reason'))
+    if not result['success']:
+        status_code = 404 if result['message'] == 'Hold not found' else 400
+        return jsonify({'message': result['message']}), status_code
+    
+    return jsonify(result), 200
+
 # Get suspicious activities
 @admin_bp.route('/suspicious-activities', methods=['GET'])
 @token_required
@@ -312,19 +342,15 @@ def get_pending_kyc(current_user):
     
     query = KYCVerification.query.filter_by(status=KYCStatus.pending).join(User, KYCVerification.user_id == User.id)
     
-    pagination = query.paginate(page=page, per_page=per_page, error_out=False)
-    
-    kyc_list = []
-    for kyc in pagination.items:
-        kyc_dict = kyc.to_dict()
-        kyc_dict['user'] = kyc.user.to_dict()
-        kyc_list.append(kyc_dict)
+    serializer = KYCVerificationSerializer(include_user=True)
+    try:
+        pagination = paginate(serializer.apply(query), page, per_page, request.args.get('count', 'exact'))
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
     
     return jsonify({
-        'kyc_verifications': kyc_list,
-        'total': pagination.total,
-        'pages': pagination.pages,
-        'current_page': page
+        'kyc_verifications': serializer.dump_many(pagination.items),
+        **pagination.to_dict()
     }), 200
 
 # Verify KYC
@@ -355,6 +381,52 @@ def get_profit_trends(current_user):
     trends = AnalyticsService.get_profit_trends(days)
     return jsonify(trends), 200
 
+# Get corridor analytics
+@admin_bp.route('/analytics/corridors', methods=['GET'])
+@token_required
+@role_required('admin')
+def get_corridor_analytics(current_user):
+    days = request.args.get('days', 30, type=int)
+    source_country = request.args.get('source_country')
+    destination_country = request.args.get('destination_country')
+    by_day = request.args.get('by_day', False, type=lambda v: v.lower() == 'true')
+    
+    corridors = AnalyticsService.get_corridor_analytics(
+        days,
+        source_country=source_country.upper() if source_country else None,
+        destination_country=destination_country.upper() if destination_country else None,
+        by_day=by_day
+    )
+    return jsonify(corridors), 200
+
+# Export transactions or ledger entries as a Parquet or Arrow file
+@admin_bp.route('/exports/<table>', methods=['GET'])
+@token_required
+@role_required('admin')
+def export_table(current_user, table):
+    from flask import Response, stream_with_context
+    from app.services.columnar_export import ColumnarExport, EXPORT_MODELS, EXPORT_FORMATS
+    
+    file_format = request.args.get('format', 'arrow')
+    if table not in EXPORT_MODELS:
+        return jsonify({'message': f'Unknown export table: {table}'}), 404
+    if file_format not in EXPORT_FORMATS:
+        return jsonify({'message': f'Unknown export format: {file_format}'}), 400
+    
+    # Rows above since_id, up to the highest id old enough to be committed;
+    # clients pass the returned watermark as since_id on their next pull
+    since_id = request.args.get('since_id', 0, type=int)
+    upto_id = max(ColumnarExport.upper_bound(table), since_id)
+    extension, content_type = EXPORT_FORMATS[file_format]
+    
+    response = Response(
+        stream_with_context(ColumnarExport.stream(table, file_format, since_id, upto_id)),
+        mimetype=content_type
+    )
+    response.headers['Content-Disposition'] = f'attachment; filename={table}-{since_id + 1}-{upto_id}.{extension}'
+    response.headers['X-Export-Watermark'] = str(upto_id)
+    return response
+
 # Get audit logs
 @admin_bp.route('/audit-logs', methods=['GET'])
 @token_required
@@ -395,11 +467,13 @@ def get_audit_logs(current_user):
     # Order by
     query = query.order_by(desc(AuditLog.created_at))
     
-    pagination = query.paginate(page=page, per_page=per_page, error_out=False)
+    try:
+        serializer = AuditLogRowSerializer(fields=parse_fields(request.args.get('fields')))
+        pagination = paginate(serializer.apply(query), page, per_page, request.args.get('count', 'exact'))
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
     
     return jsonify({
-        'audit_logs': [log.to_dict() for log in pagination.items],
-        'total': pagination.total,
-        'pages': pagination.pages,
-        'current_page': page
+        'audit_logs': serializer.dump_many(pagination.items),
+        **pagination.to_dict()
     }), 200
\ No newline at end of file
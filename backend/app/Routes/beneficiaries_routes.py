@@ -2,6 +2,7 @@ from flask import Blueprint, request, jsonify
 from ..extensions import db
 from app.models import Beneficiary, User, Wallet
 from ..auth.decorators import token_required, kyc_required, otp_required
+from ..services.beneficiary_search import BeneficiarySearch
 
 beneficiaries_bp = Blueprint('beneficiaries', __name__, url_prefix='/api/beneficiaries')
 
@@ -171,35 +172,8 @@ def search_users(current_user):
     if len(query) < 3:
         return jsonify({'message': 'Search query must be at least 3 characters'}), 400
     
-    # Search by phone, email, username, or name
-    users = User.query.filter(
-        User.is_active == True,
-        User.id != user.id,
-        (
-            (User.phone_number.ilike(f'%{query}%')) |
-            (User.email.ilike(f'%{query}%')) |
-            (User.username.ilike(f'%{query}%')) |
-            (User.first_name.ilike(f'%{query}%')) |
-            (User.last_name.ilike(f'%{query}%'))
-        )
-    ).limit(20).all()
-    
-    result = []
-    for user_result in users:
-        wallet = Wallet.query.filter_by(user_id=user_result.id).first()
-        if wallet:
-            result.append({
-                'user_id': user_result.id,
-                'username': user_result.username,
-                'email': user_result.email,
-                'phone_number': user_result.phone_number,
-                'full_name': user_result.get_full_name(),
-                'wallet_id': wallet.id,
-                'is_already_beneficiary': Beneficiary.query.filter_by(
-                    user_id=user.id,
-                    beneficiary_wallet_id=wallet.id
-                ).first() is not None
-            })
+    # Search by phone, email, username, or name, best matches first
+    result = BeneficiarySearch.search(user.id, query)
     
     return jsonify({
         'users': result,
@@ -63,7 +63,7 @@ def mpesa_withdraw():
     except:
         return jsonify({'message': 'Invalid amount'}), 400
     
-    wallet = Wallet.query.filter_by(user_id=user.id).first()
+    wallet = user.wallet
     if not wallet:
         return jsonify({'message': 'Wallet not found'}), 404
     
@@ -227,7 +227,7 @@ def bank_withdraw():
     if not payment_method:
         return jsonify({'message': 'Bank account not found or not verified'}), 404
     
-    wallet = Wallet.query.filter_by(user_id=user.id).first()
+    wallet = user.wallet
     if not wallet:
         return jsonify({'message': 'Wallet not found'}), 404
     
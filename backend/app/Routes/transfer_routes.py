@@ -11,12 +11,14 @@ from ..services.currency_service import CurrencyService
 from ..services.compliance_service import ComplianceService
 from ..services.otp_services import OTPService
 from ..services.notification_service import NotificationService
+from ..serializers import TransactionRowSerializer, parse_fields
+from ..pagination import paginate
 
 transfer_bp = Blueprint('transfers', __name__, url_prefix='/api/v1/transfers')
 
 @transfer_bp.route('/local/quote', methods=['POST'])
 @token_required
-def get_local_transfer_quote():
+def get_local_transfer_quote(current_user):
     data = request.get_json()
     
     amount = data.get('amount')
@@ -28,7 +30,7 @@ def get_local_transfer_quote():
         return jsonify({'message': 'Amount and receiver required'}), 400
     
     user = request.current_user
-    sender_wallet = Wallet.query.filter_by(user_id=user.id).first()
+    sender_wallet = user.wallet
     
     if not sender_wallet:
         return jsonify({'message': 'Sender wallet not found'}), 404
@@ -55,7 +57,7 @@ def get_local_transfer_quote():
 
 @transfer_bp.route('/local/initiate', methods=['POST'])
 @token_required
-def initiate_local_transfer():
+def initiate_local_transfer(current_user):
     data = request.get_json()
     
     amount = data.get('amount')
@@ -64,12 +66,25 @@ def initiate_local_transfer():
     receiver_phone = data.get('receiver_phone')
     description = data.get('description')
     beneficiary_id = data.get('beneficiary_id')
+    quote_id = data.get('quote_id')
+    
+    user = request.current_user
+    
+    # A quote already carries the receiver, rate and fee
+    if quote_id:
+        result = TransferService.initiate_local_transfer(
+            sender_user_id=user.id,
+            quote_id=quote_id,
+            description=description,
+            channel=request.headers.get('X-Channel', 'api'),
+            ip_address=request.remote_addr,
+            device_id=request.headers.get('X-Device-ID')
+        )
+        return jsonify(result), 200 if result['success'] else 400
     
     if not amount or (not receiver_wallet_id and not receiver_phone and not beneficiary_id):
         return jsonify({'message': 'Amount and receiver required'}), 400
     
-    user = request.current_user
-    
     if beneficiary_id:
         beneficiary = Beneficiary.query.filter_by(
             id=beneficiary_id,
@@ -91,7 +106,10 @@ def initiate_local_transfer():
         currency=currency,
         receiver_wallet_id=receiver_wallet_id,
         receiver_phone=receiver_phone,
-        description=description
+        description=description,
+        channel=request.headers.get('X-Channel', 'api'),
+        ip_address=request.remote_addr,
+        device_id=request.headers.get('X-Device-ID')
     )
     
     if result['success']:
@@ -101,7 +119,7 @@ def initiate_local_transfer():
 
 @transfer_bp.route('/international/quote', methods=['POST'])
 @token_required
-def get_international_transfer_quote():
+def get_international_transfer_quote(current_user):
     data = request.get_json()
     
     amount = data.get('amount')
@@ -138,7 +156,7 @@ def get_international_transfer_quote():
 
 @transfer_bp.route('/international/initiate', methods=['POST'])
 @token_required
-def initiate_international_transfer():
+def initiate_international_transfer(current_user):
     data = request.get_json()
     
     quote_id = data.get('quote_id')
@@ -236,9 +254,9 @@ def cancel_transfer(transaction_id):
 
 @transfer_bp.route('/history', methods=['GET'])
 @token_required
-def get_transfer_history():
+def get_transfer_history(current_user):
     user = request.current_user
-    wallet = Wallet.query.filter_by(user_id=user.id).first()
+    wallet = user.wallet
     
     if not wallet:
         return jsonify({'transactions': [], 'total': 0}), 200
@@ -269,13 +287,15 @@ def get_transfer_history():
     
     query = query.order_by(Transaction.created_at.desc())
     
-    pagination = query.paginate(page=page, per_page=per_page, error_out=False)
+    try:
+        serializer = TransactionRowSerializer(include_wallets=True, fields=parse_fields(request.args.get('fields')))
+        pagination = paginate(serializer.apply(query), page, per_page, request.args.get('count', 'exact'))
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
     
     return jsonify({
-        'transactions': [tx.to_dict(include_wallets=True) for tx in pagination.items],
-        'total': pagination.total,
-        'pages': pagination.pages,
-        'current_page': page
+        'transactions': serializer.dump_many(pagination.items),
+        **pagination.to_dict()
     }), 200
 
 @transfer_bp.route('/summary', methods=['GET'])
@@ -321,4 +341,67 @@ def convert_currency():
         'to_currency': to_currency,
         'exchange_rate': float(exchange_rate),
         'timestamp': datetime.now(timezone.utc).isoformat()
+    }), 200
+
+@transfer_bp.route('/currencies/convert/batch', methods=['POST'])
+@token_required
+def convert_currency_batch(current_user):
+    data = request.get_json() or {}
+    conversions = data.get('conversions')
+    
+    if not isinstance(conversions, list) or not conversions:
+        return jsonify({'message': 'conversions list required'}), 400
+    
+    max_items = current_app.config.get('FX_BATCH_MAX_ITEMS', 10000)
+    if len(conversions) > max_items:
+        return jsonify({'message': f'At most {max_items} conversions per request'}), 400
+    
+    supported = set(CurrencyService.get_supported_currencies())
+    amounts, from_currencies, to_currencies = [], [], []
+    for index, conversion in enumerate(conversions):
+        if not isinstance(conversion, dict):
+            return jsonify({'message': f'Invalid conversion at index {index}'}), 400
+        
+        from_currency = conversion.get('from_currency')
+        to_currency = conversion.get('to_currency')
+        if not from_currency or not to_currency:
+            return jsonify({'message': f'from_currency and to_currency required at index {index}'}), 400
+        
+        if not isinstance(from_currency, str) or not isinstance(to_currency, str):
+            return jsonify({'message': f'Invalid currency at index {index}'}), 400
+        
+        from_currency, to_currency = from_currency.upper(), to_currency.upper()
+        if from_currency not in supported or to_currency not in supported:
+            return jsonify({'message': f'Unsupported currency at index {index}'}), 400
+        
+        try:
+            amount_decimal = Decimal(str(conversion.get('amount')))
+            if not amount_decimal.is_finite() or amount_decimal <= 0:
+                return jsonify({'message': f'Amount must be positive at index {index}'}), 400
+        except Exception:
+            return jsonify({'message': f'Invalid amount at index {index}'}), 400
+        
+        amounts.append(amount_decimal)
+        from_currencies.append(from_currency)
+        to_currencies.append(to_currency)
+    
+    try:
+        converted_amounts, rates = CurrencyService.convert_batch(amounts, from_currencies, to_currencies)
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
+    
+    return jsonify({
+        'conversions': [
+            {
+                'from_amount': float(amount),
+                'from_currency': from_currency,
+                'to_amount': float(converted_amount),
+                'to_currency': to_currency,
+                'exchange_rate': float(rates[(from_currency, to_currency)])
+            }
+            for amount, from_currency, to_currency, converted_amount
+            in zip(amounts, from_currencies, to_currencies, converted_amounts)
+        ],
+        'count': len(converted_amounts),
+        'timestamp': datetime.now(timezone.utc).isoformat()
     }), 200
\ No newline at end of file
@@ -6,6 +6,7 @@ from ..models import User, KYCVerification, PaymentMethod, AuditLog
 from ..models.enums import KYCStatus, PaymentProvider
 from ..auth.decorators import token_required , kyc_required, otp_required
 from ..services.kyc_service import KYCService
+from ..serializers import parse_fields
 from werkzeug.security import generate_password_hash
 
 user_bp = Blueprint('user', __name__, url_prefix='/api/v1/user')
@@ -18,7 +19,7 @@ PHONE_REGEX = r'^\+?[1-9]\d{1,14}$'  # E.164 format
 @token_required
 def get_user_profile(current_user):
     user = current_user
-    return jsonify(user.to_dict(include_wallet=True, include_kyc=True)), 200
+    return jsonify(user.to_dict(include_wallet=True, include_kyc=True, include_wallet_usage=True)), 200
 
 # Update user profile
 @user_bp.route('/profile', methods=['PUT'])
@@ -354,11 +355,16 @@ def get_transaction_history(current_user):
     per_page = request.args.get('per_page', 20, type=int)
     transaction_type = request.args.get('type')
     
-    result = TransactionService.get_user_transactions(
-        user_id=user.id,
-        page=page,
-        per_page=per_page,
-        transaction_type=transaction_type
-    )
+    try:
+        result = TransactionService.get_user_transactions(
+            user_id=user.id,
+            page=page,
+            per_page=per_page,
+            transaction_type=transaction_type,
+            fields=parse_fields(request.args.get('fields')),
+            count=request.args.get('count', 'exact')
+        )
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
     
     return jsonify(result), 200
\ No newline at end of file
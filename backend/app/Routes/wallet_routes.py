@@ -17,7 +17,7 @@ wallet_bp = Blueprint('wallet', __name__, url_prefix='/api/v1/wallet')
 def wallet_summary(current_user):
     """Get wallet summary"""
     try:
-        wallet = Wallet.query.filter_by(user_id=current_user.id).first()
+        wallet = current_user.wallet
         if not wallet:
             wallet = Wallet(user_id=current_user.id)
             db.session.add(wallet)
@@ -141,7 +141,10 @@ def transfer_funds(current_user):
         sender_user_id=current_user.id,
         receiver_wallet_id=receiver_wallet.id,
         amount=amount,
-        description=description or f"Transfer to {receiver_phone}"
+        description=description or f"Transfer to {receiver_phone}",
+        channel=request.headers.get('X-Channel', 'api'),
+        ip_address=request.remote_addr,
+        device_id=request.headers.get('X-Device-ID')
     )
     
     if result['success']:
@@ -179,7 +182,7 @@ def withdraw_funds(current_user):
         return jsonify({'message': 'Payment method not found'}), 404
     
     # Get wallet
-    wallet = Wallet.query.filter_by(user_id=current_user.id).first()
+    wallet = current_user.wallet
     if not wallet:
         return jsonify({'message': 'Wallet not found'}), 404
     
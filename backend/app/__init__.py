@@ -11,6 +11,9 @@ import os
 def create_app(config_name='default'):
     app = Flask(__name__)
     
+    from .json_provider import OrjsonProvider
+    app.json = OrjsonProvider(app)
+    
     app.config.from_object(config[config_name])
     
     db.init_app(app)
@@ -44,6 +47,12 @@ def create_app(config_name='default'):
     migrate.init_app(app, db)
     jwt.init_app(app)
     
+    from .services.fx_refresher import FXRateRefresher
+    FXRateRefresher.init_app(app)
+    
+    from .services.analytics_snapshot import AnalyticsSnapshot
+    AnalyticsSnapshot.init_app(app)
+    
     from .auth.routes import auth_bp
     from .Routes.admin_routes import admin_bp
     from .Routes.user_routes import user_bp
@@ -55,6 +64,7 @@ def create_app(config_name='default'):
     from .Routes.contact_routes import contact_bp
     from .Routes.mpesa_routes import mpesa_bp
     from .Routes.deposit_routes import deposit_bp
+    from .commands import commands_bp
     
     app.register_blueprint(auth_bp)
     app.register_blueprint(admin_bp)
@@ -67,6 +77,7 @@ def create_app(config_name='default'):
     app.register_blueprint(contact_bp)
     app.register_blueprint(mpesa_bp)
     app.register_blueprint(deposit_bp)
+    app.register_blueprint(commands_bp)
     
     uploads_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'uploads')
     os.makedirs(uploads_dir, exist_ok=True)
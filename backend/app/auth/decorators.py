@@ -1,8 +1,8 @@
 from functools import wraps
 from flask import request, jsonify, current_app
 from flask_jwt_extended import verify_jwt_in_request, get_jwt_identity, get_jwt
-from app.models import User
 from ..services.otp_services import OTPService
+from ..services.identity_cache import IdentityCache, AuthenticatedUser
 
 
 def token_required(f):
@@ -11,12 +11,14 @@ def token_required(f):
         try:
             verify_jwt_in_request()
             current_user_id = get_jwt_identity()
-            current_user = User.query.get(current_user_id)
+            # Cached identity; the User itself is only loaded if the route reads it
+            identity = IdentityCache.get(current_user_id)
             
-            if not current_user or not current_user.is_active:
+            if not identity or not identity.is_active:
                 return jsonify({'message': 'User not found or inactive'}), 401
             
             # Attach user to request
+            current_user = AuthenticatedUser(identity)
             request.current_user = current_user
             request.jwt = get_jwt()
             
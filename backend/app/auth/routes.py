@@ -133,6 +133,18 @@ def login():
         user = User.query.filter_by(phone_number=data['phone_number']).first()
     
     if not user or not user.check_password(data['password']):
+        AuditLog.log(
+            actor_id=user.id if user else None,
+            actor_type='user',
+            action='login.failed',
+            resource_type='user',
+            resource_id=user.id if user else None,
+            actor_ip=request.remote_addr,
+            user_agent=request.user_agent.string,
+            status='failed',
+            error_message='Invalid credentials'
+        )
+        db.session.commit()
         return jsonify({'message': 'Invalid credentials'}), 401
     
     if not user.is_active:
@@ -0,0 +1,59 @@
+# cache.py
+import threading
+import time
+from flask import current_app
+
+
+class TTLCache:
+    """Per-process dict cache whose entries expire and whose size is bounded.
+
+    The lifetime and size are read from the app config on every call (ttl_setting,
+    size_setting; ttl and size are the defaults), so they can be tuned without a
+    restart. Storing past the size drops the least recently stored entries.
+    Reads take no lock; stores and removals do.
+    """
+
+    def __init__(self, ttl_setting, ttl, size_setting, size):
+        self.ttl_setting = ttl_setting
+        self.ttl = ttl
+        self.size_setting = size_setting
+        self.size = size
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        """The value stored under key, or default if there is none or it has expired"""
+        entry = self._entries.get(key)
+        if entry is None or time.monotonic() - entry[0] > current_app.config.get(self.ttl_setting, self.ttl):
+            return default
+        return entry[1]
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = (time.monotonic(), value)
+
+            # Drop the oldest entries beyond the configured size
+            excess = len(self._entries) - current_app.config.get(self.size_setting, self.size)
+            for stale in list(self._entries)[:max(excess, 0)]:
+                del self._entries[stale]
+
+    def discard(self, keys):
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def discard_where(self, predicate):
+        with self._lock:
+            for key in [key for key in self._entries if predicate(key)]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries = {}
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def __len__(self):
+        return len(self._entries)
@@ -0,0 +1,209 @@
+# commands.py - maintenance commands, run as `flask <command>`
+import json
+from datetime import date, datetime
+
+import click
+from flask import Blueprint, current_app
+
+commands_bp = Blueprint('commands', __name__, cli_group=None)
+
+@commands_bp.cli.command('backtest-fees')
+@click.argument('schedule', type=click.Path(exists=True, dir_okay=False))
+@click.option('--start', help='ISO datetime of the first transaction to replay')
+@click.option('--end', help='ISO datetime to replay up to')
+@click.option('--chunk-size', default=50000, show_default=True, help='Transactions per chunk')
+@click.option('--output', type=click.Path(dir_okay=False), help='Write the full report here as JSON')
+def backtest_fees(schedule, start, end, chunk_size, output):
+    """Replay completed transactions through a candidate fee schedule (JSON file)"""
+    from .services.fee_backtest import FeeBacktester
+
+    with open(schedule) as f:
+        candidate = json.load(f)
+
+    backtester = FeeBacktester.from_schedule(candidate, chunk_size=chunk_size)
+    report = backtester.run(
+        start=datetime.fromisoformat(start) if start else None,
+        end=datetime.fromisoformat(end) if end else None
+    )
+
+    click.echo(f"Replayed {report['transactions']} completed transactions")
+    for title, section in (('Fee type', 'by_fee_type'), ('Corridor', 'by_corridor'), ('Amount band', 'by_amount_band')):
+        click.echo(f"\n{title:<20} {'Count':>10} {'Current':>16} {'Candidate':>16} {'Difference':>16}")
+        for key, totals in sorted(report[section].items()):
+            click.echo(f"{key:<20} {totals['transactions']:>10} {totals['current_fees']:>16,.2f} "
+                       f"{totals['candidate_fees']:>16,.2f} {totals['difference']:>16,.2f}")
+
+    totals = report['totals']
+    click.echo(f"\n{'Total':<20} {totals['transactions']:>10} {totals['current_fees']:>16,.2f} "
+               f"{totals['candidate_fees']:>16,.2f} {totals['difference']:>16,.2f}")
+
+    if output:
+        with open(output, 'w') as f:
+            json.dump(report, f, indent=2)
+        click.echo(f"Full report written to {output}")
+
+@commands_bp.cli.command('prune-velocity-counters')
+def prune_velocity_counters():
+    """Delete wallet velocity buckets past their retention"""
+    from .services.velocity_counters import VelocityCounters
+
+    removed = VelocityCounters.prune()
+    click.echo(f"Removed {removed} expired velocity buckets")
+
+@commands_bp.cli.command('rebuild-transaction-rollups')
+@click.option('--start', help='First day to recompute (ISO date, default the earliest)')
+@click.option('--end', help='Last day to recompute (ISO date, default today)')
+def rebuild_transaction_rollups(start, end):
+    """Recompute daily transaction rollups for start..end (default all days)"""
+    from .services.transaction_rollups import TransactionRollups
+
+    written = TransactionRollups.rebuild(
+        start=date.fromisoformat(start) if start else None,
+        end=date.fromisoformat(end) if end else None
+    )
+    click.echo(f"Wrote {written} rollup rows")
+
+@commands_bp.cli.command('rebuild-corridor-rollups')
+@click.option('--start', help='First day to recompute (ISO date, default the earliest)')
+@click.option('--end', help='Last day to recompute (ISO date, default today)')
+def rebuild_corridor_rollups(start, end):
+    """Recompute daily corridor rollups (FX spread, settlement time) for start..end (default all days)"""
+    from .services.corridor_analytics import CorridorAnalytics
+
+    written = CorridorAnalytics.rebuild(
+        start=date.fromisoformat(start) if start else None,
+        end=date.fromisoformat(end) if end else None
+    )
+    click.echo(f"Wrote {written} corridor rollup rows")
+
+@commands_bp.cli.command('export-columnar')
+@click.option('--table', type=click.Choice(['transactions', 'ledger_entries']), help='Export only this table (default both)')
+@click.option('--format', 'file_format', type=click.Choice(['parquet', 'arrow']), default='parquet', show_default=True)
+@click.option('--output', type=click.Path(file_okay=False), help='Directory to write to (default EXPORT_DIR)')
+@click.option('--full', is_flag=True, help='Rewrite everything instead of exporting above the watermark')
+def export_columnar(table, file_format, output, full):
+    """Export transactions and ledger entries above their watermarks as day-partitioned Parquet or Arrow files"""
+    from .services.columnar_export import ColumnarExport, EXPORT_MODELS
+
+    for name in [table] if table else list(EXPORT_MODELS):
+        result = ColumnarExport.export(name, output_dir=output, file_format=file_format, full=full)
+        click.echo(f"{name}: exported {result['rows']} rows in {len(result['files'])} files, watermark {result['watermark']}")
+
+@commands_bp.cli.command('detect-suspicious-activity')
+@click.option('--hours', type=int, help='Look back this many hours (default the detection window)')
+def detect_suspicious_activity(hours):
+    """Replay recent transactions and failed logins through the suspicious activity detector"""
+    from .services.suspicious_activity import SuspiciousActivityDetector
+
+    written = SuspiciousActivityDetector.scan(hours=hours)
+    click.echo(f"Upserted {written} suspicious activity records")
+
+@commands_bp.cli.command('benchmark-risk-engine')
+@click.option('--wallets', default=10000, show_default=True)
+@click.option('--events', default=200000, show_default=True, help='Transfers observed before measuring')
+@click.option('--evaluations', default=20000, show_default=True)
+def benchmark_risk_engine(wallets, events, evaluations):
+    """Measure risk rule evaluation latency against populated sliding windows"""
+    import random
+    import time
+    from .services.risk_engine import RiskEngine
+
+    RiskEngine.configure(current_app.config['RISK_RULES'])
+
+    def random_signal(at):
+        wallet_id = random.randrange(wallets)
+        return RiskEngine.signal(
+            wallet_id,
+            random.randrange(wallets),
+            random.randint(100, 50000),
+            device_id=f"device-{wallet_id % (wallets // 2 or 1)}",
+            ip_address=f"10.0.{wallet_id % 250}.{random.randrange(250)}",
+            at=at
+        )
+
+    now = time.time()
+    for _ in range(events):
+        RiskEngine.observe(random_signal(now - random.uniform(0, 3600)))
+
+    latencies = sorted(RiskEngine.evaluate(random_signal(now)).elapsed_ms for _ in range(evaluations))
+
+    def percentile(p):
+        return latencies[min(len(latencies) - 1, int(len(latencies) * p))]
+
+    budget = current_app.config['RISK_ENGINE_BUDGET_MS']
+    stats = RiskEngine.get_stats()
+    click.echo(f"{len(RiskEngine.get_rules())} rules, {stats['keys']} keys, {events} events, {evaluations} evaluations")
+    click.echo(f"p50 {percentile(0.50):.4f} ms  p99 {percentile(0.99):.4f} ms  max {latencies[-1]:.4f} ms")
+    click.echo(f"Over budget ({budget} ms): {stats['over_budget']}")
+
+    # Wall-clock latency depends on the machine, so it is checked here rather than in the tests
+    if percentile(0.99) >= budget:
+        raise click.ClickException("p99 latency exceeds RISK_ENGINE_BUDGET_MS")
+
+@commands_bp.cli.command('benchmark-serialization')
+@click.option('--rows', default=1000, show_default=True, help='Transactions on the page')
+@click.option('--repeat', default=20, show_default=True)
+def benchmark_serialization(rows, repeat):
+    """Compare ORM + to_dict + stdlib JSON with projected rows + orjson for a transaction history page"""
+    import statistics
+    import time
+    from decimal import Decimal
+    from flask.json.provider import DefaultJSONProvider
+    from .extensions import db
+    from .models import Transaction, Wallet, User
+    from .models.enums import TransactionStatus, TransactionType, PaymentProvider
+    from .serializers import TransactionSerializer, TransactionRowSerializer
+
+    wallets = Wallet.query.join(User).order_by(Wallet.id).limit(2).all()
+    if len(wallets) < 2:
+        raise click.ClickException("Need at least two wallets with users to benchmark against")
+
+    # Inserted for the run only and rolled back at the end
+    db.session.add_all([
+        Transaction(
+            sender_wallet_id=wallets[0].id,
+            receiver_wallet_id=wallets[1].id,
+            amount=Decimal('100.00') + i,
+            fee=Decimal('1.00'),
+            transaction_type=TransactionType.transfer,
+            status=TransactionStatus.completed,
+            provider=PaymentProvider.internal
+        )
+        for i in range(rows)
+    ])
+    db.session.flush()
+
+    query = Transaction.query.filter(Transaction.sender_wallet_id == wallets[0].id).order_by(Transaction.id.desc())
+    stdlib_json = DefaultJSONProvider(current_app._get_current_object())
+
+    def timed(fn):
+        timings = []
+        for _ in range(repeat):
+            db.session.expunge_all()
+            started = time.perf_counter()
+            fn()
+            timings.append((time.perf_counter() - started) * 1000)
+        return statistics.median(timings)
+
+    def orm_page():
+        serializer = TransactionSerializer(include_wallets=True)
+        return serializer.dump_many(serializer.apply(query).limit(rows).all())
+
+    def projected_page():
+        serializer = TransactionRowSerializer(include_wallets=True)
+        return serializer.dump_many(serializer.apply(query).limit(rows).all())
+
+    try:
+        orm_data, projected_data = orm_page(), projected_page()
+        results = {
+            'orm + to_dict + json': timed(lambda: stdlib_json.dumps(orm_page())),
+            'projected + orjson': timed(lambda: current_app.json.dumps(projected_page())),
+            'encode only, json': timed(lambda: stdlib_json.dumps(orm_data)),
+            'encode only, orjson': timed(lambda: current_app.json.dumps(projected_data))
+        }
+    finally:
+        db.session.rollback()
+
+    click.echo(f"{rows} rows, median of {repeat} runs")
+    for name, elapsed in results.items():
+        click.echo(f"{name:<24} {elapsed:9.2f} ms")
@@ -9,10 +9,17 @@ from .payment_method import PaymentMethod
 from .ledger_entry import LedgerEntry
 from .audit_log import AuditLog
 from .exchange_rate import ExchangeRate
+from .exchange_rate_history import ExchangeRateHistory
 from .funding_source import FundingSource
 from .payout_destination import PayoutDestination
 from .fee import Fee
 from .hold import Hold
+from .transfer_quote import TransferQuote
+from .wallet_velocity_counter import WalletVelocityCounter
+from .user_usage_aggregate import UserUsageAggregate
+from .suspicious_activity import SuspiciousActivity
+from .daily_transaction_rollup import DailyTransactionRollup
+from .daily_corridor_rollup import DailyCorridorRollup
 from .enums import *
 
 __all__ = [
@@ -27,10 +34,17 @@ __all__ = [
     'LedgerEntry',
     'AuditLog',
     'ExchangeRate',
+    'ExchangeRateHistory',
     'FundingSource',
     'PayoutDestination',
     'Fee',
     'Hold',
+    'TransferQuote',
+    'WalletVelocityCounter',
+    'UserUsageAggregate',
+    'SuspiciousActivity',
+    'DailyTransactionRollup',
+    'DailyCorridorRollup',
     'TransactionStatus',
     'TransactionType',
     'KYCStatus',
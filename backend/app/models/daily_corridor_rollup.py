@@ -0,0 +1,52 @@
+from decimal import Decimal
+from ..extensions import db
+
+
+class DailyCorridorRollup(db.Model):
+    """Completed transactions created on one UTC day, with their FX spread and settlement time, per corridor"""
+    __tablename__ = 'daily_corridor_rollups'
+    
+    day = db.Column(db.Date, primary_key=True)
+    
+    # '' when the transaction has no country
+    source_country = db.Column(db.String(2), primary_key=True, default='')
+    destination_country = db.Column(db.String(2), primary_key=True, default='')
+    source_currency = db.Column(db.String(3), primary_key=True)
+    target_currency = db.Column(db.String(3), primary_key=True)
+    
+    completed_count = db.Column(db.Integer, default=0, nullable=False)
+    
+    # Converted transactions with a reference rate: their amount, and that amount
+    # weighted by the relative spread (reference - applied) / reference
+    fx_count = db.Column(db.Integer, default=0, nullable=False)
+    fx_amount = db.Column(db.Numeric(18, 2), default=Decimal('0.00'), nullable=False)
+    fx_spread_amount = db.Column(db.Numeric(24, 8), default=Decimal('0'), nullable=False)
+    
+    # Completed transactions with a completion time, and their summed created-to-completed seconds
+    settled_count = db.Column(db.Integer, default=0, nullable=False)
+    settlement_seconds = db.Column(db.Numeric(18, 3), default=Decimal('0'), nullable=False)
+    
+    # Timestamps
+    updated_at = db.Column(db.DateTime(timezone=True), server_default=db.func.now(), onupdate=db.func.now(), nullable=False)
+    
+    # Indexes
+    __table_args__ = (
+        db.Index('idx_daily_corridor_rollups_corridor', 'source_country', 'destination_country', 'day'),
+    )
+    
+    def to_dict(self):
+        return {
+            'day': self.day.isoformat() if self.day else None,
+            'source_country': self.source_country or None,
+            'destination_country': self.destination_country or None,
+            'source_currency': self.source_currency,
+            'target_currency': self.target_currency,
+            'completed_count': self.completed_count,
+            'fx_count': self.fx_count,
+            'fx_amount': float(self.fx_amount),
+            'settled_count': self.settled_count,
+            'settlement_seconds': float(self.settlement_seconds)
+        }
+    
+    def __repr__(self):
+        return f'<DailyCorridorRollup {self.day} {self.source_country}->{self.destination_country} count={self.completed_count}>'
@@ -0,0 +1,45 @@
+from decimal import Decimal
+from ..extensions import db
+
+
+class DailyTransactionRollup(db.Model):
+    """Transactions created on one UTC day, totalled per type, current status, corridor and currency"""
+    __tablename__ = 'daily_transaction_rollups'
+    
+    day = db.Column(db.Date, primary_key=True)
+    transaction_type = db.Column(db.String(30), primary_key=True)
+    status = db.Column(db.String(20), primary_key=True)
+    
+    # '' when the transaction has no country
+    source_country = db.Column(db.String(2), primary_key=True, default='')
+    destination_country = db.Column(db.String(2), primary_key=True, default='')
+    currency = db.Column(db.String(3), primary_key=True)  # The transaction's source currency
+    
+    count = db.Column(db.Integer, default=0, nullable=False)
+    amount = db.Column(db.Numeric(18, 2), default=Decimal('0.00'), nullable=False)
+    fee = db.Column(db.Numeric(18, 2), default=Decimal('0.00'), nullable=False)
+    
+    # Timestamps
+    updated_at = db.Column(db.DateTime(timezone=True), server_default=db.func.now(), onupdate=db.func.now(), nullable=False)
+    
+    # Indexes
+    __table_args__ = (
+        db.Index('idx_daily_transaction_rollups_status_day', 'status', 'day'),
+        db.Index('idx_daily_transaction_rollups_corridor', 'source_country', 'destination_country', 'day'),
+    )
+    
+    def to_dict(self):
+        return {
+            'day': self.day.isoformat() if self.day else None,
+            'transaction_type': self.transaction_type,
+            'status': self.status,
+            'source_country': self.source_country or None,
+            'destination_country': self.destination_country or None,
+            'currency': self.currency,
+            'count': self.count,
+            'amount': float(self.amount),
+            'fee': float(self.fee)
+        }
+    
+    def __repr__(self):
+        return f'<DailyTransactionRollup {self.day} {self.transaction_type}/{self.status} count={self.count}>'
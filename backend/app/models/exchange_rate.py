@@ -8,6 +8,7 @@ class ExchangeRate(db.Model):
     base_currency = db.Column(db.String(3), nullable=False, index=True)  # KES, USD, etc.
     target_currency = db.Column(db.String(3), nullable=False, index=True)
     rate = db.Column(db.Numeric(10, 6), nullable=False)  # 1 base = X target
+    fx_provider = db.Column(db.String(50), nullable=True)  # exchangerate_api, openexchangerates, fallback
     last_updated = db.Column(db.DateTime(timezone=True), nullable=False, default=datetime.now(timezone.utc))
     
     # Indexes
@@ -23,6 +24,7 @@ class ExchangeRate(db.Model):
             'base_currency': self.base_currency,
             'target_currency': self.target_currency,
             'rate': float(self.rate),
+            'fx_provider': self.fx_provider,
             'last_updated': self.last_updated.isoformat() if self.last_updated else None
         }
     
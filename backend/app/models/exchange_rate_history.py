@@ -0,0 +1,134 @@
+from bisect import bisect_right
+from datetime import datetime, timezone, time
+from decimal import Decimal, ROUND_HALF_UP
+from sqlalchemy import and_, tuple_
+from ..extensions import db
+
+
+class ExchangeRateHistory(db.Model):
+    """Append-only record of every rate written to exchange_rates"""
+    __tablename__ = 'exchange_rate_history'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    base_currency = db.Column(db.String(3), nullable=False)
+    target_currency = db.Column(db.String(3), nullable=False)
+    rate = db.Column(db.Numeric(10, 6), nullable=False)  # 1 base = X target
+    fx_provider = db.Column(db.String(50), nullable=True)
+    recorded_at = db.Column(db.DateTime(timezone=True), nullable=False, default=lambda: datetime.now(timezone.utc))
+    
+    # Indexes
+    __table_args__ = (
+        db.Index('idx_exchange_rate_history_pair_time', 'base_currency', 'target_currency', 'recorded_at'),
+    )
+    
+    @classmethod
+    def rate_as_of(cls, base_currency, target_currency, as_of):
+        """Latest recorded rate at or before as_of: direct, inverse, then crossed through USD"""
+        return cls._resolve(cls._latest, base_currency, target_currency, cls._normalize(as_of))
+    
+    @classmethod
+    def preload(cls, pairs, start, end):
+        """rate_as_of for (base, target) pairs at times within start..end, answered from one query"""
+        start, end = cls._normalize(start), cls._normalize(end)
+        
+        legs = set()
+        for base_currency, target_currency in pairs:
+            legs.update(((base_currency, target_currency), (target_currency, base_currency)))
+            if 'USD' not in (base_currency, target_currency):
+                for currency in (base_currency, target_currency):
+                    legs.update((('USD', currency), (currency, 'USD')))
+        legs = {leg for leg in legs if leg[0] != leg[1]}
+        
+        timelines = {}
+        if legs:
+            legs = sorted(legs)
+            
+            # The rate in force at start, then every change up to end
+            in_force = db.session.query(
+                cls.base_currency,
+                cls.target_currency,
+                db.func.max(cls.recorded_at).label('recorded_at')
+            ).filter(cls._in_legs(legs), cls.recorded_at <= start).group_by(cls.base_currency, cls.target_currency).subquery()
+            
+            columns = (cls.base_currency, cls.target_currency, cls.recorded_at, cls.rate)
+            rows = db.session.query(*columns).join(in_force, and_(
+                cls.base_currency == in_force.c.base_currency,
+                cls.target_currency == in_force.c.target_currency,
+                cls.recorded_at == in_force.c.recorded_at
+            )).union_all(
+                db.session.query(*columns).filter(cls._in_legs(legs), cls.recorded_at > start, cls.recorded_at <= end)
+            ).all()
+            
+            for base_currency, target_currency, recorded_at, rate in sorted(rows, key=lambda row: cls._normalize(row[2])):
+                times, rates = timelines.setdefault((base_currency, target_currency), ([], []))
+                times.append(cls._normalize(recorded_at))
+                rates.append(Decimal(str(rate)))
+        
+        def latest(base_currency, target_currency, as_of):
+            times, rates = timelines.get((base_currency, target_currency), ((), ()))
+            index = bisect_right(times, as_of)
+            return rates[index - 1] if index else None
+        
+        def rate_as_of(base_currency, target_currency, as_of):
+            return cls._resolve(latest, base_currency, target_currency, cls._normalize(as_of))
+        
+        return rate_as_of
+    
+    @classmethod
+    def _in_legs(cls, legs):
+        return tuple_(cls.base_currency, cls.target_currency).in_(legs)
+    
+    @classmethod
+    def _resolve(cls, latest, base_currency, target_currency, as_of):
+        if base_currency == target_currency:
+            return Decimal('1.000000')
+        
+        direct = latest(base_currency, target_currency, as_of)
+        if direct is not None:
+            return direct
+        
+        inverse = latest(target_currency, base_currency, as_of)
+        if inverse:
+            return (Decimal('1') / inverse).quantize(Decimal('0.000001'), rounding=ROUND_HALF_UP)
+        
+        if 'USD' in (base_currency, target_currency):
+            return None
+        
+        usd_to_base = cls._resolve(latest, 'USD', base_currency, as_of)
+        usd_to_target = cls._resolve(latest, 'USD', target_currency, as_of)
+        if usd_to_base and usd_to_target:
+            return (usd_to_target / usd_to_base).quantize(Decimal('0.000001'), rounding=ROUND_HALF_UP)
+        
+        return None
+    
+    @classmethod
+    def _latest(cls, base_currency, target_currency, as_of):
+        rate = db.session.query(cls.rate).filter(
+            cls.base_currency == base_currency,
+            cls.target_currency == target_currency,
+            cls.recorded_at <= as_of
+        ).order_by(cls.recorded_at.desc()).limit(1).scalar()
+        
+        return Decimal(str(rate)) if rate is not None else None
+    
+    @staticmethod
+    def _normalize(as_of):
+        # A bare date means "the rate in force at the end of that day"
+        if not isinstance(as_of, datetime):
+            as_of = datetime.combine(as_of, time.max)
+        if as_of.tzinfo is None:
+            as_of = as_of.replace(tzinfo=timezone.utc)
+        return as_of
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'base_currency': self.base_currency,
+            'target_currency': self.target_currency,
+            'rate': float(self.rate),
+            'fx_provider': self.fx_provider,
+            'recorded_at': self.recorded_at.isoformat() if self.recorded_at else None
+        }
+    
+    def __repr__(self):
+        return f'<ExchangeRateHistory {self.base_currency}/{self.target_currency}={self.rate} @ {self.recorded_at}>'
@@ -1,5 +1,5 @@
 from datetime import datetime, timezone
-from decimal import Decimal, ROUND_HALF_UP
+from decimal import Decimal
 from sqlalchemy.dialects.postgresql import JSONB
 from ..extensions import db
 
@@ -177,29 +177,16 @@ class LedgerEntry(db.Model):
         
         # Record usage for limit tracking
         if transaction.sender_wallet:
-            transaction.sender_wallet.record_usage(
-                Decimal(str(transaction.amount)) + Decimal(str(transaction.fee)),
-                transaction.is_cross_border
-            )
+            transaction.sender_wallet.record_usage(transaction.usage_amount, transaction.is_cross_border)
         
         return entries
     
     @classmethod
     def get_wallet_usage(cls, wallet_id, start_date, end_date, is_cross_border=False):
-        """Calculate wallet usage for a period"""
-        query = cls.query.filter(
-            cls.wallet_id == wallet_id,
-            cls.created_at >= start_date,
-            cls.created_at <= end_date,
-            cls.entry_type == 'debit'
-        )
-        
-        if is_cross_border:
-            query = query.filter(cls.metadata['is_cross_border'].astext.cast(db.Boolean) == True)
-        
-        total_debit = query.with_entities(db.func.sum(-cls.amount)).scalar() or Decimal('0.00')
+        """Calculate wallet usage for a period, from the velocity counters rather than a ledger scan"""
+        from app.services.velocity_counters import VelocityCounters
         
-        return total_debit.quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
+        return VelocityCounters.total(wallet_id, start_date, end_date, is_cross_border)
     
     def to_dict(self):
         return {
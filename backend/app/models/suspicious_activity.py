@@ -0,0 +1,55 @@
+from decimal import Decimal
+from sqlalchemy.dialects.postgresql import JSONB
+from ..extensions import db
+
+
+class SuspiciousActivity(db.Model):
+    """A detection kept up to date as transactions and audit events commit"""
+    __tablename__ = 'suspicious_activities'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    
+    # What was detected; subject identifies it within its kind ('transaction:42', 'wallet:7', 'audit_log:9')
+    kind = db.Column(db.String(30), nullable=False)  # 'large_transaction', 'high_frequency', 'failed_login'
+    subject = db.Column(db.String(100), nullable=False)
+    
+    # Who and what it concerns
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='SET NULL'), nullable=True, index=True)
+    wallet_id = db.Column(db.Integer, db.ForeignKey('wallets.id', ondelete='SET NULL'), nullable=True)
+    transaction_id = db.Column(db.Integer, db.ForeignKey('transactions.id', ondelete='SET NULL'), nullable=True)
+    audit_log_id = db.Column(db.Integer, db.ForeignKey('audit_logs.id', ondelete='SET NULL'), nullable=True)
+    actor_ip = db.Column(db.String(45), nullable=True)
+    
+    # Transaction amount, or the wallet's volume over the detection window
+    amount = db.Column(db.Numeric(14, 2), default=Decimal('0.00'), nullable=False)
+    count = db.Column(db.Integer, default=1, nullable=False)
+    details = db.Column(JSONB, nullable=True)
+    
+    # Timestamps
+    first_seen_at = db.Column(db.DateTime(timezone=True), nullable=False)
+    last_seen_at = db.Column(db.DateTime(timezone=True), nullable=False)
+    updated_at = db.Column(db.DateTime(timezone=True), server_default=db.func.now(), onupdate=db.func.now(), nullable=False)
+    
+    # Indexes
+    __table_args__ = (
+        db.UniqueConstraint('kind', 'subject', name='unique_suspicious_activity_subject'),
+        db.Index('idx_suspicious_activities_kind_seen', 'kind', 'last_seen_at'),
+    )
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'kind': self.kind,
+            'user_id': self.user_id,
+            'wallet_id': self.wallet_id,
+            'transaction_id': self.transaction_id,
+            'actor_ip': self.actor_ip,
+            'amount': float(self.amount),
+            'count': self.count,
+            'details': self.details,
+            'first_seen_at': self.first_seen_at.isoformat() if self.first_seen_at else None,
+            'last_seen_at': self.last_seen_at.isoformat() if self.last_seen_at else None
+        }
+    
+    def __repr__(self):
+        return f'<SuspiciousActivity {self.kind} {self.subject} count={self.count}>'
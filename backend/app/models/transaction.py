@@ -183,6 +183,11 @@ class Transaction(db.Model):
         if 'fx_rate' in kwargs and not self.fx_timestamp:
             self.fx_timestamp = datetime.now(timezone.utc)
     
+    @property
+    def usage_amount(self):
+        """What counts towards the sender's limits: amount plus fee, in the sender's currency"""
+        return Decimal(str(self.amount)) + Decimal(str(self.fee or 0))
+    
     @staticmethod
     def calculate_fee(amount, transaction_type='transfer', is_cross_border=False):
         amount = Decimal(str(amount))
@@ -199,6 +204,10 @@ class Transaction(db.Model):
                 fee = amount * Decimal('0.01')
                 min_fee = Decimal('10.00')
                 max_fee = Decimal('5000.00')
+            
+            # Apply min/max caps
+            fee = max(fee, min_fee)
+            fee = min(fee, max_fee)
         elif transaction_type == 'withdrawal':
             # Fixed fee for withdrawals
             fee = Decimal('27.50')
@@ -208,20 +217,15 @@ class Transaction(db.Model):
         else:
             fee = Decimal('0.00')
         
-        # Apply min/max caps
-        fee = max(fee, min_fee)
-        fee = min(fee, max_fee)
-        
         return fee.quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
     
     def update_status(self, new_status, metadata=None):
         valid_transitions = {
-            TransactionStatus.pending: [TransactionStatus.processing, TransactionStatus.failed, TransactionStatus.expired],
+            TransactionStatus.pending: [TransactionStatus.processing, TransactionStatus.failed],
             TransactionStatus.processing: [TransactionStatus.completed, TransactionStatus.failed],
             TransactionStatus.completed: [TransactionStatus.reversed],
             TransactionStatus.failed: [TransactionStatus.pending],  # Retry
-            TransactionStatus.reversed: [],
-            TransactionStatus.expired: []
+            TransactionStatus.reversed: []
         }
         
         if new_status not in valid_transitions.get(self.status, []):
@@ -240,8 +244,6 @@ class Transaction(db.Model):
             self.processed_at = now
         elif new_status == TransactionStatus.reversed:
             self.reversed_at = now
-        elif new_status == TransactionStatus.expired:
-            self.expired_at = now
         
         # Update metadata
         if metadata:
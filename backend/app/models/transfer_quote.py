@@ -0,0 +1,93 @@
+from datetime import datetime, timezone
+from sqlalchemy.dialects.postgresql import UUID
+import uuid
+from ..extensions import db
+
+
+class TransferQuote(db.Model):
+    __tablename__ = 'transfer_quotes'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    public_id = db.Column(UUID(as_uuid=True), unique=True, default=uuid.uuid4, nullable=False, index=True)
+    
+    # Owner
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='CASCADE'), nullable=False, index=True)
+    quote_type = db.Column(db.String(20), nullable=False)  # 'local', 'international'
+    
+    # Resolved wallets
+    sender_wallet_id = db.Column(db.Integer, db.ForeignKey('wallets.id', ondelete='CASCADE'), nullable=False)
+    receiver_wallet_id = db.Column(db.Integer, db.ForeignKey('wallets.id', ondelete='CASCADE'), nullable=True)
+    
+    # Amounts
+    amount = db.Column(db.Numeric(12, 2), nullable=False)
+    currency = db.Column(db.String(3), nullable=False)
+    converted_amount = db.Column(db.Numeric(12, 2), nullable=False)
+    sender_currency = db.Column(db.String(3), nullable=False)
+    receiver_amount = db.Column(db.Numeric(12, 2), nullable=False)
+    receiver_currency = db.Column(db.String(3), nullable=False)
+    fee = db.Column(db.Numeric(12, 2), nullable=False)
+    total_amount = db.Column(db.Numeric(12, 2), nullable=False)
+    
+    # Locked rate snapshot
+    exchange_rate = db.Column(db.Numeric(10, 6), nullable=True)
+    fx_provider = db.Column(db.String(50), nullable=True)
+    fx_timestamp = db.Column(db.DateTime(timezone=True), nullable=True)
+    
+    # Route
+    is_cross_border = db.Column(db.Boolean, default=False, nullable=False)
+    source_country = db.Column(db.String(2), nullable=True)
+    destination_country = db.Column(db.String(2), nullable=True)
+    
+    # Status
+    status = db.Column(db.String(20), default='active', nullable=False)  # 'active', 'used'
+    expires_at = db.Column(db.DateTime(timezone=True), nullable=False)
+    used_at = db.Column(db.DateTime(timezone=True), nullable=True)
+    transaction_id = db.Column(db.Integer, db.ForeignKey('transactions.id', ondelete='SET NULL'), nullable=True)
+    
+    # Full quote as returned to the client (settlement estimate, compliance requirements, ...)
+    meta_data = db.Column(db.JSON, nullable=True)
+    
+    # Timestamps
+    created_at = db.Column(db.DateTime(timezone=True), server_default=db.func.now(), nullable=False)
+    
+    __table_args__ = (
+        db.Index('idx_transfer_quotes_user_status', 'user_id', 'status'),
+        db.Index('idx_transfer_quotes_expiry', 'expires_at', 'status'),
+    )
+    
+    def is_expired(self):
+        expires_at = self.expires_at
+        if expires_at.tzinfo is None:
+            expires_at = expires_at.replace(tzinfo=timezone.utc)
+        return datetime.now(timezone.utc) > expires_at
+    
+    def to_dict(self):
+        return {
+            'quote_id': str(self.public_id),
+            'quote_type': self.quote_type,
+            'user_id': self.user_id,
+            'sender_wallet_id': self.sender_wallet_id,
+            'receiver_wallet_id': self.receiver_wallet_id,
+            'amount': float(self.amount),
+            'currency': self.currency,
+            'converted_amount': float(self.converted_amount),
+            'sender_currency': self.sender_currency,
+            'receiver_amount': float(self.receiver_amount),
+            'receiver_currency': self.receiver_currency,
+            'fee': float(self.fee),
+            'total_amount': float(self.total_amount),
+            'exchange_rate': float(self.exchange_rate) if self.exchange_rate else None,
+            'fx_provider': self.fx_provider,
+            'fx_timestamp': self.fx_timestamp.isoformat() if self.fx_timestamp else None,
+            'is_cross_border': self.is_cross_border,
+            'source_country': self.source_country,
+            'destination_country': self.destination_country,
+            'status': self.status,
+            'expires_at': self.expires_at.isoformat() if self.expires_at else None,
+            'used_at': self.used_at.isoformat() if self.used_at else None,
+            'transaction_id': self.transaction_id,
+            'created_at': self.created_at.isoformat() if self.created_at else None
+        }
+    
+    def __repr__(self):
+        return f'<TransferQuote {self.public_id} type={self.quote_type} total={self.total_amount} status={self.status}>'
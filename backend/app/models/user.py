@@ -1,6 +1,7 @@
 from datetime import datetime, timezone, timedelta
 from decimal import Decimal
 from werkzeug.security import generate_password_hash, check_password_hash
+from sqlalchemy import DDL, event
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 import uuid
 from ..extensions import db
@@ -132,6 +133,15 @@ class User(db.Model):
         from .user_account import UserAccount
         return [link.account for link in self.account_links.filter_by(is_active=True).all()]
     
+    @classmethod
+    def search_document(cls):
+        """Lower-cased email, username, phone and names as one string; idx_users_search indexes this exact expression"""
+        separator = db.literal_column("' '")
+        return db.func.lower(
+            cls.email + separator + cls.username + separator + cls.phone_number + separator +
+            cls.first_name + separator + cls.last_name
+        )
+    
     def __init__(self, **kwargs):
         # Set default region based on country if not provided
         if 'country_code' in kwargs and 'region' not in kwargs:
@@ -231,7 +241,8 @@ class User(db.Model):
         if device_id:
             self.last_device_id = device_id
     
-    def to_dict(self, include_wallet=False, include_kyc=False, include_accounts=False):
+    def to_dict(self, include_wallet=False, include_kyc=False, include_accounts=False,
+                include_wallet_usage=False, wallet_usage=None, account_links=None):
         data = {
             'id': self.id,
             'public_id': str(self.public_id),
@@ -264,15 +275,36 @@ class User(db.Model):
         }
         
         if include_wallet and self.wallet:
-            data['wallet'] = self.wallet.to_dict()
+            data['wallet'] = self.wallet.to_dict(include_usage=include_wallet_usage, usage=wallet_usage)
             
         if include_kyc and self.kyc_verification:
             data['kyc'] = self.kyc_verification.to_dict()
             
         if include_accounts:
-            data['accounts'] = [account.to_dict() for account in self.all_accounts]
-            primary = self.primary_account
+            if account_links is None:
+                data['accounts'] = [account.to_dict() for account in self.all_accounts]
+                primary = self.primary_account
+            else:
+                # All of the user's links, preloaded with their accounts for a page of users
+                data['accounts'] = [link.account.to_dict() for link in account_links if link.is_active]
+                primary = next((link.account for link in account_links if link.is_primary), None)
             if primary:
                 data['primary_account_id'] = primary.id
         
-        return data
\ No newline at end of file
+        return data
+
+
+# Trigram index for substring search (services/user_search.py); the extension
+# is created first when the schema is built with create_all()
+db.Index(
+    'idx_users_search',
+    User.search_document().label('search_document'),
+    postgresql_using='gin',
+    postgresql_ops={'search_document': 'gin_trgm_ops'}
+)
+
+event.listen(
+    User.__table__,
+    'before_create',
+    DDL('CREATE EXTENSION IF NOT EXISTS pg_trgm').execute_if(dialect='postgresql')
+)
@@ -0,0 +1,30 @@
+from decimal import Decimal
+from ..extensions import db
+
+
+class UserUsageAggregate(db.Model):
+    """Outgoing volume of one user for one UTC calendar day or month, in KYC_LIMIT_CURRENCY"""
+    __tablename__ = 'user_usage_aggregates'
+    
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='CASCADE'), primary_key=True)
+    period = db.Column(db.String(10), primary_key=True)  # 'day', 'month'
+    period_start = db.Column(db.Date, primary_key=True)  # The day, or the first of the month
+    
+    amount = db.Column(db.Numeric(14, 2), default=Decimal('0.00'), nullable=False)
+    count = db.Column(db.Integer, default=0, nullable=False)
+    
+    # Timestamps
+    updated_at = db.Column(db.DateTime(timezone=True), server_default=db.func.now(), onupdate=db.func.now(), nullable=False)
+    
+    def to_dict(self):
+        return {
+            'user_id': self.user_id,
+            'period': self.period,
+            'period_start': self.period_start.isoformat() if self.period_start else None,
+            'amount': float(self.amount),
+            'count': self.count,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+        }
+    
+    def __repr__(self):
+        return f'<UserUsageAggregate user_id={self.user_id} {self.period}@{self.period_start} amount={self.amount}>'
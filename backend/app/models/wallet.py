@@ -37,18 +37,6 @@ class Wallet(db.Model):
     cross_border_daily_limit = db.Column(db.Numeric(12, 2), default=Decimal('1000000.00'), nullable=False)  # Updated to 1M
     cross_border_monthly_limit = db.Column(db.Numeric(12, 2), default=Decimal('10000000.00'), nullable=False)  # Updated to 10M
     
-    # Usage tracking for limit enforcement
-    daily_usage = db.Column(db.Numeric(12, 2), default=Decimal('0.00'), nullable=False)
-    monthly_usage = db.Column(db.Numeric(12, 2), default=Decimal('0.00'), nullable=False)
-    cross_border_daily_usage = db.Column(db.Numeric(12, 2), default=Decimal('0.00'), nullable=False)
-    cross_border_monthly_usage = db.Column(db.Numeric(12, 2), default=Decimal('0.00'), nullable=False)
-    
-    # Limit reset tracking
-    daily_usage_reset_at = db.Column(db.DateTime(timezone=True), nullable=True)
-    monthly_usage_reset_at = db.Column(db.DateTime(timezone=True), nullable=True)
-    cross_border_daily_reset_at = db.Column(db.DateTime(timezone=True), nullable=True)
-    cross_border_monthly_reset_at = db.Column(db.DateTime(timezone=True), nullable=True)
-    
     # Risk and compliance
     risk_score = db.Column(db.Integer, default=0, nullable=False)
     flags = db.Column(JSONB, default={}, nullable=True)
@@ -72,44 +60,24 @@ class Wallet(db.Model):
     __table_args__ = (
         db.Index('idx_wallets_user_status', 'user_id', 'status'),
         db.Index('idx_wallets_currency_balances', 'currency_balances', postgresql_using='gin'),
-        db.Index('idx_wallets_daily_reset', 'daily_usage_reset_at'),
-        db.Index('idx_wallets_monthly_reset', 'monthly_usage_reset_at'),
         db.CheckConstraint('balance >= 0', name='check_non_negative_balance'),
         db.CheckConstraint('available_balance >= 0', name='check_non_negative_available'),
         db.CheckConstraint('locked_balance >= 0', name='check_non_negative_locked'),
     )
     
-    def __init__(self, **kwargs):
-        super().__init__(**kwargs)
-        now = datetime.now(timezone.utc)
-        self.daily_usage_reset_at = now
-        self.monthly_usage_reset_at = now
-        self.cross_border_daily_reset_at = now
-        self.cross_border_monthly_reset_at = now
-    
-    def _reset_usage_if_needed(self):
-        """Reset usage counters based on timestamp"""
-        now = datetime.now(timezone.utc)
+    def get_usage(self, scope=None, now=None):
+        """Rolling daily (24h) and monthly (30 day) debit totals, from the velocity counters"""
+        from app.services.velocity_counters import VelocityCounters, LIMIT_WINDOWS
         
-        # Reset daily usage if new day
-        if self.daily_usage_reset_at.date() != now.date():
-            self.daily_usage = Decimal('0.00')
-            self.daily_usage_reset_at = now
-        
-        # Reset monthly usage if new month
-        if self.monthly_usage_reset_at.month != now.month:
-            self.monthly_usage = Decimal('0.00')
-            self.monthly_usage_reset_at = now
-        
-        # Reset cross-border daily usage if new day
-        if self.cross_border_daily_reset_at.date() != now.date():
-            self.cross_border_daily_usage = Decimal('0.00')
-            self.cross_border_daily_reset_at = now
+        windows = {
+            name: window for name, window in LIMIT_WINDOWS.items()
+            if scope is None or window[0] == scope
+        }
+        if self.id is None:
+            return {name: Decimal('0.00') for name in windows}
         
-        # Reset cross-border monthly usage if new month
-        if self.cross_border_monthly_reset_at.month != now.month:
-            self.cross_border_monthly_usage = Decimal('0.00')
-            self.cross_border_monthly_reset_at = now
+        usage = VelocityCounters.usage(self.id, windows, now=now)
+        return {name: totals.amount for name, totals in usage.items()}
     
     def update_balance_from_ledger(self):
         """Update wallet balance from ledger entries for primary currency"""
@@ -141,7 +109,7 @@ class Wallet(db.Model):
         exchange_rate = CurrencyService.get_exchange_rate(self.primary_currency, currency_code)
         return (self.balance * exchange_rate).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
     
-    def can_withdraw(self, amount, currency='KES', target_country=None, check_usage=True):
+    def can_withdraw(self, amount, currency='KES', target_country=None, check_usage=True, check_balance=True):
         """Enhanced withdrawal check with usage-based limit enforcement"""
         amount = Decimal(str(amount)).quantize(Decimal('0.01'))
         
@@ -167,31 +135,31 @@ class Wallet(db.Model):
         else:
             amount_in_primary = amount
         
-        if amount_in_primary > self.available_balance:
+        if check_balance and amount_in_primary > self.available_balance:
             return {'allowed': False, 'reason': 'Insufficient available balance'}
         
-        # Reset usage counters if needed
-        self._reset_usage_if_needed()
-        
         # Check if cross-border transfer
         is_cross_border = target_country and self.user and target_country != self.user.country_code
         
+        # Rolling-window usage is read from the velocity counters; the wallet row is not touched
+        usage = self.get_usage('cross_border' if is_cross_border else 'local') if check_usage else None
+        
         if is_cross_border:
             # Check cross-border daily limit
-            if check_usage and (self.cross_border_daily_usage + amount_in_primary) > self.cross_border_daily_limit:
-                return {'allowed': False, 'reason': f'Exceeds cross-border daily limit. Used: {float(self.cross_border_daily_usage)}, Limit: {float(self.cross_border_daily_limit)}'}
+            if check_usage and (usage['cross_border_daily_usage'] + amount_in_primary) > self.cross_border_daily_limit:
+                return {'allowed': False, 'reason': f"Exceeds cross-border daily limit. Used: {float(usage['cross_border_daily_usage'])}, Limit: {float(self.cross_border_daily_limit)}"}
             
             # Check cross-border monthly limit
-            if check_usage and (self.cross_border_monthly_usage + amount_in_primary) > self.cross_border_monthly_limit:
-                return {'allowed': False, 'reason': f'Exceeds cross-border monthly limit. Used: {float(self.cross_border_monthly_usage)}, Limit: {float(self.cross_border_monthly_limit)}'}
+            if check_usage and (usage['cross_border_monthly_usage'] + amount_in_primary) > self.cross_border_monthly_limit:
+                return {'allowed': False, 'reason': f"Exceeds cross-border monthly limit. Used: {float(usage['cross_border_monthly_usage'])}, Limit: {float(self.cross_border_monthly_limit)}"}
         else:
             # Check local daily limit
-            if check_usage and (self.daily_usage + amount_in_primary) > self.daily_limit:
-                return {'allowed': False, 'reason': f'Exceeds daily limit. Used: {float(self.daily_usage)}, Limit: {float(self.daily_limit)}'}
+            if check_usage and (usage['daily_usage'] + amount_in_primary) > self.daily_limit:
+                return {'allowed': False, 'reason': f"Exceeds daily limit. Used: {float(usage['daily_usage'])}, Limit: {float(self.daily_limit)}"}
             
             # Check local monthly limit
-            if check_usage and (self.monthly_usage + amount_in_primary) > self.monthly_limit:
-                return {'allowed': False, 'reason': f'Exceeds monthly limit. Used: {float(self.monthly_usage)}, Limit: {float(self.monthly_limit)}'}
+            if check_usage and (usage['monthly_usage'] + amount_in_primary) > self.monthly_limit:
+                return {'allowed': False, 'reason': f"Exceeds monthly limit. Used: {float(usage['monthly_usage'])}, Limit: {float(self.monthly_limit)}"}
         
         return {
             'allowed': True, 
@@ -241,19 +209,19 @@ class Wallet(db.Model):
     
     def record_usage(self, amount, is_cross_border=False):
         """Record usage for limit tracking"""
-        amount = Decimal(str(amount)).quantize(Decimal('0.01'))
+        from app.services.velocity_counters import VelocityCounters
+        from app.services.usage_aggregates import UsageAggregates
         
-        if is_cross_border:
-            self.cross_border_daily_usage += amount
-            self.cross_border_monthly_usage += amount
-        else:
-            self.daily_usage += amount
-            self.monthly_usage += amount
+        VelocityCounters.record(self.id, amount, is_cross_border)
+        UsageAggregates.record(self.user_id, amount, self.primary_currency)
         
         self.last_transaction_at = datetime.now(timezone.utc)
         self.version += 1
     
-    def to_dict(self, include_user=False):
+    def to_dict(self, include_user=False, include_usage=False, usage=None):
+        # Usage costs a counter query, so it is opt-in or preloaded for a page of wallets (VelocityCounters.usage_many)
+        if include_usage and usage is None:
+            usage = self.get_usage()
         data = {
             'id': self.id,
             'user_id': self.user_id,
@@ -268,10 +236,6 @@ class Wallet(db.Model):
             'monthly_limit': float(self.monthly_limit),
             'cross_border_daily_limit': float(self.cross_border_daily_limit),
             'cross_border_monthly_limit': float(self.cross_border_monthly_limit),
-            'daily_usage': float(self.daily_usage),
-            'monthly_usage': float(self.monthly_usage),
-            'cross_border_daily_usage': float(self.cross_border_daily_usage),
-            'cross_border_monthly_usage': float(self.cross_border_monthly_usage),
             'risk_score': self.risk_score,
             'version': self.version,
             'ledger_version': self.ledger_version,
@@ -281,6 +245,12 @@ class Wallet(db.Model):
             'last_screened_at': self.last_screened_at.isoformat() if self.last_screened_at else None
         }
         
+        if usage is not None:
+            data['daily_usage'] = float(usage['daily_usage'])
+            data['monthly_usage'] = float(usage['monthly_usage'])
+            data['cross_border_daily_usage'] = float(usage['cross_border_daily_usage'])
+            data['cross_border_monthly_usage'] = float(usage['cross_border_monthly_usage'])
+        
         if include_user and self.user:
             data['user'] = self.user.to_dict()
         
@@ -0,0 +1,34 @@
+from decimal import Decimal
+from ..extensions import db
+
+
+class WalletVelocityCounter(db.Model):
+    """Debit volume of one wallet within one time bucket (minute, hour or day, UTC-aligned)"""
+    __tablename__ = 'wallet_velocity_counters'
+    
+    wallet_id = db.Column(db.Integer, db.ForeignKey('wallets.id', ondelete='CASCADE'), primary_key=True)
+    scope = db.Column(db.String(20), primary_key=True)  # 'local', 'cross_border'
+    granularity = db.Column(db.String(10), primary_key=True)  # 'minute', 'hour', 'day'
+    bucket_start = db.Column(db.DateTime(timezone=True), primary_key=True)
+    
+    # Totals in the wallet's primary currency
+    amount = db.Column(db.Numeric(14, 2), default=Decimal('0.00'), nullable=False)
+    count = db.Column(db.Integer, default=0, nullable=False)
+    
+    # Indexes
+    __table_args__ = (
+        db.Index('idx_wallet_velocity_counters_expiry', 'granularity', 'bucket_start'),
+    )
+    
+    def to_dict(self):
+        return {
+            'wallet_id': self.wallet_id,
+            'scope': self.scope,
+            'granularity': self.granularity,
+            'bucket_start': self.bucket_start.isoformat() if self.bucket_start else None,
+            'amount': float(self.amount),
+            'count': self.count
+        }
+    
+    def __repr__(self):
+        return f'<WalletVelocityCounter wallet_id={self.wallet_id} {self.scope}/{self.granularity}@{self.bucket_start} amount={self.amount}>'
@@ -0,0 +1,123 @@
+# pagination.py
+import json
+import math
+from flask import current_app
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import ClauseElement, Executable
+from .cache import TTLCache
+from .extensions import db
+
+# How a page's total is found: COUNT(*), an estimate, or not at all
+PAGINATION_MODES = ('exact', 'estimate', 'none')
+
+
+class _Explain(Executable, ClauseElement):
+    """EXPLAIN (FORMAT JSON) of a select, with its bind parameters processed as usual"""
+
+    inherit_cache = False
+
+    def __init__(self, statement):
+        self.statement = statement
+
+
+@compiles(_Explain, 'postgresql')
+def _compile_explain(element, compiler, **kw):
+    return 'EXPLAIN (FORMAT JSON) ' + compiler.process(element.statement, **kw)
+
+
+class Page:
+    """One page of a query; total and pages are None when the mode did not count"""
+
+    def __init__(self, items, page, per_page, total, has_more, mode, estimated=False):
+        self.items = items
+        self.page = page
+        self.per_page = per_page
+        self.total = total
+        self.has_more = has_more
+        self.mode = mode
+        self.estimated = estimated
+
+    @property
+    def pages(self):
+        if self.total is None:
+            return None
+        return math.ceil(self.total / self.per_page) if self.per_page else 0
+
+    def to_dict(self):
+        return {
+            'total': self.total,
+            'pages': self.pages,
+            'current_page': self.page,
+            'has_more': self.has_more,
+            'total_is_estimate': self.estimated
+        }
+
+
+class CountCache:
+    """Exact counts of filtered queries, reused for PAGINATION_COUNT_CACHE_TTL seconds"""
+
+    _entries = TTLCache('PAGINATION_COUNT_CACHE_TTL', 60, 'PAGINATION_COUNT_CACHE_SIZE', 1000)
+
+    @classmethod
+    def get(cls, query):
+        statement = query.order_by(None).statement.compile(dialect=db.engine.dialect)
+        key = (str(statement), repr(sorted(statement.params.items())))
+
+        total = cls._entries.get(key)
+        if total is None:
+            total = query.order_by(None).count()
+            cls._entries.set(key, total)
+
+        return total
+
+    @classmethod
+    def clear(cls):
+        cls._entries.clear()
+
+
+def planner_estimate(query):
+    """Rows PostgreSQL's planner expects query to return, from table statistics"""
+    plan = db.session.execute(_Explain(query.order_by(None).statement)).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+def paginate(query, page=1, per_page=20, mode='exact'):
+    """Fetch one page of query, finding its total as mode says.
+
+    Every mode fetches per_page + 1 rows, so has_more is always exact, and on
+    the last page the total is known without counting. Otherwise 'exact' runs
+    COUNT(*); 'estimate' takes the planner's row estimate on PostgreSQL (counting
+    exactly when it is under PAGINATION_EXACT_COUNT_BELOW) and a cached count
+    elsewhere; 'none' leaves total and pages unset.
+    """
+    if mode not in PAGINATION_MODES:
+        raise ValueError(f"Unknown count mode: {mode}; expected one of {', '.join(PAGINATION_MODES)}")
+
+    page = max(page or 1, 1)
+    per_page = max(per_page or 1, 1)
+    offset = (page - 1) * per_page
+
+    rows = query.limit(per_page + 1).offset(offset).all()
+    items, has_more = rows[:per_page], len(rows) > per_page
+
+    if not has_more and (items or page == 1):
+        return Page(items, page, per_page, offset + len(items), False, mode)
+
+    if mode == 'none':
+        return Page(items, page, per_page, None, has_more, mode)
+
+    if mode == 'exact':
+        return Page(items, page, per_page, query.order_by(None).count(), has_more, mode)
+
+    # A non-empty page bounds the total from below
+    seen = offset + len(items) + (1 if has_more else 0) if items else 0
+
+    if db.engine.dialect.name == 'postgresql':
+        estimate = planner_estimate(query)
+        if estimate < current_app.config.get('PAGINATION_EXACT_COUNT_BELOW', 1000):
+            return Page(items, page, per_page, query.order_by(None).count(), has_more, mode)
+        return Page(items, page, per_page, max(estimate, seen), has_more, mode, estimated=True)
+
+    return Page(items, page, per_page, max(CountCache.get(query), seen), has_more, mode, estimated=True)
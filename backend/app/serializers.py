@@ -0,0 +1,351 @@
+# serializers.py
+from sqlalchemy.orm import contains_eager, joinedload, load_only, selectinload
+
+
+def parse_fields(value):
+    """The fields= query parameter as a list of keys, or None when absent"""
+    names = [name.strip() for name in (value or '').split(',') if name.strip()]
+    return names or None
+
+
+class Serializer:
+    """Turns model instances into response dicts, loading what they read up front.
+
+    A serializer declares the relationships its output touches in loader_options(),
+    for the include flags it was built with. List endpoints pass their query through
+    apply() before paginating, so those relationships arrive with the page rather
+    than through one lazy load per row.
+
+    fields, when given, limits the response to those keys of available_fields();
+    subclasses use wants() to load only the columns and relationships behind them.
+    Unknown keys raise ValueError.
+    """
+
+    def __init__(self, fields=None, **include):
+        self.include = include
+        self.only = None
+
+        if fields is not None:
+            unknown = set(fields) - set(self.available_fields())
+            if unknown:
+                raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+            self.only = frozenset(fields)
+
+    def available_fields(self):
+        return []
+
+    def wants(self, key):
+        return self.only is None or key in self.only
+
+    def loader_options(self):
+        return []
+
+    def apply(self, query):
+        options = self.loader_options()
+        return query.options(*options) if options else query
+
+    def preload(self, instances):
+        """Batch-load, for a whole page, anything loader options cannot (e.g. dynamic relationships)"""
+        pass
+
+    def dump(self, instance):
+        return instance.to_dict(**self.include)
+
+    def dump_many(self, instances):
+        instances = list(instances)
+        self.preload(instances)
+        return [self.dump(instance) for instance in instances]
+
+
+class TransactionSerializer(Serializer):
+    """Transaction.to_dict; with include_wallets, both parties' wallets and users are joined in"""
+
+    def __init__(self, include_wallets=True, include_ledger=False):
+        super().__init__(include_wallets=include_wallets, include_ledger=include_ledger)
+
+    def loader_options(self):
+        from .models import Transaction, Wallet
+
+        if not self.include['include_wallets']:
+            return []
+
+        # Many-to-one, so joining keeps one row per transaction and LIMIT intact
+        return [
+            joinedload(Transaction.sender_wallet).joinedload(Wallet.user),
+            joinedload(Transaction.receiver_wallet).joinedload(Wallet.user)
+        ]
+
+
+class KYCVerificationSerializer(Serializer):
+    """KYCVerification.to_dict plus the submitting user; the query must already join User"""
+
+    def __init__(self, include_user=True):
+        super().__init__()
+        self.include_user = include_user
+
+    def loader_options(self):
+        from .models import KYCVerification
+
+        return [contains_eager(KYCVerification.user)] if self.include_user else []
+
+    def dump(self, instance):
+        data = instance.to_dict()
+        if self.include_user:
+            data['user'] = instance.user.to_dict()
+        return data
+
+
+# Wallet.to_dict() keys read straight from a column, and the usage it adds on request
+WALLET_COLUMNS = (
+    'id', 'user_id', 'balance', 'available_balance', 'locked_balance', 'currency_balances',
+    'primary_currency', 'supported_currencies', 'status', 'daily_limit', 'monthly_limit',
+    'cross_border_daily_limit', 'cross_border_monthly_limit', 'risk_score', 'version',
+    'ledger_version', 'created_at', 'updated_at', 'last_transaction_at', 'last_screened_at'
+)
+WALLET_USAGE = ('daily_usage', 'monthly_usage', 'cross_border_daily_usage', 'cross_border_monthly_usage')
+
+
+class WalletSerializer(Serializer):
+    """Wallet.to_dict with usage from one grouped counter query per page; the query must already join User.
+
+    With fields, only the wallet columns asked for are loaded (load_only) and the
+    dict is built from them directly, leaving conversion to the JSON provider.
+    """
+
+    def __init__(self, include_user=True, fields=None):
+        super().__init__(fields=fields, include_user=include_user)
+        self.usage = {}
+
+    def available_fields(self):
+        return WALLET_COLUMNS + WALLET_USAGE + (('user',) if self.include['include_user'] else ())
+
+    def loader_options(self):
+        from .models import Wallet
+
+        options = []
+        if self.only is not None:
+            options.append(load_only(*[getattr(Wallet, key) for key in WALLET_COLUMNS if key in self.only or key == 'id']))
+        if self.include['include_user'] and self.wants('user'):
+            options.append(contains_eager(Wallet.user))
+        return options
+
+    def preload(self, instances):
+        from .services.velocity_counters import VelocityCounters, LIMIT_WINDOWS
+
+        if not any(self.wants(key) for key in WALLET_USAGE):
+            return
+
+        usage = VelocityCounters.usage_many([wallet.id for wallet in instances], LIMIT_WINDOWS)
+        self.usage = {
+            wallet_id: {name: totals.amount for name, totals in windows.items()}
+            for wallet_id, windows in usage.items()
+        }
+
+    def dump(self, instance):
+        if self.only is None:
+            return instance.to_dict(include_usage=True, usage=self.usage.get(instance.id), **self.include)
+
+        data = {key: getattr(instance, key) for key in WALLET_COLUMNS if key in self.only}
+        for key in WALLET_USAGE:
+            if key in self.only:
+                data[key] = self.usage[instance.id][key]
+        if 'user' in self.only and instance.user:
+            data['user'] = instance.user.to_dict()
+        return data
+
+
+class UserSerializer(Serializer):
+    """User.to_dict with wallets, KYC and account links loaded for the whole page"""
+
+    def __init__(self, include_wallet=False, include_kyc=False, include_accounts=False):
+        super().__init__(include_wallet=include_wallet, include_kyc=include_kyc, include_accounts=include_accounts)
+        self.wallets = WalletSerializer(include_user=False)
+        self.account_links = {}
+
+    def loader_options(self):
+        from .models import User
+
+        options = []
+        if self.include['include_wallet']:
+            options.append(selectinload(User.wallet))
+        if self.include['include_kyc']:
+            options.append(selectinload(User.kyc_verification))
+        return options
+
+    def preload(self, instances):
+        from .models import UserAccount
+
+        if self.include['include_wallet']:
+            self.wallets.preload([user.wallet for user in instances if user.wallet])
+
+        if self.include['include_accounts']:
+            self.account_links = {user.id: [] for user in instances}
+            if self.account_links:
+                links = UserAccount.query.options(joinedload(UserAccount.account)).filter(
+                    UserAccount.user_id.in_(self.account_links)
+                ).order_by(UserAccount.id).all()
+                for link in links:
+                    self.account_links[link.user_id].append(link)
+
+    def dump(self, instance):
+        wallet_usage = None
+        if self.include['include_wallet'] and instance.wallet:
+            wallet_usage = self.wallets.usage.get(instance.wallet.id)
+
+        return instance.to_dict(
+            wallet_usage=wallet_usage,
+            account_links=self.account_links.get(instance.id),
+            **self.include
+        )
+
+
+class ProjectedSerializer(Serializer):
+    """Builds response dicts from selected columns instead of ORM instances.
+
+    apply() swaps the query's entities for the columns listed by projection(), so
+    a page comes back as plain rows and dump() is a zip plus the few conversions
+    in field_converters(). Values stay datetime, Decimal, Enum or UUID for the JSON
+    provider to encode, so the JSON matches to_dict() without per-field
+    isoformat()/float(). With fields, only the columns behind them are selected.
+    """
+
+    def __init__(self, fields=None, **include):
+        super().__init__(fields=fields, **include)
+        selected = [(key, column) for key, column in self.projection() if self.wants(key)]
+        self.keys = tuple(key for key, _ in selected)
+        self.selected = [column for _, column in selected]
+
+        converters = self.field_converters()
+        self.converters = tuple(
+            (index, converters[key]) for index, key in enumerate(self.keys) if key in converters
+        )
+
+    def projection(self):
+        """(key, column) pairs, in output order"""
+        return []
+
+    def available_fields(self):
+        return [key for key, _ in self.projection()]
+
+    def field_converters(self):
+        return {}
+
+    def columns(self):
+        return list(self.selected)
+
+    def apply(self, query):
+        return query.with_entities(*self.columns())
+
+    def dump(self, row):
+        data = dict(zip(self.keys, row))
+        for index, convert in self.converters:
+            data[self.keys[index]] = convert(row[index])
+        return data
+
+
+# Transaction.to_dict() keys and the columns behind them
+TRANSACTION_FIELDS = (
+    'id', 'sender_wallet_id', 'receiver_wallet_id', 'external_sender', 'external_receiver',
+    'amount', 'fee', 'net_amount', 'source_currency', 'target_currency', 'fx_rate', 'fx_provider',
+    'fx_timestamp', 'source_country', 'destination_country', 'is_cross_border', 'transaction_type',
+    'status', 'provider', 'reference', 'external_reference', 'idempotency_key', 'debit_status',
+    'credit_status', 'settlement_status', 'settlement_date', 'settlement_reference', 'failure_domain',
+    'failure_reason', 'failure_code', 'reporting_category', 'is_reportable', 'reported_at',
+    'sequence_number', 'metadata', 'channel', 'ip_address', 'device_id', 'original_transaction_id',
+    'reversal_reason', 'refund_reason', 'is_reversal', 'is_refund', 'funding_source_id',
+    'payout_destination_id', 'created_at', 'initiated_at', 'processed_at', 'completed_at',
+    'reversed_at', 'expired_at'
+)
+
+# Party details to_dict(include_wallets=True) nests under 'sender' and 'receiver'
+PARTY_FIELDS = ('user_id', 'username', 'phone_number', 'first_name', 'last_name', 'country_code')
+
+
+class TransactionRowSerializer(ProjectedSerializer):
+    """Transaction.to_dict(include_wallets=...) output from one joined, column-projected query.
+
+    The sender and receiver joins are only made for the parties in fields.
+    """
+
+    def __init__(self, include_wallets=True, fields=None):
+        from sqlalchemy.orm import aliased
+        from .models import Wallet, User
+
+        super().__init__(fields=fields, include_wallets=include_wallets)
+        self.parties = {}
+        if include_wallets:
+            for party in ('sender', 'receiver'):
+                if self.wants(party):
+                    self.parties[party] = (
+                        aliased(Wallet, name=f'{party}_wallet'),
+                        aliased(User, name=f'{party}_user')
+                    )
+
+    def projection(self):
+        from .models import Transaction
+
+        return [
+            (key, Transaction.meta_data if key == 'metadata' else getattr(Transaction, key))
+            for key in TRANSACTION_FIELDS
+        ]
+
+    def available_fields(self):
+        return super().available_fields() + (['sender', 'receiver'] if self.include['include_wallets'] else [])
+
+    def field_converters(self):
+        # to_dict() reports a zero rate as missing
+        return {'fx_rate': lambda value: value or None}
+
+    def columns(self):
+        columns = super().columns()
+        for _, user in self.parties.values():
+            columns.extend(getattr(user, 'id' if name == 'user_id' else name) for name in PARTY_FIELDS)
+        return columns
+
+    def apply(self, query):
+        from .models import Transaction
+
+        for party, (wallet, user) in self.parties.items():
+            query = query.outerjoin(
+                wallet, getattr(Transaction, f'{party}_wallet_id') == wallet.id
+            ).outerjoin(
+                user, wallet.user_id == user.id
+            )
+
+        return super().apply(query)
+
+    def dump(self, row):
+        offset = len(self.keys)
+        data = super().dump(row[:offset])
+
+        for party in self.parties:
+            user_id, username, phone_number, first_name, last_name, country_code = row[offset:offset + len(PARTY_FIELDS)]
+            offset += len(PARTY_FIELDS)
+
+            if user_id is not None:
+                data[party] = {
+                    'user_id': user_id,
+                    'username': username,
+                    'phone_number': phone_number,
+                    'full_name': f"{first_name} {last_name}",
+                    'country_code': country_code
+                }
+
+        return data
+
+
+# AuditLog.to_dict() keys; all are columns
+AUDIT_LOG_FIELDS = (
+    'id', 'actor_id', 'actor_type', 'action', 'resource_type', 'resource_id', 'old_values',
+    'new_values', 'status', 'actor_ip', 'request_id', 'endpoint', 'http_method', 'error_message',
+    'created_at'
+)
+
+
+class AuditLogRowSerializer(ProjectedSerializer):
+    """AuditLog.to_dict output from projected columns"""
+
+    def projection(self):
+        from .models import AuditLog
+
+        return [(key, getattr(AuditLog, key)) for key in AUDIT_LOG_FIELDS]
@@ -1,95 +1,77 @@
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from decimal import Decimal
 from sqlalchemy import func, extract, and_
 from ..extensions import db
-from ..models import User, Wallet, Transaction, AuditLog
+from ..models import User, Wallet, Transaction, SuspiciousActivity
 from ..models.enums import TransactionStatus, KYCStatus
+from .suspicious_activity import SuspiciousActivityDetector
+from .transaction_rollups import TransactionRollups
+from .corridor_analytics import CorridorAnalytics
 
 class AnalyticsService:
     
     @staticmethod
     def get_system_analytics():
         """
-        Get overall system analytics for admin dashboard
+        Get overall system analytics for admin dashboard, in one aggregate query per table
         """
-        # User statistics
-        total_users = User.query.count()
-        active_users = User.query.filter_by(is_active=True).count()
-        new_users_today = User.query.filter(
-            User.created_at >= datetime.utcnow().date()
-        ).count()
-        
-        # KYC statistics
-        kyc_verified = User.query.filter_by(kyc_status=KYCStatus.verified).count()
-        kyc_pending = User.query.filter_by(kyc_status=KYCStatus.pending).count()
-        kyc_rejected = User.query.filter_by(kyc_status=KYCStatus.rejected).count()
+        today_start = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+        thirty_days_ago = datetime.now(timezone.utc) - timedelta(days=30)
+        
+        # User and KYC statistics
+        users = db.session.query(
+            func.count(User.id),
+            func.count(User.id).filter(User.is_active == True),
+            func.count(User.id).filter(User.created_at >= today_start),
+            func.count(User.id).filter(User.kyc_status == KYCStatus.verified),
+            func.count(User.id).filter(User.kyc_status == KYCStatus.pending),
+            func.count(User.id).filter(User.kyc_status == KYCStatus.rejected)
+        ).one()
         
         # Wallet statistics
-        total_wallets = Wallet.query.count()
-        total_balance = db.session.query(func.sum(Wallet.balance)).scalar() or Decimal('0.00')
-        avg_balance = db.session.query(func.avg(Wallet.balance)).scalar() or Decimal('0.00')
-        
-        # Transaction statistics (last 30 days)
-        thirty_days_ago = datetime.utcnow() - timedelta(days=30)
-        
-        total_transactions = Transaction.query.filter(
-            Transaction.created_at >= thirty_days_ago
-        ).count()
-        
-        completed_transactions = Transaction.query.filter(
-            Transaction.status == TransactionStatus.completed,
-            Transaction.created_at >= thirty_days_ago
-        ).count()
-        
-        total_volume = db.session.query(func.sum(Transaction.amount)).filter(
-            Transaction.status == TransactionStatus.completed,
-            Transaction.created_at >= thirty_days_ago
-        ).scalar() or Decimal('0.00')
-        
-        total_fees = db.session.query(func.sum(Transaction.fee)).filter(
-            Transaction.status == TransactionStatus.completed,
+        wallets = db.session.query(
+            func.count(Wallet.id),
+            func.sum(Wallet.balance),
+            func.avg(Wallet.balance)
+        ).one()
+        
+        # Transaction statistics (last 30 days, and today within them)
+        completed = Transaction.status == TransactionStatus.completed
+        today = Transaction.created_at >= today_start
+        transactions = db.session.query(
+            func.count(Transaction.id),
+            func.count(Transaction.id).filter(completed),
+            func.sum(Transaction.amount).filter(completed),
+            func.sum(Transaction.fee).filter(completed),
+            func.count(Transaction.id).filter(today),
+            func.sum(Transaction.amount).filter(completed, today),
+            func.sum(Transaction.fee).filter(completed, today)
+        ).filter(
             Transaction.created_at >= thirty_days_ago
-        ).scalar() or Decimal('0.00')
-        
-        # Today's statistics
-        today_start = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
-        
-        today_transactions = Transaction.query.filter(
-            Transaction.created_at >= today_start
-        ).count()
-        
-        today_volume = db.session.query(func.sum(Transaction.amount)).filter(
-            Transaction.status == TransactionStatus.completed,
-            Transaction.created_at >= today_start
-        ).scalar() or Decimal('0.00')
-        
-        today_fees = db.session.query(func.sum(Transaction.fee)).filter(
-            Transaction.status == TransactionStatus.completed,
-            Transaction.created_at >= today_start
-        ).scalar() or Decimal('0.00')
+        ).one()
         
         return {
             'users': {
-                'total': total_users,
-                'active': active_users,
-                'new_today': new_users_today,
-                'kyc_verified': kyc_verified,
-                'kyc_pending': kyc_pending,
-                'kyc_rejected': kyc_rejected
+                'total': users[0],
+                'active': users[1],
+                'new_today': users[2],
+                'kyc_verified': users[3],
+                'kyc_pending': users[4],
+                'kyc_rejected': users[5]
             },
             'wallets': {
-                'total': total_wallets,
-                'total_balance': float(total_balance),
-                'average_balance': float(avg_balance)
+                'total': wallets[0],
+                'total_balance': float(wallets[1] or Decimal('0.00')),
+                'average_balance': float(wallets[2] or Decimal('0.00'))
             },
             'transactions': {
-                'total_last_30_days': total_transactions,
-                'completed_last_30_days': completed_transactions,
-                'volume_last_30_days': float(total_volume),
-                'fees_last_30_days': float(total_fees),
-                'today_count': today_transactions,
-                'today_volume': float(today_volume),
-                'today_fees': float(today_fees)
+                'total_last_30_days': transactions[0],
+                'completed_last_30_days': transactions[1],
+                'volume_last_30_days': float(transactions[2] or Decimal('0.00')),
+                'fees_last_30_days': float(transactions[3] or Decimal('0.00')),
+                'today_count': transactions[4],
+                'today_volume': float(transactions[5] or Decimal('0.00')),
+                'today_fees': float(transactions[6] or Decimal('0.00'))
             }
         }
     
@@ -101,33 +83,9 @@ class AnalyticsService:
         end_date = datetime.utcnow()
         start_date = end_date - timedelta(days=days)
         
-        # Group by day
-        daily_profits = db.session.query(
-            func.date(Transaction.created_at).label('date'),
-            func.sum(Transaction.fee).label('total_fees'),
-            func.count(Transaction.id).label('transaction_count'),
-            func.sum(Transaction.amount).label('total_volume')
-        ).filter(
-            Transaction.status == TransactionStatus.completed,
-            Transaction.created_at >= start_date,
-            Transaction.created_at <= end_date
-        ).group_by(
-            func.date(Transaction.created_at)
-        ).order_by(
-            func.date(Transaction.created_at)
-        ).all()
-        
-        # Group by transaction type
-        profit_by_type = db.session.query(
-            Transaction.transaction_type,
-            func.sum(Transaction.fee).label('total_fees'),
-            func.count(Transaction.id).label('transaction_count')
-        ).filter(
-            Transaction.status == TransactionStatus.completed,
-            Transaction.created_at >= start_date
-        ).group_by(
-            Transaction.transaction_type
-        ).all()
+        # Daily and per-type totals come from the rollups, whole UTC days
+        daily_profits = TransactionRollups.totals(start_date.date(), end_date.date(), group_by=('day',))
+        profit_by_type = TransactionRollups.totals(start_date.date(), end_date.date(), group_by=('transaction_type',))
         
         # Top performing users (by fees generated)
         top_users = db.session.query(
@@ -152,18 +110,18 @@ class AnalyticsService:
         return {
             'daily_trends': [
                 {
-                    'date': row.date.isoformat() if row.date else None,
-                    'total_fees': float(row.total_fees or 0),
-                    'transaction_count': row.transaction_count or 0,
-                    'total_volume': float(row.total_volume or 0)
+                    'date': row.day.isoformat() if row.day else None,
+                    'total_fees': float(row.fee or 0),
+                    'transaction_count': row.count or 0,
+                    'total_volume': float(row.amount or 0)
                 }
                 for row in daily_profits
             ],
             'by_transaction_type': [
                 {
-                    'type': row.transaction_type.value,
-                    'total_fees': float(row.total_fees or 0),
-                    'transaction_count': row.transaction_count or 0
+                    'type': row.transaction_type,
+                    'total_fees': float(row.fee or 0),
+                    'transaction_count': row.count or 0
                 }
                 for row in profit_by_type
             ],
@@ -185,69 +143,66 @@ class AnalyticsService:
         }
     
     @staticmethod
-    def get_suspicious_activities():
+    def get_corridor_analytics(days=30, source_country=None, destination_country=None, by_day=False):
         """
-        Detect and return suspicious activities
+        Volume, fees, failure rate, FX spread and settlement latency per corridor, from the rollups
         """
-        # Large transactions (above 100,000)
-        threshold_amount = 100000
-        last_24_hours = datetime.utcnow() - timedelta(hours=24)
-        
-        large_transactions = Transaction.query.filter(
-            Transaction.amount >= threshold_amount,
-            Transaction.created_at >= last_24_hours
-        ).order_by(
-            Transaction.amount.desc()
-        ).limit(50).all()
-        
-        # Multiple transactions from same user in short time
-        suspicious_users = db.session.query(
-            Transaction.sender_wallet_id,
-            func.count(Transaction.id).label('tx_count'),
-            func.sum(Transaction.amount).label('total_amount')
-        ).filter(
-            Transaction.created_at >= last_24_hours
-        ).group_by(
-            Transaction.sender_wallet_id
-        ).having(
-            func.count(Transaction.id) > 10  # More than 10 transactions in 24 hours
-        ).all()
+        end_date = datetime.now(timezone.utc).date()
+        start_date = end_date - timedelta(days=days)
         
-        # Failed login attempts
-        failed_logins = AuditLog.query.filter(
-            AuditLog.action == 'login.failed',
-            AuditLog.created_at >= last_24_hours
-        ).order_by(
-            AuditLog.created_at.desc()
-        ).limit(100).all()
+        return {
+            'corridors': CorridorAnalytics.report(
+                start_date,
+                end_date,
+                by_day=by_day,
+                source_country=source_country,
+                destination_country=destination_country
+            ),
+            'period': {
+                'start_date': start_date.isoformat(),
+                'end_date': end_date.isoformat(),
+                'days': days
+            }
+        }
+    
+    @staticmethod
+    def get_suspicious_activities():
+        """
+        Suspicious activities detected in the last window, read from suspicious_activities
+        """
+        large_transactions = SuspiciousActivityDetector.recent(
+            'large_transaction', limit=50, order_by=SuspiciousActivity.amount.desc()
+        )
+        suspicious_users = SuspiciousActivityDetector.recent('high_frequency')
+        failed_logins = SuspiciousActivityDetector.recent('failed_login', limit=100)
         
         return {
             'large_transactions': [
                 {
-                    'transaction_id': tx.id,
-                    'amount': float(tx.amount),
-                    'user_id': tx.sender_wallet.user_id if tx.sender_wallet else None,
-                    'timestamp': tx.created_at.isoformat() if tx.created_at else None,
-                    'status': tx.status.value
+                    'transaction_id': activity.transaction_id,
+                    'amount': float(activity.amount),
+                    'user_id': activity.user_id,
+                    'timestamp': activity.first_seen_at.isoformat() if activity.first_seen_at else None,
+                    'status': status.value if status else None
                 }
-                for tx in large_transactions
+                for activity, status in large_transactions
             ],
             'suspicious_users': [
                 {
-                    'wallet_id': row.sender_wallet_id,
-                    'user_id': Wallet.query.get(row.sender_wallet_id).user_id if row.sender_wallet_id else None,
-                    'transaction_count': row.tx_count,
-                    'total_amount': float(row.total_amount or 0)
+                    'wallet_id': activity.wallet_id,
+                    'user_id': activity.user_id,
+                    'transaction_count': activity.count,
+                    'total_amount': float(activity.amount)
                 }
-                for row in suspicious_users
+                for activity, _ in suspicious_users
             ],
             'failed_logins': [
                 {
-                    'actor_id': log.actor_id,
-                    'actor_ip': log.actor_ip,
-                    'timestamp': log.created_at.isoformat() if log.created_at else None,
-                    'error_message': log.error_message
+                    'actor_id': activity.user_id,
+                    'actor_ip': activity.actor_ip,
+                    'timestamp': activity.last_seen_at.isoformat() if activity.last_seen_at else None,
+                    'error_message': (activity.details or {}).get('error_message')
                 }
-                for log in failed_logins
+                for activity, _ in failed_logins
             ]
         }
\ No newline at end of file
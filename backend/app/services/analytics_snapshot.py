@@ -0,0 +1,140 @@
+# services/analytics_snapshot.py
+import threading
+import time
+from datetime import datetime, timezone
+from flask import current_app, has_app_context
+from ..extensions import db
+
+
+class AnalyticsSnapshot:
+    """Process-local snapshot of AnalyticsService.get_system_analytics.
+
+    A daemon thread rebuilds the snapshot every ANALYTICS_SNAPSHOT_INTERVAL seconds.
+    Readers get the current snapshot; once it is older than ANALYTICS_SNAPSHOT_MAX_AGE
+    they schedule a rebuild and keep serving the old one until it lands. Only the
+    very first read waits for the database, and at most one rebuild runs at a time
+    however many dashboards are open.
+    """
+
+    _app = None
+    _thread = None
+    _stop = threading.Event()
+    _lock = threading.Lock()
+    _build_lock = threading.Lock()
+    _snapshot = None
+    _in_flight = False
+
+    @classmethod
+    def init_app(cls, app):
+        cls._app = app
+
+        if app.config.get('ANALYTICS_REFRESH_ON_CREATE_APP', False) and not app.testing:
+            cls.start()
+
+    @classmethod
+    def start(cls):
+        with cls._lock:
+            if cls._thread and cls._thread.is_alive():
+                return
+
+            cls._stop.clear()
+            cls._thread = threading.Thread(target=cls._run, name='analytics-snapshot', daemon=True)
+            cls._thread.start()
+
+    @classmethod
+    def stop(cls):
+        cls._stop.set()
+
+    @classmethod
+    def get(cls):
+        """System analytics plus a 'snapshot' entry with when they were computed"""
+        app = cls._get_app()
+        snapshot = cls._snapshot
+
+        if snapshot is None:
+            snapshot = cls.refresh(app)
+        elif time.monotonic() - snapshot['built_at'] > app.config.get('ANALYTICS_SNAPSHOT_MAX_AGE', 120):
+            cls.request_refresh(app)
+            snapshot = cls._snapshot or snapshot
+
+        return {
+            **snapshot['data'],
+            'snapshot': {
+                'generated_at': snapshot['generated_at'].isoformat(),
+                'age_seconds': round(time.monotonic() - snapshot['built_at'], 3)
+            }
+        }
+
+    @classmethod
+    def request_refresh(cls, app=None):
+        """Rebuild in the background unless a rebuild is already running"""
+        app = app or cls._get_app()
+
+        with cls._lock:
+            if cls._in_flight:
+                return
+            cls._in_flight = True
+
+        if app.config.get('ANALYTICS_REFRESH_ASYNC', True):
+            threading.Thread(target=cls._refresh_claimed, args=(app,), daemon=True).start()
+        else:
+            cls._refresh_claimed(app)
+
+    @classmethod
+    def refresh(cls, app=None):
+        """Rebuild now; callers arriving during a rebuild wait for it instead of starting another"""
+        app = app or cls._get_app()
+        started = time.monotonic()
+
+        with cls._build_lock:
+            snapshot = cls._snapshot
+            if snapshot is not None and snapshot['built_at'] >= started:
+                return snapshot
+
+            from .analytics_service import AnalyticsService
+
+            if has_app_context():
+                data = AnalyticsService.get_system_analytics()
+            else:
+                with app.app_context():
+                    try:
+                        data = AnalyticsService.get_system_analytics()
+                    finally:
+                        db.session.remove()
+
+            snapshot = {
+                'data': data,
+                'built_at': time.monotonic(),
+                'generated_at': datetime.now(timezone.utc)
+            }
+            cls._snapshot = snapshot
+
+        return snapshot
+
+    @classmethod
+    def invalidate(cls):
+        cls._snapshot = None
+
+    @classmethod
+    def _refresh_claimed(cls, app):
+        try:
+            cls.refresh(app)
+        except Exception as e:
+            app.logger.error(f"Analytics snapshot refresh failed: {str(e)}")
+        finally:
+            with cls._lock:
+                cls._in_flight = False
+
+    @classmethod
+    def _run(cls):
+        app = cls._app
+        interval = app.config.get('ANALYTICS_SNAPSHOT_INTERVAL', 60)
+
+        while True:
+            cls.request_refresh(app)
+            if cls._stop.wait(interval):
+                break
+
+    @classmethod
+    def _get_app(cls):
+        return cls._app or current_app._get_current_object()
@@ -0,0 +1,120 @@
+# services/beneficiary_search.py
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from ..cache import TTLCache
+from ..extensions import db
+from ..models import Beneficiary, User, Wallet
+from .user_search import UserSearch
+
+SEARCH_LIMIT = 20
+
+
+class BeneficiarySearch:
+    """Type-ahead search for users to add as beneficiaries.
+
+    A search is two queries whatever the number of results: active users with a
+    wallet, ranked by UserSearch, and one IN query for which of their wallets
+    the searching user already has as beneficiaries.
+
+    Results are cached per (user, term) for BENEFICIARY_SEARCH_TTL seconds. When
+    a shorter prefix of the term was cached with fewer than SEARCH_LIMIT results,
+    it already holds every match of the longer term, so the next keystrokes are
+    answered by filtering it (keeping its ranking) without a query. A user's
+    entries are dropped when they add or remove a beneficiary.
+    """
+
+    _entries = TTLCache('BENEFICIARY_SEARCH_TTL', 30, 'BENEFICIARY_SEARCH_CACHE_SIZE', 5000)
+
+    @classmethod
+    def search(cls, user_id, term):
+        term = UserSearch.normalize(term)
+
+        results = cls._cached(user_id, term)
+        if results is None:
+            results = cls.query(user_id, term)
+            cls._entries.set((user_id, term), results)
+
+        return [result for _, result in results]
+
+    @staticmethod
+    def query(user_id, term):
+        """(search document, result) pairs for term, best matches first"""
+        rows = UserSearch.search(
+            db.session.query(
+                User.id, User.username, User.email, User.phone_number,
+                User.first_name, User.last_name, Wallet.id
+            ).join(Wallet, Wallet.user_id == User.id).filter(
+                User.is_active == True,
+                User.id != user_id
+            ),
+            term
+        ).limit(SEARCH_LIMIT).all()
+
+        existing = set()
+        if rows:
+            existing = {
+                wallet_id for wallet_id, in db.session.query(Beneficiary.beneficiary_wallet_id).filter(
+                    Beneficiary.user_id == user_id,
+                    Beneficiary.beneficiary_wallet_id.in_([row[6] for row in rows])
+                )
+            }
+
+        results = []
+        for found_id, username, email, phone_number, first_name, last_name, wallet_id in rows:
+            # Same text as User.search_document(), for filtering cached results
+            document = ' '.join((email, username, phone_number, first_name, last_name)).lower()
+            results.append((document, {
+                'user_id': found_id,
+                'username': username,
+                'email': email,
+                'phone_number': phone_number,
+                'full_name': f"{first_name} {last_name}",
+                'wallet_id': wallet_id,
+                'is_already_beneficiary': wallet_id in existing
+            }))
+
+        return results
+
+    @classmethod
+    def _cached(cls, user_id, term):
+        # The term itself, then its longest complete prefix
+        for length in range(len(term), 0, -1):
+            results = cls._entries.get((user_id, term[:length]))
+            if results is None:
+                continue
+            if length == len(term):
+                return results
+            if len(results) < SEARCH_LIMIT:
+                return [(document, result) for document, result in results if term in document]
+
+        return None
+
+    @classmethod
+    def invalidate(cls, user_ids=None):
+        if user_ids is None:
+            cls._entries.clear()
+        else:
+            cls._entries.discard_where(lambda key: key[0] in user_ids)
+
+
+@event.listens_for(Session, 'after_flush')
+def _track_beneficiary_changes(session, flush_context):
+    user_ids = {
+        instance.user_id for instance in (*session.new, *session.deleted)
+        if isinstance(instance, Beneficiary)
+    }
+    if user_ids:
+        session.info.setdefault('beneficiary_searches_changed', set()).update(user_ids)
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_beneficiary_searches(session):
+    user_ids = session.info.pop('beneficiary_searches_changed', None)
+    if user_ids:
+        BeneficiarySearch.invalidate(user_ids)
+
+
+@event.listens_for(Session, 'after_soft_rollback')
+def _discard_beneficiary_changes(session, previous_transaction):
+    if not previous_transaction.nested:
+        session.info.pop('beneficiary_searches_changed', None)
@@ -0,0 +1,304 @@
+# services/columnar_export.py
+import json
+import os
+import shutil
+from datetime import datetime, timedelta, timezone
+from enum import Enum
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+from flask import current_app
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import JSONB, UUID
+from ..extensions import db
+from ..models import Transaction, LedgerEntry
+
+# Tables that can be exported, by name
+EXPORT_MODELS = {
+    'transactions': Transaction,
+    'ledger_entries': LedgerEntry
+}
+
+# Output format -> (file extension, streamed content type)
+EXPORT_FORMATS = {
+    'parquet': ('parquet', 'application/vnd.apache.parquet'),
+    'arrow': ('arrow', 'application/vnd.apache.arrow.stream')
+}
+
+WATERMARK_FILE = '_watermark.json'
+
+
+def _arrow_type(column):
+    column_type = column.type
+    if isinstance(column_type, db.Boolean):
+        return pa.bool_()
+    if isinstance(column_type, db.Integer):
+        return pa.int64()
+    if isinstance(column_type, db.Numeric):
+        return pa.decimal128(column_type.precision, column_type.scale)
+    if isinstance(column_type, db.DateTime):
+        return pa.timestamp('us', tz='UTC')
+    if isinstance(column_type, db.Date):
+        return pa.date32()
+    # Strings, enums (their values), UUIDs and JSON documents
+    return pa.string()
+
+
+def _converter(column):
+    """Per-value conversion to what pa.array() takes for the column, or None"""
+    column_type = column.type
+    if isinstance(column_type, db.Enum):
+        return lambda value: value.value if isinstance(value, Enum) else value
+    if isinstance(column_type, UUID):
+        return lambda value: str(value) if value is not None else None
+    if isinstance(column_type, (JSONB, db.JSON)):
+        return lambda value: json.dumps(value, default=str) if value is not None else None
+    if isinstance(column_type, db.DateTime):
+        # SQLite hands back naive UTC datetimes
+        return lambda value: value.replace(tzinfo=timezone.utc) if value is not None and value.tzinfo is None else value
+    return None
+
+
+class _Partition:
+    """One day's output file, written under a temporary name until closed"""
+
+    def __init__(self, path, schema, file_format):
+        self.path = path
+        self.temporary_path = f'{path}.tmp'
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        if file_format == 'parquet':
+            self.sink = None
+            self.writer = pq.ParquetWriter(self.temporary_path, schema, compression='zstd')
+        else:
+            self.sink = pa.OSFile(self.temporary_path, 'wb')
+            self.writer = pa.ipc.new_file(self.sink, schema)
+
+    def write(self, batch):
+        self.writer.write_batch(batch)
+
+    def close(self):
+        self.writer.close()
+        if self.sink is not None:
+            self.sink.close()
+        os.replace(self.temporary_path, self.path)
+
+
+class _ChunkSink:
+    """Write-only file object that hands what was written so far to a streaming response"""
+
+    def __init__(self):
+        self.chunks = []
+        self.position = 0
+        self.closed = False
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self):
+        data = b''.join(self.chunks)
+        self.chunks = []
+        return data
+
+
+class ColumnarExport:
+    """Exports transactions and ledger entries as Parquet or Arrow, in column batches.
+
+    Rows are read in id order through a server-side cursor, EXPORT_BATCH_SIZE at
+    a time, and each batch is converted to an Arrow record batch before the next
+    is fetched, so memory stays bounded by the batch size however large the table.
+
+    export() writes day partitions (<table>/day=YYYY-MM-DD/part-*.parquet) and
+    records the highest exported id in <table>/_watermark.json; the next run only
+    reads rows above it. Ids are the watermark because rows are appended in id
+    order, and upper_bound() holds back rows younger than EXPORT_COMMIT_LAG so a
+    late commit below the watermark is not skipped. Later updates to already
+    exported transactions are not re-exported unless full=True, which rewrites
+    the table's directory. stream() produces a single file for the admin endpoint.
+    """
+
+    @staticmethod
+    def get_model(table):
+        if table not in EXPORT_MODELS:
+            raise ValueError(f"Unknown export table: {table}")
+        return EXPORT_MODELS[table]
+
+    @classmethod
+    def schema(cls, table):
+        columns = cls.get_model(table).__table__.columns
+        return pa.schema([pa.field(column.name, _arrow_type(column), nullable=column.nullable) for column in columns])
+
+    @classmethod
+    def upper_bound(cls, table):
+        """Highest id of the rows created more than EXPORT_COMMIT_LAG ago; an export stops there.
+
+        Ids are drawn when a row is inserted but become visible when its
+        transaction commits, so the highest id now can sit above a lower one
+        that is still uncommitted, and a watermark at max(id) would skip it for
+        good. created_at is the inserting transaction's start, so once a row is
+        older than the lag, every row with a lower id has been inserted by a
+        transaction that is (given the lag outlasts it twice over) finished.
+        """
+        model = cls.get_model(table)
+        cutoff = datetime.now(timezone.utc) - current_app.config.get('EXPORT_COMMIT_LAG', timedelta(minutes=5))
+        return db.session.query(func.max(model.id)).filter(model.created_at <= cutoff).scalar() or 0
+
+    @classmethod
+    def batches(cls, table, since_id=0, upto_id=None, batch_size=None):
+        """Record batches of the rows with since_id < id <= upto_id, in id order"""
+        model = cls.get_model(table)
+        columns = list(model.__table__.columns)
+        schema = cls.schema(table)
+        converters = [_converter(column) for column in columns]
+        batch_size = batch_size or current_app.config.get('EXPORT_BATCH_SIZE', 50000)
+
+        query = select(*columns).where(model.id > since_id).order_by(model.id)
+        if upto_id is not None:
+            query = query.where(model.id <= upto_id)
+
+        result = db.session.execute(query.execution_options(yield_per=batch_size))
+        for chunk in result.partitions():
+            arrays = []
+            for index, (field, converter) in enumerate(zip(schema, converters)):
+                values = [row[index] for row in chunk]
+                if converter is not None:
+                    values = [converter(value) for value in values]
+                arrays.append(pa.array(values, type=field.type))
+
+            yield pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+    @classmethod
+    def export(cls, table, output_dir=None, file_format='parquet', full=False, batch_size=None):
+        """Write rows above the table's watermark as day partitions; returns what was written"""
+        if file_format not in EXPORT_FORMATS:
+            raise ValueError(f"Unknown export format: {file_format}")
+
+        table_dir = os.path.join(output_dir or current_app.config.get('EXPORT_DIR', 'exports'), table)
+        since_id = 0 if full else cls.read_watermark(table_dir)
+        upto_id = max(cls.upper_bound(table), since_id)
+
+        # A full export is built in a fresh directory and swapped in at the end,
+        # so no earlier incremental part is left beside the rewritten days
+        target_dir = table_dir
+        if full:
+            table_dir = f'{target_dir}.full'
+            shutil.rmtree(table_dir, ignore_errors=True)
+        extension = EXPORT_FORMATS[file_format][0]
+        max_open = current_app.config.get('EXPORT_MAX_OPEN_PARTITIONS', 8)
+
+        # Ids mostly follow created_at, so only a few days are open at a time;
+        # the least recently written day is closed when too many are
+        partitions = {}
+        parts_per_day = {}
+        files = []
+        rows = 0
+
+        try:
+            for batch in cls.batches(table, since_id, upto_id, batch_size):
+                days = pc.cast(batch.column('created_at'), pa.date32())
+
+                for day in pc.unique(days).to_pylist():
+                    day_rows = batch.filter(pc.equal(days, pa.scalar(day, pa.date32())))
+
+                    partition = partitions.pop(day, None)
+                    if partition is None:
+                        part = parts_per_day.get(day, 0)
+                        parts_per_day[day] = part + 1
+                        partition = _Partition(
+                            os.path.join(table_dir, f'day={day.isoformat()}', f'part-{since_id + 1:012d}-{part:04d}.{extension}'),
+                            batch.schema,
+                            file_format
+                        )
+                        files.append(partition.path)
+                    partitions[day] = partition
+
+                    partition.write(day_rows)
+                    rows += day_rows.num_rows
+
+                    while len(partitions) > max_open:
+                        partitions.pop(next(iter(partitions))).close()
+        finally:
+            for partition in partitions.values():
+                partition.close()
+
+        # Moved only once every partition is in place; an interrupted run is
+        # repeated from the same watermark and overwrites the same file names
+        if rows:
+            cls.write_watermark(table_dir, upto_id, file_format)
+
+        if full:
+            cls._replace_dir(table_dir, target_dir)
+            files = [os.path.join(target_dir, os.path.relpath(path, table_dir)) for path in files]
+
+        return {
+            'table': table,
+            'format': file_format,
+            'rows': rows,
+            'files': files,
+            'since_id': since_id,
+            'watermark': upto_id if rows else since_id
+        }
+
+    @classmethod
+    def stream(cls, table, file_format='arrow', since_id=0, upto_id=None, batch_size=None):
+        """Bytes of one Parquet or Arrow IPC stream file of the rows with since_id < id <= upto_id"""
+        if file_format not in EXPORT_FORMATS:
+            raise ValueError(f"Unknown export format: {file_format}")
+
+        schema = cls.schema(table)
+        sink = _ChunkSink()
+        if file_format == 'parquet':
+            writer = pq.ParquetWriter(sink, schema, compression='zstd')
+        else:
+            writer = pa.ipc.new_stream(sink, schema)
+
+        for batch in cls.batches(table, since_id, upto_id, batch_size):
+            writer.write_batch(batch)
+            yield sink.drain()
+
+        writer.close()
+        yield sink.drain()
+
+    @staticmethod
+    def read_watermark(table_dir):
+        path = os.path.join(table_dir, WATERMARK_FILE)
+        if not os.path.exists(path):
+            return 0
+
+        with open(path) as f:
+            return json.load(f)['last_id']
+
+    @staticmethod
+    def _replace_dir(source_dir, target_dir):
+        os.makedirs(source_dir, exist_ok=True)
+        previous_dir = f'{target_dir}.previous'
+        shutil.rmtree(previous_dir, ignore_errors=True)
+
+        if os.path.exists(target_dir):
+            os.replace(target_dir, previous_dir)
+        os.replace(source_dir, target_dir)
+        shutil.rmtree(previous_dir, ignore_errors=True)
+
+    @staticmethod
+    def write_watermark(table_dir, last_id, file_format):
+        path = os.path.join(table_dir, WATERMARK_FILE)
+        os.makedirs(table_dir, exist_ok=True)
+
+        with open(f'{path}.tmp', 'w') as f:
+            json.dump({
+                'last_id': last_id,
+                'format': file_format,
+                'exported_at': datetime.now(timezone.utc).isoformat()
+            }, f)
+        os.replace(f'{path}.tmp', path)
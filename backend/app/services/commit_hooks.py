@@ -0,0 +1,112 @@
+# services/commit_hooks.py
+from collections import namedtuple
+from datetime import date, datetime, timezone
+from flask import current_app
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+# session.info key holding {hook name: [batch, ...]} until the session commits
+PENDING_KEY = 'commit_hooks_pending'
+
+CommitHook = namedtuple('CommitHook', ['name', 'collect', 'apply'])
+
+_hooks = []
+_tracked = set()
+
+
+def register(name, collect, apply):
+    """Run apply(batches) on commit, in the committing transaction, for what collect() gathered.
+
+    collect(session) is called after every flush and returns what that flush
+    contributes, or something falsy; apply receives the list of those batches.
+    All hooks share one flush per commit and each applies in its own savepoint.
+    A failure rolls back that hook's savepoint only and is logged rather than
+    failing the commit, so every hook needs its own repair path (a rebuild or
+    rescan) for what it missed.
+    """
+    _hooks.append(CommitHook(name, collect, apply))
+
+
+def utc_day(value):
+    """UTC calendar day of a datetime, ISO string or date; today for None"""
+    if value is None:
+        return datetime.now(timezone.utc).date()
+    if isinstance(value, str):
+        return date.fromisoformat(value[:10])
+    if isinstance(value, datetime):
+        if value.tzinfo is not None:
+            value = value.astimezone(timezone.utc)
+        return value.date()
+    return value
+
+
+def attribute_values(instance, names, previous=False):
+    """Attribute values as flushed, or as they were before this flush (None if not loaded)"""
+    state = inspect(instance)
+    values = {}
+
+    for name in names:
+        history = state.attrs[name].history
+        if previous and history.deleted:
+            values[name] = history.deleted[0]
+        elif previous and history.unchanged:
+            values[name] = history.unchanged[0]
+        elif previous and history.added:
+            # Changed without its old value being loaded
+            return None
+        else:
+            values[name] = getattr(instance, name)
+
+    return values
+
+
+def has_changes(instance, names):
+    state = inspect(instance)
+    return any(state.attrs[name].history.has_changes() for name in names)
+
+
+def track_previous_values(model, names):
+    """Load the value being replaced when any of names is set, so attribute_values(previous=True) sees it"""
+    for name in names:
+        if (model, name) not in _tracked:
+            event.listen(getattr(model, name), 'set', _track_previous_value, active_history=True)
+            _tracked.add((model, name))
+
+
+def _track_previous_value(target, value, oldvalue, initiator):
+    # Registered with active_history so the value being replaced is loaded first
+    pass
+
+
+@event.listens_for(Session, 'after_flush')
+def _collect(session, flush_context):
+    for hook in _hooks:
+        batch = hook.collect(session)
+        if batch:
+            session.info.setdefault(PENDING_KEY, {}).setdefault(hook.name, []).append(batch)
+
+
+@event.listens_for(Session, 'before_commit')
+def _apply(session):
+    session.flush()
+    pending = session.info.pop(PENDING_KEY, None)
+    if not pending:
+        return
+
+    for name, collect, apply in _hooks:
+        if name not in pending:
+            continue
+
+        try:
+            with session.begin_nested():
+                apply(pending[name])
+        except Exception as e:
+            # Never fail the commit or the other hooks over derived data; this hook's repair path catches up
+            current_app.logger.error(f"Commit hook {name} failed, skipped: {str(e)}")
+
+
+@event.listens_for(Session, 'after_soft_rollback')
+def _discard(session, previous_transaction):
+    # A rolled-back savepoint leaves the enclosing transaction's batches in place
+    if not previous_transaction.nested:
+        session.info.pop(PENDING_KEY, None)
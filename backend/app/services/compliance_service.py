@@ -2,6 +2,7 @@
 from decimal import Decimal
 from flask import current_app
 from .region_service import RegionService
+from .usage_aggregates import UsageAggregates
 
 class ComplianceService:
     """Service for handling regulatory compliance checks"""
@@ -39,20 +40,24 @@ class ComplianceService:
         return {'allowed': True, 'reason': 'OK'}
     
     @staticmethod
-    def check_transaction_limit(user, amount, transaction_type='transfer'):
-        """Check transaction limits based on user's KYC level"""
-        
-        limits_by_kyc_level = {
-            0: {'daily': Decimal('5000.00'), 'monthly': Decimal('20000.00')},  # Basic
-            1: {'daily': Decimal('50000.00'), 'monthly': Decimal('500000.00')},  # Verified
-            2: {'daily': Decimal('500000.00'), 'monthly': Decimal('5000000.00')},  # Enhanced
-        }
+    def check_transaction_limit(user, amount, transaction_type='transfer', currency=None):
+        """Check daily and monthly outgoing usage against the limits for the user's KYC level"""
         
+        limits_by_kyc_level = current_app.config.get('KYC_TRANSACTION_LIMITS', {})
         user_limits = limits_by_kyc_level.get(user.kyc_level, limits_by_kyc_level[0])
         
-        # TODO: Check actual daily/monthly usage from database
-        # For now, just check against limits
-        if amount > user_limits['daily']:
-            return {'allowed': False, 'reason': 'Exceeds daily limit for your KYC level'}
+        amount = UsageAggregates.in_limit_currency(amount, currency)
+        usage = UsageAggregates.current(user.id)
+        
+        if usage['day'].amount + amount > user_limits['daily']:
+            return {'allowed': False, 'reason': f"Exceeds daily limit for your KYC level. Used: {float(usage['day'].amount)}, Limit: {float(user_limits['daily'])}"}
+        
+        if usage['month'].amount + amount > user_limits['monthly']:
+            return {'allowed': False, 'reason': f"Exceeds monthly limit for your KYC level. Used: {float(usage['month'].amount)}, Limit: {float(user_limits['monthly'])}"}
         
-        return {'allowed': True, 'reason': 'OK'}
\ No newline at end of file
+        return {
+            'allowed': True,
+            'reason': 'OK',
+            'daily_remaining': float(user_limits['daily'] - usage['day'].amount - amount),
+            'monthly_remaining': float(user_limits['monthly'] - usage['month'].amount - amount)
+        }
\ No newline at end of file
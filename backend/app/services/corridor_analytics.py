@@ -0,0 +1,336 @@
+# services/corridor_analytics.py
+from collections import namedtuple
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from sqlalchemy import select
+from ..extensions import db
+from ..models import Transaction, ExchangeRateHistory, DailyCorridorRollup
+from ..models.enums import TransactionStatus
+from .commit_hooks import attribute_values, has_changes, register, track_previous_values, utc_day
+from .transaction_rollups import TransactionRollups, REBUILD_CHUNK_DAYS
+
+# Corridor rollup key columns, in key tuple order
+CORRIDOR_KEY = ('day', 'source_country', 'destination_country', 'source_currency', 'target_currency')
+
+# Additive measures, in delta list order
+CORRIDOR_MEASURES = (
+    'completed_count', 'fx_count', 'fx_amount', 'fx_spread_amount', 'settled_count', 'settlement_seconds'
+)
+
+# Transaction attributes a corridor contribution is derived from
+CORRIDOR_ATTRIBUTES = (
+    'status', 'source_country', 'destination_country', 'source_currency', 'target_currency',
+    'amount', 'fx_rate', 'fx_timestamp', 'completed_at'
+)
+
+# What one completed transaction adds to its corridor's day; reference rates are
+# looked up when the contributions are applied
+Contribution = namedtuple('Contribution', ['key', 'amount', 'fx_rate', 'fx_as_of', 'settlement_seconds'])
+
+
+def _as_utc(value):
+    if value is not None and value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
+def _ratio(numerator, denominator):
+    return float(numerator) / float(denominator) if denominator else None
+
+
+class CorridorAnalytics:
+    """Volume, fees, failure rate, FX spread and settlement latency per corridor and day.
+
+    A corridor is a (source_country, destination_country) pair. Volume, fees and
+    status counts come from daily_transaction_rollups. daily_corridor_rollups adds
+    what those rows cannot hold for completed transactions: the FX spread against
+    the recorded reference rate and the created-to-completed time. It is maintained
+    like the transaction rollups, from each flush that completes, reverses,
+    re-prices or deletes a transaction, and applied in a savepoint when the session
+    commits, so a report sums a few rows per corridor and day.
+
+    Rows written outside the ORM are not seen; rebuild() recomputes a range of days.
+    """
+
+    @staticmethod
+    def key_for(day, source_country, destination_country, source_currency, target_currency):
+        return (
+            utc_day(day),
+            source_country or '',
+            destination_country or '',
+            source_currency or 'KES',
+            target_currency or source_currency or 'KES'
+        )
+
+    @classmethod
+    def contribution(cls, created_at, source_country, destination_country, source_currency, target_currency,
+                     amount, fx_rate, fx_timestamp, completed_at):
+        """What a completed transaction adds to its corridor, or None outside a corridor"""
+        if not source_country or not destination_country:
+            return None
+
+        key = cls.key_for(created_at, source_country, destination_country, source_currency, target_currency)
+
+        created_at = _as_utc(created_at)
+        completed_at = _as_utc(completed_at)
+        settlement_seconds = None
+        if created_at is not None and completed_at is not None:
+            settlement_seconds = Decimal(str(max((completed_at - created_at).total_seconds(), 0)))
+
+        converted = fx_rate is not None and key[3] != key[4]
+        return Contribution(
+            key,
+            Decimal(str(amount or 0)),
+            Decimal(str(fx_rate)) if converted else None,
+            (_as_utc(fx_timestamp) or completed_at or created_at) if converted else None,
+            settlement_seconds
+        )
+
+    @staticmethod
+    def deltas_for(contributions, deltas=None):
+        """Sum (sign, Contribution) pairs into {key: measures}, with the reference rates loaded in one query"""
+        deltas = {} if deltas is None else deltas
+
+        converted = [contribution for _, contribution in contributions if contribution.fx_rate is not None]
+        if converted:
+            times = [contribution.fx_as_of for contribution in converted]
+            rate_as_of = ExchangeRateHistory.preload(
+                {(contribution.key[3], contribution.key[4]) for contribution in converted}, min(times), max(times)
+            )
+
+        for sign, contribution in contributions:
+            totals = deltas.setdefault(contribution.key, [0, 0, Decimal('0.00'), Decimal('0'), 0, Decimal('0')])
+            totals[0] += sign
+
+            if contribution.fx_rate is not None:
+                reference = rate_as_of(contribution.key[3], contribution.key[4], contribution.fx_as_of)
+
+                if reference:
+                    spread = (reference - contribution.fx_rate) / reference
+                    totals[1] += sign
+                    totals[2] += sign * contribution.amount
+                    totals[3] += sign * (contribution.amount * spread).quantize(Decimal('0.00000001'))
+
+            if contribution.settlement_seconds is not None:
+                totals[4] += sign
+                totals[5] += sign * contribution.settlement_seconds
+
+        return deltas
+
+    @classmethod
+    def apply(cls, deltas):
+        """Add {key: measures} to the corridor rollups in the caller's transaction"""
+        if db.engine.dialect.name == 'postgresql':
+            from sqlalchemy.dialects.postgresql import insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert
+
+        now = datetime.now(timezone.utc)
+        # Sorted, so concurrent commits lock shared rows in the same order
+        rows = [
+            {**dict(zip(CORRIDOR_KEY, key)), **dict(zip(CORRIDOR_MEASURES, measures)), 'updated_at': now}
+            for key, measures in sorted(deltas.items())
+            if any(measures)
+        ]
+        if not rows:
+            return 0
+
+        table = DailyCorridorRollup.__table__
+        statement = insert(table).values(rows)
+        statement = statement.on_conflict_do_update(
+            index_elements=list(CORRIDOR_KEY),
+            set_={
+                **{name: table.c[name] + statement.excluded[name] for name in CORRIDOR_MEASURES},
+                'updated_at': statement.excluded.updated_at
+            }
+        )
+
+        db.session.execute(statement)
+        return len(rows)
+
+    @classmethod
+    def rebuild(cls, start=None, end=None, chunk_size=5000):
+        """Recompute the corridor rollups of days start..end (inclusive, default all); returns rows written"""
+        if start is None:
+            start = utc_day(db.session.query(db.func.min(Transaction.created_at)).scalar())
+        end = end or datetime.now(timezone.utc).date()
+
+        written = 0
+        chunk_start = start
+        while chunk_start <= end:
+            chunk_end = min(chunk_start + timedelta(days=REBUILD_CHUNK_DAYS - 1), end)
+
+            DailyCorridorRollup.query.filter(
+                DailyCorridorRollup.day >= chunk_start,
+                DailyCorridorRollup.day <= chunk_end
+            ).delete(synchronize_session=False)
+
+            completed = db.session.execute(
+                select(
+                    Transaction.created_at,
+                    Transaction.source_country,
+                    Transaction.destination_country,
+                    Transaction.source_currency,
+                    Transaction.target_currency,
+                    Transaction.amount,
+                    Transaction.fx_rate,
+                    Transaction.fx_timestamp,
+                    Transaction.completed_at
+                ).where(
+                    Transaction.status == TransactionStatus.completed,
+                    Transaction.created_at >= datetime.combine(chunk_start, datetime.min.time(), timezone.utc),
+                    Transaction.created_at < datetime.combine(chunk_end + timedelta(days=1), datetime.min.time(), timezone.utc)
+                ).execution_options(yield_per=chunk_size)
+            )
+
+            # Deltas are summed per partition, so memory stays at one partition of rows
+            deltas = {}
+            for chunk in completed.partitions():
+                cls.deltas_for([
+                    (1, contribution)
+                    for contribution in (cls.contribution(*row) for row in chunk)
+                    if contribution is not None
+                ], deltas)
+
+            written += cls.apply(deltas)
+            db.session.commit()
+            chunk_start = chunk_end + timedelta(days=1)
+
+        return written
+
+    @staticmethod
+    def report(start, end, by_day=False, source_country=None, destination_country=None):
+        """Per-corridor (and per-day) figures for days start..end, from two rollup reads.
+
+        failure_rate is failed / (completed + failed); transactions still pending
+        or processing are counted in transaction_count only. fx_spread_bps is the
+        amount-weighted spread of converted transactions against the reference rate.
+        """
+        filters = {}
+        if source_country:
+            filters['source_country'] = source_country
+        if destination_country:
+            filters['destination_country'] = destination_country
+
+        group_by = ('source_country', 'destination_country', 'currency')
+        if by_day:
+            group_by = ('day',) + group_by
+
+        corridors = {}
+
+        def entry(key):
+            return corridors.setdefault(key, {
+                'transaction_count': 0, 'completed_count': 0, 'failed_count': 0,
+                'volume': Decimal('0.00'), 'fees': Decimal('0.00'),
+                'fx_count': 0, 'fx_amount': Decimal('0.00'), 'fx_spread_amount': Decimal('0'),
+                'settled_count': 0, 'settlement_seconds': Decimal('0')
+            })
+
+        for row in TransactionRollups.totals(start, end, group_by=group_by + ('status',), statuses=None, **filters):
+            if not row.source_country or not row.destination_country:
+                continue
+
+            totals = entry(tuple(row[:len(group_by)]))
+            totals['transaction_count'] += row.count or 0
+            if row.status == TransactionStatus.completed.value:
+                totals['completed_count'] += row.count or 0
+                totals['volume'] += row.amount or 0
+                totals['fees'] += row.fee or 0
+            elif row.status == TransactionStatus.failed.value:
+                totals['failed_count'] += row.count or 0
+
+        columns = [
+            getattr(DailyCorridorRollup, 'source_currency' if name == 'currency' else name) for name in group_by
+        ]
+        query = db.session.query(
+            *columns,
+            *[db.func.sum(getattr(DailyCorridorRollup, name)) for name in CORRIDOR_MEASURES[1:]]
+        ).filter(
+            DailyCorridorRollup.day >= start,
+            DailyCorridorRollup.day <= end
+        )
+        for name, value in filters.items():
+            query = query.filter(getattr(DailyCorridorRollup, name) == value)
+
+        for row in query.group_by(*columns).all():
+            totals = entry(tuple(row[:len(group_by)]))
+            for name, value in zip(CORRIDOR_MEASURES[1:], row[len(group_by):]):
+                totals[name] += value or 0
+
+        report = []
+        for key in sorted(corridors):
+            totals = corridors[key]
+            corridor = dict(zip(group_by, key))
+            if by_day:
+                corridor['day'] = corridor['day'].isoformat()
+
+            report.append({
+                **corridor,
+                'transaction_count': totals['transaction_count'],
+                'completed_count': totals['completed_count'],
+                'failed_count': totals['failed_count'],
+                'failure_rate': _ratio(totals['failed_count'], totals['completed_count'] + totals['failed_count']),
+                'volume': float(totals['volume']),
+                'fees': float(totals['fees']),
+                'fee_rate': _ratio(totals['fees'], totals['volume']),
+                'fx_volume': float(totals['fx_amount']),
+                'fx_spread_bps': round(_ratio(totals['fx_spread_amount'], totals['fx_amount']) * 10000, 2)
+                if totals['fx_amount'] else None,
+                'avg_settlement_seconds': round(_ratio(totals['settlement_seconds'], totals['settled_count']), 3)
+                if totals['settled_count'] else None
+            })
+
+        return report
+
+
+def _corridor_state(transaction, previous=False, created=False):
+    """Contribution of a completed transaction as flushed, or as it was before this flush"""
+    values = attribute_values(transaction, CORRIDOR_ATTRIBUTES, previous)
+    if values is None or getattr(values['status'], 'value', values['status']) != TransactionStatus.completed.value:
+        return None
+
+    # created_at is a server default that is not loaded back; a row inserted in
+    # this flush is dated now
+    created_at = datetime.now(timezone.utc) if created else transaction.created_at
+
+    return CorridorAnalytics.contribution(
+        created_at,
+        values['source_country'],
+        values['destination_country'],
+        values['source_currency'],
+        values['target_currency'],
+        values['amount'],
+        values['fx_rate'],
+        values['fx_timestamp'],
+        values['completed_at']
+    )
+
+
+track_previous_values(Transaction, CORRIDOR_ATTRIBUTES)
+
+
+def _collect_corridor_contributions(session):
+    contributions = []
+
+    for instance in session.new:
+        if isinstance(instance, Transaction):
+            contributions.append((1, _corridor_state(instance, created=True)))
+
+    for instance in session.dirty:
+        if isinstance(instance, Transaction) and has_changes(instance, CORRIDOR_ATTRIBUTES):
+            contributions.append((-1, _corridor_state(instance, previous=True)))
+            contributions.append((1, _corridor_state(instance)))
+
+    for instance in session.deleted:
+        if isinstance(instance, Transaction):
+            contributions.append((-1, _corridor_state(instance, previous=True)))
+
+    return [(sign, contribution) for sign, contribution in contributions if contribution is not None]
+
+
+def _apply_corridor_contributions(batches):
+    CorridorAnalytics.apply(CorridorAnalytics.deltas_for([pair for batch in batches for pair in batch]))
+
+
+# rebuild() repairs the days a failed update missed
+register('corridor_analytics', _collect_corridor_contributions, _apply_corridor_contributions)
@@ -1,10 +1,18 @@
 import requests
 import json
+import numpy as np
 from datetime import datetime, timedelta, timezone
 from decimal import Decimal, ROUND_HALF_UP
 from flask import current_app
 from ..extensions import db
-from ..models import ExchangeRate, AuditLog
+from ..models import ExchangeRate, ExchangeRateHistory, AuditLog
+from .fx_rate_cache import FXRateCache, RateEntry
+from .fx_refresher import FXRateRefresher
+
+# Rates are stored with 6 decimal places (Numeric(10, 6))
+RATE_UNITS = 1_000_000
+# Largest Numeric(12, 2) amount in minor units; keeps every int64 product in range
+BATCH_MAX_MINOR_UNITS = 10 ** 12
 
 class CurrencyService:
     
@@ -13,76 +21,168 @@ class CurrencyService:
         if from_currency == to_currency:
             return Decimal('1.000000')
         
-        rate = ExchangeRate.query.filter_by(
-            base_currency=from_currency,
-            target_currency=to_currency
-        ).first()
+        entry = CurrencyService.get_rate_entry(from_currency, to_currency)
+        return entry.rate if entry else Decimal('1.000000')
+    
+    @staticmethod
+    def get_rate_entry(from_currency, to_currency):
+        """Rate, timestamp and provider for a pair, served from the in-process rate matrix.
+        
+        A stale rate is still served while a background refresh runs; only a pair
+        that has never been seen waits (bounded) for the provider.
+        """
+        if from_currency == to_currency:
+            return RateEntry(Decimal('1.000000'), datetime.now(timezone.utc), 'internal')
+        
+        entry = FXRateCache.lookup(from_currency, to_currency)
+        if entry:
+            if CurrencyService._is_stale(entry.last_updated):
+                FXRateRefresher.request_refresh(from_currency)
+            return entry
+        
+        FXRateRefresher.refresh_now(from_currency)
+        entry = FXRateCache.lookup(from_currency, to_currency)
+        if entry:
+            return entry
+        
+        fallback_rate = Decimal(str(CurrencyService._get_fallback_rate(from_currency, to_currency)))
+        return RateEntry(
+            fallback_rate.quantize(Decimal('0.000001'), rounding=ROUND_HALF_UP),
+            datetime.now(timezone.utc),
+            'fallback'
+        )
+    
+    @staticmethod
+    def _is_stale(last_updated):
+        if last_updated is None:
+            return True
         
-        if not rate or datetime.now(timezone.utc) - rate.last_updated > timedelta(minutes=15):
-            rate = CurrencyService.update_exchange_rate(from_currency, to_currency)
+        if last_updated.tzinfo is None:
+            last_updated = last_updated.replace(tzinfo=timezone.utc)
         
-        return rate.rate if rate else Decimal('1.000000')
+        max_age = timedelta(seconds=current_app.config.get('EXCHANGE_RATE_UPDATE_INTERVAL', 900))
+        return datetime.now(timezone.utc) - last_updated > max_age
     
     @staticmethod
     def update_exchange_rate(base_currency, target_currency):
-        api_url = current_app.config.get('EXCHANGE_RATE_API')
-        api_provider = current_app.config.get('EXCHANGE_RATE_PROVIDER', 'internal')
-        
         try:
-            if api_provider == 'exchangerate_api':
-                rate_value = CurrencyService._fetch_from_exchangerate_api(base_currency, target_currency)
-            elif api_provider == 'openexchangerates':
-                rate_value = CurrencyService._fetch_from_openexchangerates(base_currency, target_currency)
-            elif api_provider == 'currencylayer':
-                rate_value = CurrencyService._fetch_from_currencylayer(base_currency, target_currency)
-            else:
-                rate_value = CurrencyService._get_fallback_rate(base_currency, target_currency)
+            target_currencies = CurrencyService.get_supported_currencies()
+            if target_currency not in target_currencies:
+                target_currencies = target_currencies + [target_currency]
             
-            rate_value = Decimal(str(rate_value)).quantize(Decimal('0.000001'), rounding=ROUND_HALF_UP)
+            rate_table = CurrencyService.refresh_rates(base_currency, target_currencies)
             
-            rate = ExchangeRate.query.filter_by(
+            if target_currency not in rate_table:
+                raise Exception(f"Provider returned no rate for {base_currency}/{target_currency}")
+            
+            return ExchangeRate.query.filter_by(
                 base_currency=base_currency,
                 target_currency=target_currency
             ).first()
             
-            if not rate:
-                rate = ExchangeRate(
-                    base_currency=base_currency,
-                    target_currency=target_currency,
-                    rate=rate_value,
-                    fx_provider=api_provider,
-                    last_updated=datetime.now(timezone.utc)
-                )
-                db.session.add(rate)
-            else:
-                rate.rate = rate_value
-                rate.fx_provider = api_provider
-                rate.last_updated = datetime.now(timezone.utc)
-            
-            db.session.commit()
-            
-            AuditLog.log_system_action(
-                action='exchange_rate.updated',
-                resource_type='exchange_rate',
-                resource_id=rate.id,
-                metadata={
-                    'base_currency': base_currency,
-                    'target_currency': target_currency,
-                    'rate': float(rate_value),
-                    'provider': api_provider
-                },
-                status='success'
-            )
-            
-            return rate
-            
         except Exception as e:
+            db.session.rollback()
             current_app.logger.error(f"Failed to update exchange rate {base_currency}/{target_currency}: {str(e)}")
             
             return CurrencyService._get_fallback_exchange_rate(base_currency, target_currency)
     
     @staticmethod
-    def _fetch_from_exchangerate_api(base_currency, target_currency):
+    def refresh_rates(base_currency, target_currencies=None):
+        """Pull the full rate table for a base currency once and upsert every pair"""
+        api_provider = current_app.config.get('EXCHANGE_RATE_PROVIDER', 'internal')
+        target_currencies = target_currencies or CurrencyService.get_supported_currencies()
+        
+        rate_table = CurrencyService._fetch_rate_table(base_currency, target_currencies, api_provider)
+        if not rate_table:
+            return {}
+        
+        CurrencyService._upsert_rates(base_currency, rate_table, api_provider)
+        
+        AuditLog.log_system_action(
+            action='exchange_rates.refreshed',
+            resource_type='exchange_rate',
+            new_values={
+                'base_currency': base_currency,
+                'provider': api_provider,
+                'pairs': len(rate_table),
+                'rates': {currency: float(rate) for currency, rate in rate_table.items()}
+            },
+            status='success'
+        )
+        
+        db.session.commit()
+        FXRateCache.invalidate()
+        
+        return rate_table
+    
+    @staticmethod
+    def _fetch_rate_table(base_currency, target_currencies, api_provider):
+        targets = [currency for currency in target_currencies if currency != base_currency]
+        
+        if api_provider == 'exchangerate_api':
+            provider_rates = CurrencyService._fetch_from_exchangerate_api(base_currency)
+        elif api_provider == 'openexchangerates':
+            provider_rates = CurrencyService._fetch_from_openexchangerates(base_currency)
+        elif api_provider == 'currencylayer':
+            provider_rates = CurrencyService._fetch_from_currencylayer(base_currency, targets)
+        else:
+            provider_rates = {
+                currency: CurrencyService._get_fallback_rate(base_currency, currency)
+                for currency in targets
+            }
+        
+        rate_table = {}
+        for currency in targets:
+            if provider_rates.get(currency):
+                rate_table[currency] = Decimal(str(provider_rates[currency])).quantize(
+                    Decimal('0.000001'), rounding=ROUND_HALF_UP
+                )
+        
+        return rate_table
+    
+    @staticmethod
+    def _upsert_rates(base_currency, rate_table, api_provider):
+        """Write every pair of a rate table in a single INSERT ... ON CONFLICT statement and append it to the history"""
+        if db.engine.dialect.name == 'postgresql':
+            from sqlalchemy.dialects.postgresql import insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert
+        
+        now = datetime.now(timezone.utc)
+        statement = insert(ExchangeRate.__table__).values([
+            {
+                'base_currency': base_currency,
+                'target_currency': currency,
+                'rate': rate,
+                'fx_provider': api_provider,
+                'last_updated': now
+            }
+            for currency, rate in rate_table.items()
+        ])
+        statement = statement.on_conflict_do_update(
+            index_elements=['base_currency', 'target_currency'],
+            set_={
+                'rate': statement.excluded.rate,
+                'fx_provider': statement.excluded.fx_provider,
+                'last_updated': statement.excluded.last_updated
+            }
+        )
+        
+        db.session.execute(statement)
+        
+        db.session.execute(insert(ExchangeRateHistory.__table__), [
+            {
+                'base_currency': base_currency,
+                'target_currency': currency,
+                'rate': rate,
+                'fx_provider': api_provider,
+                'recorded_at': now
+            }
+            for currency, rate in rate_table.items()
+        ])
+    
+    @staticmethod
+    def _fetch_from_exchangerate_api(base_currency):
         api_key = current_app.config.get('EXCHANGERATE_API_KEY')
         url = f"https://v6.exchangerate-api.com/v6/{api_key}/latest/{base_currency}"
         
@@ -92,12 +192,12 @@ class CurrencyService:
         data = response.json()
         
         if data['result'] == 'success':
-            return data['conversion_rates'].get(target_currency, 1)
+            return data['conversion_rates']
         else:
             raise Exception(f"API error: {data.get('error-type', 'Unknown error')}")
     
     @staticmethod
-    def _fetch_from_openexchangerates(base_currency, target_currency):
+    def _fetch_from_openexchangerates(base_currency):
         api_key = current_app.config.get('OPENEXCHANGERATES_API_KEY')
         url = f"https://openexchangerates.org/api/latest.json?app_id={api_key}&base={base_currency}"
         
@@ -105,20 +205,25 @@ class CurrencyService:
         response.raise_for_status()
         
         data = response.json()
-        return data['rates'].get(target_currency, 1)
+        return data['rates']
     
     @staticmethod
-    def _fetch_from_currencylayer(base_currency, target_currency):
+    def _fetch_from_currencylayer(base_currency, target_currencies):
         api_key = current_app.config.get('CURRENCYLAYER_API_KEY')
-        url = f"http://apilayer.net/api/live?access_key={api_key}&currencies={target_currency}&source={base_currency}&format=1"
+        currencies = ','.join(target_currencies)
+        url = f"http://apilayer.net/api/live?access_key={api_key}&currencies={currencies}&source={base_currency}&format=1"
         
         response = requests.get(url, timeout=10)
         response.raise_for_status()
         
         data = response.json()
         if data['success']:
-            rate_key = f"{base_currency}{target_currency}"
-            return data['quotes'].get(rate_key, 1) / 100  # CurrencyLayer returns rates * 100
+            quotes = data['quotes']
+            return {
+                currency: quotes[f"{base_currency}{currency}"] / 100  # CurrencyLayer returns rates * 100
+                for currency in target_currencies
+                if f"{base_currency}{currency}" in quotes
+            }
         else:
             raise Exception(f"API error: {data.get('error', {}).get('info', 'Unknown error')}")
     
@@ -185,7 +290,15 @@ class CurrencyService:
         )
         
         db.session.add(rate)
+        db.session.add(ExchangeRateHistory(
+            base_currency=base_currency,
+            target_currency=target_currency,
+            rate=fallback_rate,
+            fx_provider='fallback',
+            recorded_at=rate.last_updated
+        ))
         db.session.commit()
+        FXRateCache.invalidate()
         
         return rate
     
@@ -205,7 +318,61 @@ class CurrencyService:
             return converted.quantize(Decimal('0.0001'), rounding=ROUND_HALF_UP)
         else:
             return converted.quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
-    
+
+    @staticmethod
+    def convert_batch(amounts, from_currencies, to_currencies):
+        """Convert many amounts at once, to 2 decimal places.
+
+        Each distinct pair is resolved once from the rate matrix; the arithmetic runs
+        on int64 arrays of minor units (amount x 100) and micro-units (rate x 10^6),
+        so for amounts in whole cents results match convert_amount exactly,
+        ROUND_HALF_UP included. Sub-cent input amounts are rounded to cents first.
+        Returns (converted amounts, {(from, to): rate}). Raises ValueError for a
+        currency outside FX_SUPPORTED_CURRENCIES or a pair without a rate.
+        """
+        count = len(amounts)
+        if len(from_currencies) != count or len(to_currencies) != count:
+            raise ValueError("amounts, from_currencies and to_currencies must be the same length")
+
+        if count == 0:
+            return [], {}
+
+        pairs = list(zip(from_currencies, to_currencies))
+        supported = set(CurrencyService.get_supported_currencies())
+        for currency in dict.fromkeys(from_currencies + to_currencies):
+            if currency not in supported:
+                raise ValueError(f"Unsupported currency: {currency}")
+
+        rates = {}
+        for pair in dict.fromkeys(pairs):
+            entry = CurrencyService.get_rate_entry(*pair)
+            if entry is None or not entry.rate:
+                raise ValueError(f"No exchange rate for {pair[0]}/{pair[1]}")
+            rates[pair] = entry.rate
+        pair_index = {pair: i for i, pair in enumerate(rates)}
+
+        rate_units = np.array(
+            [int(rate.quantize(Decimal('0.000001'), rounding=ROUND_HALF_UP).scaleb(6)) for rate in rates.values()],
+            dtype=np.int64
+        )
+        minor_units = [
+            int(Decimal(str(amount)).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP).scaleb(2))
+            for amount in amounts
+        ]
+        if max(abs(value) for value in minor_units) > BATCH_MAX_MINOR_UNITS:
+            raise ValueError("Amount too large for batch conversion")
+
+        minor_units = np.array(minor_units, dtype=np.int64)
+        row_rates = rate_units[np.fromiter((pair_index[pair] for pair in pairs), dtype=np.int64, count=count)]
+
+        # Split the rate into whole and fractional parts so neither product overflows int64
+        whole, fraction = np.divmod(row_rates, RATE_UNITS)
+        signs = np.sign(minor_units)
+        magnitudes = np.abs(minor_units)
+        converted = signs * (magnitudes * whole + (magnitudes * fraction + RATE_UNITS // 2) // RATE_UNITS)
+
+        return [Decimal(int(value)).scaleb(-2) for value in converted], rates
+
     @staticmethod
     def get_currency_symbol(currency_code):
         symbols = {
@@ -277,16 +444,21 @@ class CurrencyService:
         
         return result
     
+    @staticmethod
+    def get_supported_currencies():
+        return list(current_app.config.get(
+            'FX_SUPPORTED_CURRENCIES',
+            ['KES', 'USD', 'EUR', 'GBP', 'NGN', 'GHS', 'ZAR', 'UGX', 'TZS', 'RWF']
+        ))
+    
     @staticmethod
     def update_all_rates(base_currency='USD'):
-        supported_currencies = ['KES', 'USD', 'EUR', 'GBP', 'NGN', 'GHS', 'ZAR', 'UGX', 'TZS', 'RWF']
-        
-        for target_currency in supported_currencies:
-            if target_currency != base_currency:
-                try:
-                    CurrencyService.update_exchange_rate(base_currency, target_currency)
-                except Exception as e:
-                    current_app.logger.error(f"Failed to update rate for {base_currency}/{target_currency}: {str(e)}")
+        try:
+            return CurrencyService.refresh_rates(base_currency)
+        except Exception as e:
+            db.session.rollback()
+            current_app.logger.error(f"Failed to update rates for {base_currency}: {str(e)}")
+            return {}
     
     @staticmethod
     def calculate_fx_fee(amount, from_currency, to_currency):
@@ -305,27 +477,5 @@ class CurrencyService:
     
     @staticmethod
     def get_historical_rate(base_currency, target_currency, date):
-        historical_api = current_app.config.get('HISTORICAL_RATE_API')
-        
-        if not historical_api:
-            return CurrencyService.get_exchange_rate(base_currency, target_currency)
-        
-        try:
-            date_str = date.strftime('%Y-%m-%d')
-            
-            if current_app.config.get('EXCHANGE_RATE_PROVIDER') == 'exchangerate_api':
-                api_key = current_app.config.get('EXCHANGERATE_API_KEY')
-                url = f"https://v6.exchangerate-api.com/v6/{api_key}/history/{base_currency}/{date_str}"
-                
-                response = requests.get(url, timeout=10)
-                response.raise_for_status()
-                
-                data = response.json()
-                if data['result'] == 'success':
-                    return Decimal(str(data['conversion_rates'].get(target_currency, 1)))
-            
-            return CurrencyService.get_exchange_rate(base_currency, target_currency)
-            
-        except Exception as e:
-            current_app.logger.error(f"Failed to get historical rate: {str(e)}")
-            return CurrencyService.get_exchange_rate(base_currency, target_currency)
\ No newline at end of file
+        """Rate in force at a date or datetime from exchange_rate_history; None if none was recorded by then"""
+        return ExchangeRateHistory.rate_as_of(base_currency, target_currency, date)
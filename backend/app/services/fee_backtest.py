@@ -0,0 +1,293 @@
+# services/fee_backtest.py
+from decimal import Decimal
+import numpy as np
+from flask import current_app
+from sqlalchemy import select, func, cast, BigInteger
+from ..extensions import db
+from ..models import Transaction
+from ..models.enums import TransactionStatus
+from .fee_engine import FeeEngine, FeeSchedule
+from .region_service import RegionService
+
+# Lower edges of the reporting amount bands, in major units
+DEFAULT_AMOUNT_BANDS = (0, 1000, 10000, 100000, 250000)
+
+# Amounts and fees are handled in cents; percentages keep 4 decimal places,
+# so cents x scaled percentage / FEE_SCALE = fee in cents
+PERCENT_SCALE = 10 ** 4
+FEE_SCALE = 100 * PERCENT_SCALE
+NO_CAP = np.iinfo(np.int64).max // 4
+
+
+def _cents(value):
+    return int((Decimal(str(value)) * 100).to_integral_value())
+
+
+def _round_half_even(numerator, scale):
+    # Decimal.quantize's default rounding, on non-negative int64 arrays
+    quotient, remainder = np.divmod(numerator, scale)
+    twice = 2 * remainder
+    return quotient + ((twice > scale) | ((twice == scale) & (quotient % 2 == 1)))
+
+
+class FeeBacktester:
+    """Replays completed transactions through a candidate fee schedule.
+
+    Transactions are streamed from a server-side cursor in chunks of chunk_size
+    rows. Each chunk is turned into int64 column arrays and priced with array
+    math, then folded into per (fee type, corridor, amount band) totals, so memory
+    stays bounded by the chunk size and the number of corridors.
+
+    The candidate schedule has the shape of FEE_STRUCTURE and
+    INTERNATIONAL_FEE_STRUCTURE (entries may also carry 'tiers'); a missing
+    section falls back to the current config.
+    """
+
+    def __init__(self, fee_structure=None, international_fee_structure=None,
+                 amount_bands=DEFAULT_AMOUNT_BANDS, chunk_size=50000):
+        config = current_app.config
+        self.schedule = FeeSchedule.build(
+            [],
+            fee_structure if fee_structure is not None else config.get('FEE_STRUCTURE', {}),
+            international_fee_structure if international_fee_structure is not None
+            else config.get('INTERNATIONAL_FEE_STRUCTURE', {})
+        )
+        self.chunk_size = chunk_size
+
+        self.band_edges = np.array([_cents(edge) for edge in amount_bands], dtype=np.int64)
+        self.band_labels = [
+            f"{amount_bands[i]}-{amount_bands[i + 1]}" if i + 1 < len(amount_bands) else f"{amount_bands[i]}+"
+            for i in range(len(amount_bands))
+        ]
+
+        # Row key (type, cross-border, source, destination) -> group; group -> (fee_type, source, destination)
+        self._row_groups = {}
+        self._groups = {}
+        self._group_keys = []
+        self._group_rules = []
+
+        # Rule parameter arrays, indexed by rule code; code 0 means no fee
+        self._rules = {None: 0}
+        self._percent = [0]
+        self._fixed = [0]
+        self._min_fee = [0]
+        self._max_fee = [0]
+        self._tiers = [()]
+
+        self._counts = np.zeros(0, dtype=np.int64)
+        self._volume = np.zeros(0, dtype=np.int64)
+        self._current = np.zeros(0, dtype=np.int64)
+        self._candidate = np.zeros(0, dtype=np.int64)
+        self.rows = 0
+
+    @classmethod
+    def from_schedule(cls, candidate, **kwargs):
+        return cls(
+            fee_structure=candidate.get('FEE_STRUCTURE'),
+            international_fee_structure=candidate.get('INTERNATIONAL_FEE_STRUCTURE'),
+            **kwargs
+        )
+
+    def run(self, start=None, end=None):
+        query = select(
+            Transaction.transaction_type,
+            Transaction.is_cross_border,
+            Transaction.source_country,
+            Transaction.destination_country,
+            cast(func.round(Transaction.amount * 100), BigInteger),
+            cast(func.round(Transaction.fee * 100), BigInteger)
+        ).where(Transaction.status == TransactionStatus.completed)
+
+        if start:
+            query = query.where(Transaction.created_at >= start)
+        if end:
+            query = query.where(Transaction.created_at < end)
+
+        result = db.session.execute(query.execution_options(yield_per=self.chunk_size))
+        for rows in result.partitions():
+            self.add_chunk(*zip(*rows))
+
+        return self.report()
+
+    def add_chunk(self, transaction_types, cross_border, source_countries, destination_countries, amounts, fees):
+        count = len(amounts)
+        if count == 0:
+            return
+
+        row_groups = self._row_groups
+        groups = np.fromiter(
+            (
+                row_groups[key] if key in row_groups else self._register(key)
+                for key in zip(transaction_types, cross_border, source_countries, destination_countries)
+            ),
+            dtype=np.int64,
+            count=count
+        )
+        amounts = np.fromiter((amount or 0 for amount in amounts), dtype=np.int64, count=count)
+        fees = np.fromiter((fee or 0 for fee in fees), dtype=np.int64, count=count)
+
+        rule_codes = np.array(self._group_rules, dtype=np.int64)[groups]
+        candidate = self.candidate_fees(rule_codes, amounts)
+
+        bands = np.clip(np.searchsorted(self.band_edges, amounts, side='right') - 1, 0, len(self.band_edges) - 1)
+        cells = groups * len(self.band_edges) + bands
+        size = len(self._group_keys) * len(self.band_edges)
+
+        self._grow(size)
+        self._counts += np.bincount(cells, minlength=size)
+        self._volume += self._sum(cells, amounts, size)
+        self._current += self._sum(cells, fees, size)
+        self._candidate += self._sum(cells, candidate, size)
+        self.rows += count
+
+    def candidate_fees(self, rule_codes, amounts):
+        """Fee in cents for each amount under its rule, as FeeEngine.apply would charge it"""
+        percent = np.array(self._percent, dtype=np.int64)[rule_codes]
+        fixed = np.array(self._fixed, dtype=np.int64)[rule_codes]
+        numerator = amounts * percent + fixed * FEE_SCALE
+
+        for code, tiers in enumerate(self._tiers):
+            if not tiers:
+                continue
+
+            mask = rule_codes == code
+            if not mask.any():
+                continue
+
+            tier_amounts = amounts[mask]
+            remaining = tier_amounts.copy()
+            tiered = np.zeros(len(tier_amounts), dtype=np.int64)
+            for tier_min, tier_width, tier_percent in tiers:
+                taken = np.where(
+                    (tier_amounts > tier_min) & (remaining > 0),
+                    np.minimum(remaining, tier_width),
+                    0
+                )
+                tiered += taken * tier_percent
+                remaining -= taken
+
+            numerator[mask] = tiered + fixed[mask] * FEE_SCALE
+
+        min_fee = np.array(self._min_fee, dtype=np.int64)[rule_codes] * FEE_SCALE
+        max_fee = np.array(self._max_fee, dtype=np.int64)[rule_codes] * FEE_SCALE
+        numerator = np.minimum(np.maximum(numerator, min_fee), max_fee)
+
+        return _round_half_even(numerator, FEE_SCALE)
+
+    def report(self):
+        bands = len(self.band_edges)
+        lines = []
+
+        for cell in np.flatnonzero(self._counts):
+            fee_type, source_country, destination_country = self._group_keys[cell // bands]
+            lines.append({
+                'fee_type': fee_type,
+                'corridor': f"{source_country or '*'}-{destination_country or '*'}",
+                'amount_band': self.band_labels[cell % bands],
+                'transactions': int(self._counts[cell]),
+                'volume': int(self._volume[cell]),
+                'current_fees': int(self._current[cell]),
+                'candidate_fees': int(self._candidate[cell])
+            })
+
+        return {
+            'transactions': self.rows,
+            'totals': self._summarize(lines, None).get(None, self._format({})),
+            'by_fee_type': self._summarize(lines, 'fee_type'),
+            'by_corridor': self._summarize(lines, 'corridor'),
+            'by_amount_band': self._summarize(lines, 'amount_band'),
+            'detail': [self._format(line) for line in lines]
+        }
+
+    def _register(self, key):
+        transaction_type, is_cross_border, source_country, destination_country = key
+        type_value = getattr(transaction_type, 'value', transaction_type)
+
+        is_cross_region = False
+        if type_value == 'transfer' and not is_cross_border and source_country and destination_country:
+            is_cross_region = (
+                RegionService.get_region_by_country(source_country)
+                != RegionService.get_region_by_country(destination_country)
+            )
+
+        fee_type = FeeEngine.fee_type_for(type_value, bool(is_cross_border), is_cross_region)
+        group_key = (fee_type, source_country, destination_country)
+
+        group = self._groups.get(group_key)
+        if group is None:
+            group = len(self._group_keys)
+            self._groups[group_key] = group
+            self._group_keys.append(group_key)
+            rule = self.schedule.find(fee_type, Decimal('0'), source_country, destination_country)
+            self._group_rules.append(self._rule_code(rule))
+
+        self._row_groups[key] = group
+        return group
+
+    def _rule_code(self, rule):
+        if rule in self._rules:
+            return self._rules[rule]
+
+        code = len(self._percent)
+        self._rules[rule] = code
+
+        if rule.calculation_type == 'flat':
+            self._percent.append(0)
+            self._fixed.append(_cents(rule.rate + rule.fixed))
+        else:
+            self._percent.append(int((rule.rate * PERCENT_SCALE).to_integral_value()))
+            self._fixed.append(_cents(rule.fixed))
+
+        self._min_fee.append(_cents(rule.min_fee) if rule.min_fee is not None else 0)
+        self._max_fee.append(_cents(rule.max_fee) if rule.max_fee is not None else NO_CAP // FEE_SCALE)
+        self._tiers.append(tuple(
+            (
+                _cents(tier_min),
+                _cents(tier_max - tier_min) if tier_max.is_finite() else NO_CAP,
+                int((tier_rate * 100 * PERCENT_SCALE).to_integral_value())
+            )
+            for tier_min, tier_max, tier_rate in rule.tiers
+        ) if rule.calculation_type == 'tiered' else ())
+
+        return code
+
+    def _grow(self, size):
+        if len(self._counts) >= size:
+            return
+
+        for name in ('_counts', '_volume', '_current', '_candidate'):
+            current = getattr(self, name)
+            grown = np.zeros(size, dtype=np.int64)
+            grown[:len(current)] = current
+            setattr(self, name, grown)
+
+    @staticmethod
+    def _sum(cells, values, size):
+        # bincount sums in float64, which is exact for cent totals below 2**53
+        return np.rint(np.bincount(cells, weights=values, minlength=size)).astype(np.int64)
+
+    def _summarize(self, lines, field):
+        totals = {}
+        for line in lines:
+            key = line[field] if field else None
+            bucket = totals.setdefault(key, {'transactions': 0, 'volume': 0, 'current_fees': 0, 'candidate_fees': 0})
+            for name in bucket:
+                bucket[name] += line[name]
+
+        return {key: self._format(bucket) for key, bucket in totals.items()}
+
+    @staticmethod
+    def _format(line):
+        current = line.get('current_fees', 0)
+        candidate = line.get('candidate_fees', 0)
+
+        formatted = {key: value for key, value in line.items() if key not in ('volume', 'current_fees', 'candidate_fees')}
+        formatted.update({
+            'transactions': line.get('transactions', 0),
+            'volume': float(Decimal(line.get('volume', 0)) / 100),
+            'current_fees': float(Decimal(current) / 100),
+            'candidate_fees': float(Decimal(candidate) / 100),
+            'difference': float(Decimal(candidate - current) / 100),
+            'difference_pct': round((candidate - current) / current * 100, 2) if current else None
+        })
+        return formatted
@@ -0,0 +1,314 @@
+# services/fee_engine.py
+import threading
+import time
+from datetime import datetime, timezone
+from collections import namedtuple
+from decimal import Decimal
+from flask import current_app
+from sqlalchemy import event, func
+from sqlalchemy.orm import Session
+from ..extensions import db
+from ..models import Fee
+
+# A compiled fee rule; rate is a percentage for 'percentage' rules and an amount for 'flat' ones
+FeeRule = namedtuple('FeeRule', [
+    'fee_id', 'calculation_type', 'rate', 'fixed', 'min_fee', 'max_fee',
+    'min_amount', 'max_amount', 'tiers'
+])
+
+# Defaults the config-based calculators applied to missing keys
+TRANSFER_FEE_DEFAULTS = {
+    'percentage': Decimal('0'),
+    'fixed': Decimal('0'),
+    'min_fee': Decimal('0'),
+    'max_fee': Decimal('10000')
+}
+INTERNATIONAL_FEE_DEFAULTS = {
+    'percentage': Decimal('5'),
+    'fixed': Decimal('500'),
+    'min_fee': Decimal('1000'),
+    'max_fee': Decimal('10000')
+}
+
+# Fee.fee_type values and the schedule keys they price
+FEE_TYPE_KEYS = {
+    'transfer_fee': ('local_transfer', 'cross_region', 'international'),
+    'withdrawal_fee': ('withdrawal',),
+    'fx_fee': ('fx',)
+}
+
+
+def _utc(value):
+    if value is not None and value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
+def _decimal(value):
+    return Decimal(str(value)) if value is not None else None
+
+
+class FeeSchedule:
+    """Immutable fee index keyed by (fee_type, source_country, destination_country).
+
+    A None country is a wildcard. Only rules in effect when the schedule was built
+    are indexed; valid_until is the next effective_from/effective_to boundary, after
+    which the schedule has to be rebuilt.
+    """
+
+    def __init__(self, index, version, valid_until=None):
+        self._index = index
+        self.version = version
+        self.valid_until = valid_until
+        self.checked_at = time.monotonic()
+
+    def find(self, fee_type, amount, source_country=None, destination_country=None):
+        """Most specific rule whose amount band contains amount"""
+        keys = (
+            (fee_type, source_country, destination_country),
+            (fee_type, source_country, None),
+            (fee_type, None, destination_country),
+            (fee_type, None, None)
+        )
+
+        for key in dict.fromkeys(keys):
+            for rule in self._index.get(key, ()):
+                if rule.min_amount is not None and amount < rule.min_amount:
+                    continue
+                if rule.max_amount is not None and amount > rule.max_amount:
+                    continue
+                return rule
+
+        return None
+
+    def __len__(self):
+        return sum(len(rules) for rules in self._index.values())
+
+    @classmethod
+    def build(cls, fees, fee_structure=None, international_fee_structure=None, version=None, now=None):
+        """Compile Fee rows, then the config fee structures as lower-priority defaults"""
+        now = now or datetime.now(timezone.utc)
+        index = {}
+        boundaries = []
+
+        # Newest schedule first when several rows share a key
+        for fee in sorted(fees, key=lambda fee: _utc(fee.effective_from) or now, reverse=True):
+            effective_from = _utc(fee.effective_from)
+            effective_to = _utc(fee.effective_to)
+
+            if effective_from and effective_from > now:
+                boundaries.append(effective_from)
+                continue
+            if effective_to:
+                if effective_to < now:
+                    continue
+                boundaries.append(effective_to)
+
+            rule = cls._compile_fee(fee)
+            for fee_type in FEE_TYPE_KEYS.get(fee.fee_type, (fee.fee_type,)):
+                for source_country in fee.source_countries or [None]:
+                    for destination_country in fee.destination_countries or [None]:
+                        index.setdefault((fee_type, source_country, destination_country), []).append(rule)
+
+        for fee_type, config in (fee_structure or {}).items():
+            if isinstance(config, dict) and ('percentage' in config or 'tiers' in config):
+                index.setdefault((fee_type, None, None), []).append(
+                    cls._compile_config(config, TRANSFER_FEE_DEFAULTS)
+                )
+
+        for route_key, config in (international_fee_structure or {}).items():
+            if route_key == 'default':
+                key = ('international', None, None)
+            else:
+                source_country, _, destination_country = route_key.partition('_')
+                key = ('international', source_country, destination_country)
+
+            rule = cls._compile_config(config, INTERNATIONAL_FEE_DEFAULTS)
+            rules = index.setdefault(key, [])
+            # The route table is authoritative for international defaults
+            rules[:] = [existing for existing in rules if existing.fee_id is not None] + [rule]
+
+        return cls(index, version, min(boundaries) if boundaries else None)
+
+    @staticmethod
+    def _compile_tiers(tiers):
+        return tuple(
+            (
+                Decimal(str(tier['min'])),
+                Decimal(str(tier['max'])) if tier.get('max') is not None else Decimal('Infinity'),
+                Decimal(str(tier['rate'])) / Decimal('100')
+            )
+            for tier in sorted(tiers or [], key=lambda tier: tier['min'])
+        )
+
+    @classmethod
+    def _compile_fee(cls, fee):
+        return FeeRule(
+            fee_id=fee.id,
+            calculation_type=fee.calculation_type,
+            rate=_decimal(fee.rate) or Decimal('0'),
+            fixed=Decimal('0'),
+            min_fee=_decimal(fee.min_fee),
+            max_fee=_decimal(fee.max_fee),
+            min_amount=_decimal(fee.min_amount),
+            max_amount=_decimal(fee.max_amount),
+            tiers=cls._compile_tiers(fee.tiers)
+        )
+
+    @classmethod
+    def _compile_config(cls, config, defaults):
+        # A config entry may carry 'tiers' (as on Fee) in place of a flat percentage
+        tiers = cls._compile_tiers(config.get('tiers'))
+
+        return FeeRule(
+            fee_id=None,
+            calculation_type='tiered' if tiers else 'percentage',
+            rate=_decimal(config.get('percentage', defaults['percentage'])),
+            fixed=_decimal(config.get('fixed', defaults['fixed'])),
+            min_fee=_decimal(config.get('min_fee', defaults['min_fee'])),
+            max_fee=_decimal(config.get('max_fee', defaults['max_fee'])),
+            min_amount=None,
+            max_amount=None,
+            tiers=tiers
+        )
+
+
+class FeeEngine:
+    """Process-local compiled fee schedule.
+
+    Built from the active Fee rows plus FEE_STRUCTURE / INTERNATIONAL_FEE_STRUCTURE.
+    The schedule is rebuilt when a committed session touched a Fee, when the fees
+    table version (row count, latest change) moves - checked at most every
+    FEE_ENGINE_CHECK_INTERVAL seconds - or when a rule's effective window opens or
+    closes.
+    """
+
+    _schedule = None
+    _lock = threading.Lock()
+
+    @classmethod
+    def calculate(cls, fee_type, amount, source_country=None, destination_country=None):
+        amount = Decimal(str(amount))
+        rule = cls.get_schedule().find(fee_type, amount, source_country, destination_country)
+        if rule is None:
+            return Decimal('0.00')
+
+        return cls.apply(rule, amount)
+
+    @staticmethod
+    def fee_type_for(transaction_type='transfer', is_cross_border=False, is_cross_region=False):
+        """Schedule key for a transaction type or a Fee.fee_type ('transfer_fee', 'withdrawal_fee', 'fx_fee')"""
+        if transaction_type in FEE_TYPE_KEYS and transaction_type != 'transfer_fee':
+            return FEE_TYPE_KEYS[transaction_type][0]
+        if transaction_type not in ('transfer', 'transfer_fee'):
+            return transaction_type
+        if is_cross_border:
+            return 'international'
+        if is_cross_region:
+            return 'cross_region'
+        return 'local_transfer'
+
+    @staticmethod
+    def apply(rule, amount):
+        if rule.calculation_type == 'percentage':
+            fee = amount * (rule.rate / Decimal('100')) + rule.fixed
+        elif rule.calculation_type == 'flat':
+            fee = rule.rate + rule.fixed
+        elif rule.calculation_type == 'tiered' and rule.tiers:
+            fee = FeeEngine._tiered(rule.tiers, amount) + rule.fixed
+        else:
+            fee = Decimal('0.00')
+
+        if rule.min_fee is not None and fee < rule.min_fee:
+            fee = rule.min_fee
+        if rule.max_fee is not None and fee > rule.max_fee:
+            fee = rule.max_fee
+
+        return fee.quantize(Decimal('0.01'))
+
+    @staticmethod
+    def _tiered(tiers, amount):
+        # Same banding as Fee._calculate_tiered_fee
+        fee = Decimal('0.00')
+        remaining = amount
+
+        for tier_min, tier_max, tier_rate in tiers:
+            if remaining <= 0:
+                break
+
+            if amount > tier_min:
+                tier_amount = min(remaining, tier_max - tier_min)
+                fee += tier_amount * tier_rate
+                remaining -= tier_amount
+
+        return fee
+
+    @classmethod
+    def get_schedule(cls):
+        schedule = cls._schedule
+        if schedule is None or cls._is_outdated(schedule):
+            schedule = cls.refresh()
+        return schedule
+
+    @classmethod
+    def refresh(cls):
+        with cls._lock:
+            schedule = cls._schedule
+            if schedule is not None and not cls._is_outdated(schedule):
+                return schedule
+
+            version = cls._current_version()
+            if schedule is not None and schedule.version == version and not cls._window_passed(schedule):
+                # Nothing changed; trust this schedule for another interval
+                schedule.checked_at = time.monotonic()
+                return schedule
+
+            schedule = FeeSchedule.build(
+                Fee.query.filter_by(is_active=True).all(),
+                current_app.config.get('FEE_STRUCTURE', {}),
+                current_app.config.get('INTERNATIONAL_FEE_STRUCTURE', {}),
+                version=version
+            )
+            cls._schedule = schedule
+            return schedule
+
+    @classmethod
+    def invalidate(cls):
+        cls._schedule = None
+
+    @staticmethod
+    def _current_version():
+        count, last_change = db.session.query(
+            func.count(Fee.id),
+            func.max(func.coalesce(Fee.updated_at, Fee.created_at))
+        ).one()
+        return (count, _utc(last_change))
+
+    @classmethod
+    def _is_outdated(cls, schedule):
+        if cls._window_passed(schedule):
+            return True
+
+        interval = current_app.config.get('FEE_ENGINE_CHECK_INTERVAL', 30)
+        return time.monotonic() - schedule.checked_at > interval
+
+    @staticmethod
+    def _window_passed(schedule):
+        return schedule.valid_until is not None and datetime.now(timezone.utc) >= schedule.valid_until
+
+
+@event.listens_for(Session, 'after_flush')
+def _track_fee_changes(session, flush_context):
+    if any(isinstance(instance, Fee) for instance in (*session.new, *session.dirty, *session.deleted)):
+        session.info['fees_changed'] = True
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_fee_schedule(session):
+    if session.info.pop('fees_changed', False):
+        FeeEngine.invalidate()
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_fee_changes(session):
+    session.info.pop('fees_changed', None)
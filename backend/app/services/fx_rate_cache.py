@@ -0,0 +1,137 @@
+# services/fx_rate_cache.py
+import threading
+import time
+from datetime import timezone
+from collections import namedtuple
+from decimal import Decimal, ROUND_HALF_UP
+from flask import current_app
+from ..models import ExchangeRate
+
+# A single cell of the rate matrix: 1 base = rate target
+RateEntry = namedtuple('RateEntry', ['rate', 'last_updated', 'provider'])
+
+ANCHOR_CURRENCY = 'USD'
+RATE_PRECISION = Decimal('0.000001')
+
+
+class RateMatrix:
+    """Immutable currency x currency snapshot built from the exchange_rates table"""
+
+    def __init__(self, entries, built_at):
+        self._entries = entries
+        self.built_at = built_at
+
+    def get(self, base_currency, target_currency):
+        return self._entries.get((base_currency, target_currency))
+
+    def oldest_update(self):
+        timestamps = [
+            entry.last_updated if entry.last_updated.tzinfo else entry.last_updated.replace(tzinfo=timezone.utc)
+            for entry in self._entries.values()
+            if entry.last_updated
+        ]
+        return min(timestamps) if timestamps else None
+
+    def currencies(self):
+        return sorted({pair[0] for pair in self._entries})
+
+    def __len__(self):
+        return len(self._entries)
+
+    @classmethod
+    def build(cls, rates, built_at=None):
+        """Build the full matrix: direct pairs, their inverses, then crosses through USD"""
+        entries = {}
+
+        for rate in rates:
+            if not rate.rate:
+                continue
+            entries[(rate.base_currency, rate.target_currency)] = RateEntry(
+                Decimal(str(rate.rate)),
+                rate.last_updated,
+                rate.fx_provider or 'internal'
+            )
+
+        # Inverse of a direct quote is more accurate than a triangulated cross
+        for (base, target), entry in list(entries.items()):
+            if (target, base) not in entries:
+                entries[(target, base)] = RateEntry(
+                    (Decimal('1') / entry.rate).quantize(RATE_PRECISION, rounding=ROUND_HALF_UP),
+                    entry.last_updated,
+                    entry.provider
+                )
+
+        # 1 USD = X currency, for every currency quoted against the anchor
+        anchor_legs = {
+            target: entry
+            for (base, target), entry in entries.items()
+            if base == ANCHOR_CURRENCY
+        }
+        anchor_legs[ANCHOR_CURRENCY] = RateEntry(Decimal('1'), None, 'internal')
+
+        for base, base_leg in anchor_legs.items():
+            for target, target_leg in anchor_legs.items():
+                if base == target or (base, target) in entries:
+                    continue
+
+                legs = [leg.last_updated for leg in (base_leg, target_leg) if leg.last_updated]
+                entries[(base, target)] = RateEntry(
+                    (target_leg.rate / base_leg.rate).quantize(RATE_PRECISION, rounding=ROUND_HALF_UP),
+                    min(legs) if legs else None,
+                    'triangulated'
+                )
+
+        return cls(entries, built_at if built_at is not None else time.monotonic())
+
+
+class FXRateCache:
+    """Process-local rate matrix with a TTL of EXCHANGE_RATE_UPDATE_INTERVAL seconds.
+
+    Readers always see a complete matrix: refreshes build a new one and swap the
+    reference, they never mutate the one being read.
+    """
+
+    _matrix = None
+    _lock = threading.Lock()
+
+    @classmethod
+    def get_matrix(cls):
+        matrix = cls._matrix
+        if matrix is None or cls._is_expired(matrix):
+            matrix = cls.refresh()
+        return matrix
+
+    @classmethod
+    def peek(cls):
+        """Current matrix without triggering a rebuild (may be None)"""
+        return cls._matrix
+
+    @classmethod
+    def lookup(cls, base_currency, target_currency):
+        return cls.get_matrix().get(base_currency, target_currency)
+
+    @classmethod
+    def refresh(cls):
+        """Rebuild the matrix from a single query and swap it in"""
+        with cls._lock:
+            matrix = cls._matrix
+            # Another thread may have rebuilt it while we waited for the lock
+            if matrix is not None and not cls._is_expired(matrix):
+                return matrix
+
+            matrix = RateMatrix.build(ExchangeRate.query.all())
+            cls._matrix = matrix
+            return matrix
+
+    @classmethod
+    def invalidate(cls):
+        """Drop the current matrix so the next lookup rebuilds it"""
+        cls._matrix = None
+
+    @staticmethod
+    def _ttl():
+        return current_app.config.get('EXCHANGE_RATE_UPDATE_INTERVAL', 900)
+
+    @classmethod
+    def _is_expired(cls, matrix):
+        return time.monotonic() - matrix.built_at > cls._ttl()
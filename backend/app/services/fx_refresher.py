@@ -0,0 +1,189 @@
+# services/fx_refresher.py
+import threading
+import time
+from datetime import datetime, timezone
+from flask import current_app
+from ..extensions import db
+from ..models import ExchangeRate
+from .fx_rate_cache import FXRateCache
+
+
+class FXRateRefresher:
+    """Keeps exchange rates fresh outside the request path.
+
+    A daemon thread refreshes every known base currency ahead of expiry, and
+    requests that hit a stale rate schedule a refresh instead of calling the
+    provider themselves. At most one refresh per base currency runs at a time;
+    everyone else waits on (or ignores) the one already in flight.
+    """
+
+    _app = None
+    _thread = None
+    _stop = threading.Event()
+    _lock = threading.Lock()
+    _in_flight = {}
+    _last_attempt = {}
+    _stats = {
+        'refreshes': 0,
+        'failures': 0,
+        'last_refresh_at': None,
+        'last_error': None
+    }
+
+    @classmethod
+    def init_app(cls, app):
+        cls._app = app
+
+        if app.config.get('FX_REFRESH_ON_CREATE_APP', False) and not app.testing:
+            cls.start()
+
+    @classmethod
+    def start(cls):
+        with cls._lock:
+            if cls._thread and cls._thread.is_alive():
+                return
+
+            cls._stop.clear()
+            cls._thread = threading.Thread(target=cls._run, name='fx-rate-refresher', daemon=True)
+            cls._thread.start()
+
+    @classmethod
+    def stop(cls):
+        cls._stop.set()
+
+    @classmethod
+    def request_refresh(cls, base_currency):
+        """Schedule a refresh of one base currency; returns an Event set when it finishes"""
+        app = cls._get_app()
+
+        event, owner = cls._claim(base_currency, app)
+        if not owner:
+            return event
+
+        if app.config.get('FX_REFRESH_ASYNC', True):
+            threading.Thread(
+                target=cls._refresh_claimed,
+                args=(app, base_currency, event),
+                daemon=True
+            ).start()
+        else:
+            cls._refresh_claimed(app, base_currency, event)
+
+        return event
+
+    @classmethod
+    def refresh_now(cls, base_currency):
+        """Refresh a base currency and wait (bounded) for the result"""
+        app = cls._get_app()
+        event = cls.request_refresh(base_currency)
+        return event.wait(app.config.get('FX_REFRESH_WAIT_SECONDS', 10))
+
+    @classmethod
+    def get_metrics(cls):
+        now = datetime.now(timezone.utc)
+        matrix = FXRateCache.peek()
+        oldest = matrix.oldest_update() if matrix else None
+
+        with cls._lock:
+            in_flight = sorted(cls._in_flight)
+            stats = dict(cls._stats)
+
+        return {
+            'rate_age_seconds': (now - oldest).total_seconds() if oldest else None,
+            'matrix_age_seconds': round(time.monotonic() - matrix.built_at, 3) if matrix else None,
+            'matrix_pairs': len(matrix) if matrix else 0,
+            'refreshes': stats['refreshes'],
+            'failures': stats['failures'],
+            'last_refresh_at': stats['last_refresh_at'].isoformat() if stats['last_refresh_at'] else None,
+            'last_error': stats['last_error'],
+            'in_flight': in_flight,
+            'scheduler_running': bool(cls._thread and cls._thread.is_alive())
+        }
+
+    @classmethod
+    def _claim(cls, base_currency, app):
+        retry_after = app.config.get('FX_REFRESH_RETRY_SECONDS', 60)
+
+        with cls._lock:
+            event = cls._in_flight.get(base_currency)
+            if event:
+                return event, False
+
+            # Back off after a recent attempt so a failing provider is not hammered
+            last_attempt = cls._last_attempt.get(base_currency)
+            if last_attempt and time.monotonic() - last_attempt < retry_after:
+                done = threading.Event()
+                done.set()
+                return done, False
+
+            event = threading.Event()
+            cls._in_flight[base_currency] = event
+            cls._last_attempt[base_currency] = time.monotonic()
+            return event, True
+
+    @classmethod
+    def _refresh_claimed(cls, app, base_currency, event):
+        from .currency_service import CurrencyService
+
+        try:
+            with app.app_context():
+                try:
+                    CurrencyService.refresh_rates(base_currency)
+                    FXRateCache.refresh()
+                finally:
+                    db.session.remove()
+
+            with cls._lock:
+                cls._stats['refreshes'] += 1
+                cls._stats['last_refresh_at'] = datetime.now(timezone.utc)
+
+        except Exception as e:
+            with cls._lock:
+                cls._stats['failures'] += 1
+                cls._stats['last_error'] = f"{base_currency}: {str(e)}"
+            app.logger.error(f"Background FX refresh failed for {base_currency}: {str(e)}")
+
+        finally:
+            with cls._lock:
+                cls._in_flight.pop(base_currency, None)
+            event.set()
+
+    @classmethod
+    def _run(cls):
+        app = cls._app
+        interval = app.config.get(
+            'FX_REFRESH_INTERVAL',
+            int(app.config.get('EXCHANGE_RATE_UPDATE_INTERVAL', 900) * 0.8)
+        )
+
+        # Refresh once on start, so a new worker does not serve rates a full interval old
+        while True:
+            for base_currency in cls._base_currencies(app):
+                event = cls.request_refresh(base_currency)
+                event.wait(app.config.get('FX_REFRESH_WAIT_SECONDS', 10))
+            if cls._stop.wait(interval):
+                break
+
+    @staticmethod
+    def _base_currencies(app):
+        bases = list(app.config.get('FX_REFRESH_BASES', ['USD']))
+
+        try:
+            with app.app_context():
+                try:
+                    stored = db.session.query(ExchangeRate.base_currency).distinct().all()
+                finally:
+                    db.session.remove()
+        except Exception as e:
+            app.logger.error(f"Failed to list FX base currencies: {str(e)}")
+            stored = []
+
+        for (base_currency,) in stored:
+            if base_currency not in bases:
+                bases.append(base_currency)
+
+        return bases
+
+    @classmethod
+    def _get_app(cls):
+        return cls._app or current_app._get_current_object()
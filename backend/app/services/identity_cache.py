@@ -0,0 +1,130 @@
+# services/identity_cache.py
+from collections import namedtuple
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+from ..cache import TTLCache
+from ..extensions import db
+from ..models import User, Wallet
+
+# What token_required and the role/KYC decorators need about a user
+Identity = namedtuple('Identity', ['user_id', 'is_active', 'is_admin', 'kyc_status', 'wallet_id'])
+
+_NOT_LOADED = object()
+
+
+class IdentityCache:
+    """Per-process cache of authenticated users' identities.
+
+    An entry holds the user's active/admin/KYC flags and wallet id, read in one
+    query joining users and wallets, and lives for AUTH_IDENTITY_TTL seconds. A
+    commit in this process that changes a user (deactivation, password or KYC
+    change, ...) or their wallet (status change, creation) drops the entry
+    straight away; other processes see the change once their entry expires.
+    """
+
+    _entries = TTLCache('AUTH_IDENTITY_TTL', 10, 'AUTH_IDENTITY_CACHE_SIZE', 50000)
+
+    @classmethod
+    def get(cls, user_id):
+        """The user's Identity, or None if there is no such user"""
+        identity = cls._entries.get(user_id, _NOT_LOADED)
+        if identity is not _NOT_LOADED:
+            return identity
+
+        row = db.session.query(
+            User.id, User.is_active, User.is_admin, User.kyc_status, Wallet.id
+        ).outerjoin(Wallet, Wallet.user_id == User.id).filter(User.id == user_id).first()
+        identity = Identity(*row) if row else None
+
+        cls._entries.set(user_id, identity)
+        return identity
+
+    @classmethod
+    def invalidate(cls, user_ids=None):
+        if user_ids is None:
+            cls._entries.clear()
+        else:
+            cls._entries.discard(user_ids)
+
+
+class AuthenticatedUser:
+    """The user token_required passes to routes, loaded from the database only when needed.
+
+    id and the flags the auth decorators check come from the identity cache;
+    reading or setting any other attribute loads the User (once) and goes to it.
+    One is made per request, so wallet loads the user's wallet at most once per
+    request.
+    """
+
+    def __init__(self, identity):
+        object.__setattr__(self, '_identity', identity)
+        object.__setattr__(self, '_user', None)
+        object.__setattr__(self, '_wallet', _NOT_LOADED)
+
+    @property
+    def id(self):
+        return self._identity.user_id
+
+    @property
+    def is_active(self):
+        return self._identity.is_active
+
+    @property
+    def is_admin(self):
+        return self._identity.is_admin
+
+    @property
+    def kyc_status(self):
+        return self._identity.kyc_status
+
+    @property
+    def wallet(self):
+        if self._wallet is _NOT_LOADED:
+            wallet_id = self._identity.wallet_id
+            object.__setattr__(self, '_wallet', db.session.get(Wallet, wallet_id) if wallet_id else None)
+        return self._wallet
+
+    def get_user(self):
+        if self._user is None:
+            object.__setattr__(self, '_user', db.session.get(User, self.id))
+        return self._user
+
+    def __getattr__(self, name):
+        return getattr(self.get_user(), name)
+
+    def __setattr__(self, name, value):
+        setattr(self.get_user(), name, value)
+
+    def __repr__(self):
+        return f'<AuthenticatedUser {self.id}>'
+
+
+@event.listens_for(Session, 'after_flush')
+def _track_identity_changes(session, flush_context):
+    user_ids = set()
+
+    for instance in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(instance, User):
+            user_ids.add(instance.id)
+        elif isinstance(instance, Wallet):
+            # Balance movements leave identities alone
+            if instance in session.dirty and not inspect(instance).attrs.status.history.has_changes():
+                continue
+            user_ids.add(instance.user_id)
+
+    user_ids.discard(None)
+    if user_ids:
+        session.info.setdefault('identities_changed', set()).update(user_ids)
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_identities(session):
+    user_ids = session.info.pop('identities_changed', None)
+    if user_ids:
+        IdentityCache.invalidate(user_ids)
+
+
+@event.listens_for(Session, 'after_soft_rollback')
+def _discard_identity_changes(session, previous_transaction):
+    if not previous_transaction.nested:
+        session.info.pop('identities_changed', None)
@@ -0,0 +1,163 @@
+# services/quote_store.py
+import threading
+import uuid
+from datetime import datetime, timezone
+from collections import namedtuple
+from decimal import Decimal
+from ..extensions import db
+from ..models import TransferQuote
+
+# Everything initiation needs, resolved when the quote was issued
+QuoteSnapshot = namedtuple('QuoteSnapshot', [
+    'quote_id', 'quote_type', 'user_id',
+    'sender_wallet_id', 'receiver_wallet_id',
+    'amount', 'currency', 'converted_amount', 'sender_currency',
+    'receiver_amount', 'receiver_currency', 'fee', 'total_amount',
+    'exchange_rate', 'fx_provider', 'fx_timestamp',
+    'is_cross_border', 'source_country', 'destination_country',
+    'expires_at', 'details'
+])
+
+
+class QuoteStore:
+    """Transfer quotes with their rate and fees locked in.
+
+    Quotes are written to transfer_quotes so any worker can honour them, and kept
+    in a process-local TTL cache so the worker that issued one can initiate it
+    without a read. A quote is single use: consume() flips it to 'used' in the
+    same transaction as the transfer.
+    """
+
+    _cache = {}
+    _lock = threading.Lock()
+
+    @classmethod
+    def save(cls, quote_type, user_id, ttl, details=None, **fields):
+        expires_at = datetime.now(timezone.utc) + ttl
+
+        quote = TransferQuote(
+            quote_type=quote_type,
+            user_id=user_id,
+            expires_at=expires_at,
+            meta_data=details,
+            **fields
+        )
+        db.session.add(quote)
+        db.session.commit()
+
+        snapshot = cls._snapshot(quote)
+        with cls._lock:
+            cls._purge_expired()
+            cls._cache[snapshot.quote_id] = snapshot
+
+        return snapshot
+
+    @classmethod
+    def get(cls, quote_id, user_id=None, quote_type=None):
+        """Active, unexpired quote or None"""
+        quote_id = str(quote_id)
+
+        with cls._lock:
+            snapshot = cls._cache.get(quote_id)
+
+        if snapshot is None:
+            public_id = cls._parse_id(quote_id)
+            if public_id is None:
+                return None
+
+            quote = TransferQuote.query.filter_by(public_id=public_id, status='active').first()
+            if not quote:
+                return None
+
+            snapshot = cls._snapshot(quote)
+            with cls._lock:
+                cls._cache[quote_id] = snapshot
+
+        if cls._is_expired(snapshot):
+            cls.forget(quote_id)
+            return None
+
+        if user_id is not None and snapshot.user_id != user_id:
+            return None
+
+        if quote_type is not None and snapshot.quote_type != quote_type:
+            return None
+
+        return snapshot
+
+    @classmethod
+    def consume(cls, quote_id, transaction_id=None):
+        """Mark a quote used; False if another request already used it.
+
+        Runs in the caller's transaction, so a rolled-back transfer leaves the quote active.
+        """
+        public_id = cls._parse_id(quote_id)
+        if public_id is None:
+            return False
+
+        updated = TransferQuote.query.filter_by(public_id=public_id, status='active').update({
+            'status': 'used',
+            'used_at': datetime.now(timezone.utc),
+            'transaction_id': transaction_id
+        }, synchronize_session=False)
+
+        cls.forget(quote_id)
+        return updated == 1
+
+    @classmethod
+    def forget(cls, quote_id):
+        with cls._lock:
+            cls._cache.pop(str(quote_id), None)
+
+    @classmethod
+    def clear(cls):
+        with cls._lock:
+            cls._cache = {}
+
+    @classmethod
+    def _purge_expired(cls):
+        # Caller holds the lock
+        expired = [quote_id for quote_id, snapshot in cls._cache.items() if cls._is_expired(snapshot)]
+        for quote_id in expired:
+            del cls._cache[quote_id]
+
+    @staticmethod
+    def _is_expired(snapshot):
+        return datetime.now(timezone.utc) > snapshot.expires_at
+
+    @staticmethod
+    def _parse_id(quote_id):
+        try:
+            return uuid.UUID(str(quote_id))
+        except (ValueError, TypeError):
+            return None
+
+    @staticmethod
+    def _snapshot(quote):
+        expires_at = quote.expires_at
+        if expires_at.tzinfo is None:
+            expires_at = expires_at.replace(tzinfo=timezone.utc)
+
+        return QuoteSnapshot(
+            quote_id=str(quote.public_id),
+            quote_type=quote.quote_type,
+            user_id=quote.user_id,
+            sender_wallet_id=quote.sender_wallet_id,
+            receiver_wallet_id=quote.receiver_wallet_id,
+            amount=Decimal(str(quote.amount)),
+            currency=quote.currency,
+            converted_amount=Decimal(str(quote.converted_amount)),
+            sender_currency=quote.sender_currency,
+            receiver_amount=Decimal(str(quote.receiver_amount)),
+            receiver_currency=quote.receiver_currency,
+            fee=Decimal(str(quote.fee)),
+            total_amount=Decimal(str(quote.total_amount)),
+            exchange_rate=Decimal(str(quote.exchange_rate)) if quote.exchange_rate is not None else None,
+            fx_provider=quote.fx_provider,
+            fx_timestamp=quote.fx_timestamp,
+            is_cross_border=quote.is_cross_border,
+            source_country=quote.source_country,
+            destination_country=quote.destination_country,
+            expires_at=expires_at,
+            details=quote.meta_data or {}
+        )
@@ -0,0 +1,319 @@
+# services/risk_engine.py
+import threading
+import time
+from collections import deque, namedtuple
+from decimal import Decimal
+from flask import current_app
+
+# What the engine sees of one transfer; amount is in the sender wallet's currency
+TransferSignal = namedtuple('TransferSignal', [
+    'wallet_id', 'device_id', 'ip_address', 'counterparty', 'amount', 'at'
+])
+
+# A compiled rule; limit is in cents for 'sum' and 'amount'
+RiskRule = namedtuple('RiskRule', ['name', 'dimension', 'metric', 'window', 'limit', 'action', 'reason'])
+
+RiskDecision = namedtuple('RiskDecision', ['action', 'rules', 'reasons', 'elapsed_ms', 'over_budget'])
+
+# In increasing severity
+ACTIONS = ('allow', 'hold', 'block')
+SEVERITY = {action: rank for rank, action in enumerate(ACTIONS)}
+
+# Windowed dimensions and the signal field that keys them
+WINDOW_DIMENSIONS = {'wallet': 'wallet_id', 'device': 'device_id', 'ip': 'ip_address'}
+WINDOW_METRICS = ('count', 'sum', 'distinct_counterparties')
+
+# Events kept per window; older ones are dropped (and leave the running totals) first
+MAX_WINDOW_EVENTS = 10000
+
+# Seconds between sweeps of idle keys
+SWEEP_INTERVAL = 60
+
+
+def _cents(amount):
+    return int((Decimal(str(amount)) * 100).to_integral_value())
+
+
+class SlidingWindow:
+    """Events of one key within the last span seconds, with running count, sum and counterparties"""
+
+    __slots__ = ('span', 'events', 'total', 'counterparties')
+
+    def __init__(self, span):
+        self.span = span
+        self.events = deque()
+        self.total = 0
+        self.counterparties = {}
+
+    def add(self, at, cents, counterparty):
+        if len(self.events) >= MAX_WINDOW_EVENTS:
+            self._drop()
+
+        self.events.append((at, cents, counterparty))
+        self.total += cents
+        if counterparty is not None:
+            self.counterparties[counterparty] = self.counterparties.get(counterparty, 0) + 1
+
+    def expire(self, now):
+        horizon = now - self.span
+        events = self.events
+        while events and events[0][0] <= horizon:
+            self._drop()
+
+    def _drop(self):
+        _, cents, counterparty = self.events.popleft()
+        self.total -= cents
+        if counterparty is not None:
+            remaining = self.counterparties[counterparty] - 1
+            if remaining:
+                self.counterparties[counterparty] = remaining
+            else:
+                del self.counterparties[counterparty]
+
+
+class RiskEngine:
+    """Declarative velocity rules evaluated in-process on every transfer.
+
+    Sliding windows per wallet, device and IP keep a running count, sum and set
+    of counterparties, so evaluating a rule is a dictionary lookup plus the
+    eviction of expired events. A rule fires when its metric, including the
+    transfer being evaluated, exceeds its limit; the most severe action wins.
+    Evaluation stops once RISK_ENGINE_BUDGET_MS of rule checks (time spent
+    waiting for the lock excluded) is spent and then applies
+    RISK_ENGINE_OVER_BUDGET_ACTION.
+
+    State is per process and starts empty, so it complements the durable limits
+    in VelocityCounters and UsageAggregates rather than replacing them.
+    """
+
+    _rules = None
+    _spans = {}
+    _windows = {}
+    _lock = threading.Lock()
+    _last_sweep = 0.0
+    _stats = {
+        'evaluations': 0,
+        'over_budget': 0,
+        'max_ms': 0.0,
+        'actions': {action: 0 for action in ACTIONS}
+    }
+
+    @classmethod
+    def is_enabled(cls):
+        return current_app.config.get('RISK_ENGINE_ENABLED', True)
+
+    @classmethod
+    def get_rules(cls):
+        if cls._rules is None:
+            cls.configure(current_app.config.get('RISK_RULES', []))
+        return cls._rules
+
+    @classmethod
+    def configure(cls, rules):
+        """Compile rule definitions and start from empty windows"""
+        compiled = tuple(cls._compile(rule) for rule in rules)
+
+        spans = {}
+        for rule in compiled:
+            if rule.dimension in WINDOW_DIMENSIONS:
+                spans.setdefault(rule.dimension, set()).add(rule.window)
+
+        with cls._lock:
+            cls._rules = compiled
+            cls._spans = {dimension: tuple(sorted(windows)) for dimension, windows in spans.items()}
+            cls._windows = {}
+
+        return compiled
+
+    @classmethod
+    def reset(cls):
+        """Forget the rules, windows and stats, as at process start"""
+        with cls._lock:
+            cls._rules = None
+            cls._spans = {}
+            cls._windows = {}
+            cls._last_sweep = 0.0
+            cls._stats = {
+                'evaluations': 0,
+                'over_budget': 0,
+                'max_ms': 0.0,
+                'actions': {action: 0 for action in ACTIONS}
+            }
+
+    @staticmethod
+    def signal(wallet_id, counterparty, amount, device_id=None, ip_address=None, at=None):
+        return TransferSignal(
+            wallet_id=wallet_id,
+            device_id=device_id or None,
+            ip_address=ip_address or None,
+            counterparty=counterparty,
+            amount=Decimal(str(amount)),
+            at=at if at is not None else time.time()
+        )
+
+    @classmethod
+    def evaluate(cls, signal):
+        rules = cls.get_rules()
+        budget = current_app.config.get('RISK_ENGINE_BUDGET_MS', 1.0) / 1000
+        fallback = current_app.config.get('RISK_ENGINE_OVER_BUDGET_ACTION', 'hold')
+
+        action = 'allow'
+        fired = []
+        reasons = []
+        over_budget = False
+        cents = _cents(signal.amount)
+
+        with cls._lock:
+            # The budget covers rule evaluation, not waiting for observe() or a sweep
+            started = time.perf_counter()
+            for rule in rules:
+                if time.perf_counter() - started > budget:
+                    over_budget = True
+                    break
+
+                value = cls._measure(rule, signal, cents)
+                if value is None or value <= rule.limit:
+                    continue
+
+                fired.append(rule.name)
+                reasons.append(rule.reason)
+                if SEVERITY[rule.action] > SEVERITY[action]:
+                    action = rule.action
+
+            elapsed = time.perf_counter() - started
+
+            if over_budget:
+                if SEVERITY[fallback] > SEVERITY[action]:
+                    action = fallback
+                reasons.append('Risk evaluation exceeded its time budget')
+
+            # Updated under the lock so concurrent evaluations do not lose counts
+            stats = cls._stats
+            stats['evaluations'] += 1
+            stats['over_budget'] += over_budget
+            stats['max_ms'] = max(stats['max_ms'], elapsed * 1000)
+            stats['actions'][action] += 1
+
+        return RiskDecision(
+            action=action,
+            rules=fired,
+            reasons=reasons,
+            elapsed_ms=elapsed * 1000,
+            over_budget=over_budget
+        )
+
+    @classmethod
+    def observe(cls, signal):
+        """Add a transfer that went ahead (completed or held) to its windows"""
+        cls.get_rules()
+        cents = _cents(signal.amount)
+
+        with cls._lock:
+            for dimension, field in WINDOW_DIMENSIONS.items():
+                key = getattr(signal, field)
+                spans = cls._spans.get(dimension)
+                if key is None or not spans:
+                    continue
+
+                windows = cls._windows.get((dimension, key))
+                if windows is None:
+                    windows = cls._windows[(dimension, key)] = {span: SlidingWindow(span) for span in spans}
+
+                for window in windows.values():
+                    window.expire(signal.at)
+                    window.add(signal.at, cents, signal.counterparty)
+
+            cls._sweep(signal.at)
+
+    @classmethod
+    def get_stats(cls):
+        with cls._lock:
+            return {
+                **cls._stats,
+                'actions': dict(cls._stats['actions']),
+                'keys': len(cls._windows)
+            }
+
+    @classmethod
+    def _measure(cls, rule, signal, cents):
+        # Caller holds the lock
+        if rule.metric == 'amount':
+            return cents
+
+        key = getattr(signal, WINDOW_DIMENSIONS[rule.dimension])
+        if key is None:
+            return None
+
+        windows = cls._windows.get((rule.dimension, key))
+        window = windows.get(rule.window) if windows else None
+
+        if window is None:
+            count, total, distinct, seen = 0, 0, 0, False
+        else:
+            window.expire(signal.at)
+            count, total = len(window.events), window.total
+            distinct = len(window.counterparties)
+            seen = signal.counterparty in window.counterparties
+
+        if rule.metric == 'count':
+            return count + 1
+        if rule.metric == 'sum':
+            return total + cents
+        return distinct + (0 if seen or signal.counterparty is None else 1)
+
+    @classmethod
+    def _sweep(cls, now):
+        # Caller holds the lock
+        max_keys = current_app.config.get('RISK_ENGINE_MAX_KEYS', 100000)
+        if now - cls._last_sweep < SWEEP_INTERVAL and len(cls._windows) <= max_keys:
+            return
+
+        cls._last_sweep = now
+        idle = []
+        for key, windows in cls._windows.items():
+            for window in windows.values():
+                window.expire(now)
+            if not any(window.events for window in windows.values()):
+                idle.append(key)
+        for key in idle:
+            del cls._windows[key]
+
+        # Still too many: drop the keys seen first
+        excess = len(cls._windows) - max_keys
+        if excess > 0:
+            for key in list(cls._windows)[:excess]:
+                del cls._windows[key]
+
+    @staticmethod
+    def _compile(rule):
+        dimension = rule['dimension']
+        metric = rule['metric']
+        action = rule.get('action', 'hold')
+
+        if action not in SEVERITY:
+            raise ValueError(f"Unknown action {action!r} in risk rule {rule['name']}")
+
+        if dimension == 'transfer':
+            if metric != 'amount':
+                raise ValueError(f"Risk rule {rule['name']}: transfer rules only support 'amount'")
+            window = None
+        elif dimension in WINDOW_DIMENSIONS and metric in WINDOW_METRICS:
+            window = int(rule['window'])
+        else:
+            raise ValueError(f"Risk rule {rule['name']}: unsupported {dimension}/{metric}")
+
+        limit = _cents(rule['limit']) if metric in ('sum', 'amount') else int(rule['limit'])
+        reason = rule.get('reason') or (
+            f"{rule['name']}: {metric.replace('_', ' ')} per {dimension}"
+            f"{f' in {window}s' if window else ''} above {rule['limit']}"
+        )
+
+        return RiskRule(
+            name=rule['name'],
+            dimension=dimension,
+            metric=metric,
+            window=window,
+            limit=limit,
+            action=action,
+            reason=reason
+        )
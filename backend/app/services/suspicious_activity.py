@@ -0,0 +1,235 @@
+# services/suspicious_activity.py
+from datetime import datetime, timedelta, timezone
+from collections import namedtuple
+from decimal import Decimal
+from flask import current_app
+from sqlalchemy import select, case, func
+from ..extensions import db
+from ..models import Wallet, Transaction, AuditLog, SuspiciousActivity
+from .commit_hooks import register
+
+# What the detector needs from a committed transaction or failed-login audit event;
+# at is None for rows just written, which are stamped with the detection time
+TransactionEvent = namedtuple('TransactionEvent', ['id', 'sender_wallet_id', 'amount', 'at'])
+FailedLoginEvent = namedtuple('FailedLoginEvent', ['id', 'actor_id', 'actor_ip', 'error_message', 'at'])
+
+SUSPICIOUS_ACTIVITY_DEFAULTS = {
+    'window_hours': 24,
+    'large_transaction_amount': Decimal('100000.00'),
+    'high_frequency_count': 10
+}
+
+
+class SuspiciousActivityDetector:
+    """Maintains suspicious_activities from transactions and audit events as they commit.
+
+    A commit that wrote a Transaction or a 'login.failed' AuditLog hands those rows
+    to consume() in the same database transaction, so detections commit (or roll
+    back) with the rows that caused them. consume() upserts:
+
+    - large_transaction: one row per transaction at or above the large amount
+    - high_frequency: one row per sender wallet with more than high_frequency_count
+      transactions in the trailing window, refreshed on each of its transactions
+    - failed_login: one row per failed login
+
+    Detection runs in a savepoint and a failure is logged rather than failing the
+    commit. Nothing is rescanned on read, so the admin view is an indexed read of
+    the last window; scan() replays recent history for rows written outside the
+    ORM or while detection was failing.
+    """
+
+    @staticmethod
+    def get_config():
+        return {**SUSPICIOUS_ACTIVITY_DEFAULTS, **current_app.config.get('SUSPICIOUS_ACTIVITY', {})}
+
+    @classmethod
+    def consume(cls, transactions=(), failed_logins=(), now=None):
+        """Upsert detections for new rows in the caller's transaction; returns the rows written"""
+        if not transactions and not failed_logins:
+            return 0
+
+        config = cls.get_config()
+        now = now or datetime.now(timezone.utc)
+        since = now - timedelta(hours=config['window_hours'])
+        rows = []
+
+        wallet_ids = {transaction.sender_wallet_id for transaction in transactions if transaction.sender_wallet_id}
+        owners = dict(db.session.execute(
+            select(Wallet.id, Wallet.user_id).where(Wallet.id.in_(wallet_ids))
+        ).all()) if wallet_ids else {}
+
+        threshold = Decimal(str(config['large_transaction_amount']))
+        for transaction in transactions:
+            if transaction.amount is None or Decimal(str(transaction.amount)) < threshold:
+                continue
+            rows.append(cls._row(
+                'large_transaction', f'transaction:{transaction.id}', transaction.at or now,
+                user_id=owners.get(transaction.sender_wallet_id),
+                wallet_id=transaction.sender_wallet_id,
+                transaction_id=transaction.id,
+                amount=transaction.amount
+            ))
+
+        if wallet_ids:
+            frequent = db.session.execute(
+                select(
+                    Transaction.sender_wallet_id,
+                    func.count(Transaction.id),
+                    func.coalesce(func.sum(Transaction.amount), 0),
+                    func.max(Transaction.created_at)
+                ).where(
+                    Transaction.sender_wallet_id.in_(wallet_ids),
+                    Transaction.created_at >= since
+                ).group_by(
+                    Transaction.sender_wallet_id
+                ).having(
+                    func.count(Transaction.id) > config['high_frequency_count']
+                )
+            ).all()
+
+            for wallet_id, count, total, last_at in frequent:
+                rows.append(cls._row(
+                    'high_frequency', f'wallet:{wallet_id}', last_at or now,
+                    user_id=owners.get(wallet_id),
+                    wallet_id=wallet_id,
+                    amount=total,
+                    count=count
+                ))
+
+        for login in failed_logins:
+            rows.append(cls._row(
+                'failed_login', f'audit_log:{login.id}', login.at or now,
+                user_id=login.actor_id,
+                audit_log_id=login.id,
+                actor_ip=login.actor_ip,
+                details={'error_message': login.error_message}
+            ))
+
+        if rows:
+            db.session.execute(cls._upsert(rows, since))
+
+        return len(rows)
+
+    @classmethod
+    def scan(cls, hours=None, chunk_size=5000, now=None):
+        """Replay the last hours (default: the detection window) of transactions and failed logins"""
+        now = now or datetime.now(timezone.utc)
+        since = now - timedelta(hours=hours or cls.get_config()['window_hours'])
+        written = 0
+
+        transactions = db.session.execute(
+            select(Transaction.id, Transaction.sender_wallet_id, Transaction.amount, Transaction.created_at)
+            .where(Transaction.created_at >= since)
+            .order_by(Transaction.id)
+            .execution_options(yield_per=chunk_size)
+        )
+        for chunk in transactions.partitions():
+            written += cls.consume(transactions=[TransactionEvent(*row) for row in chunk], now=now)
+
+        failed_logins = db.session.execute(
+            select(AuditLog.id, AuditLog.actor_id, AuditLog.actor_ip, AuditLog.error_message, AuditLog.created_at)
+            .where(AuditLog.action == 'login.failed', AuditLog.created_at >= since)
+            .order_by(AuditLog.id)
+            .execution_options(yield_per=chunk_size)
+        )
+        for chunk in failed_logins.partitions():
+            written += cls.consume(failed_logins=[FailedLoginEvent(*row) for row in chunk], now=now)
+
+        db.session.commit()
+        return written
+
+    @classmethod
+    def recent(cls, kind, limit=None, order_by=None, now=None):
+        """Detections of one kind seen within the window, newest first unless order_by is given"""
+        now = now or datetime.now(timezone.utc)
+        since = now - timedelta(hours=cls.get_config()['window_hours'])
+
+        query = db.session.query(SuspiciousActivity, Transaction.status).outerjoin(
+            Transaction, Transaction.id == SuspiciousActivity.transaction_id
+        ).filter(
+            SuspiciousActivity.kind == kind,
+            SuspiciousActivity.last_seen_at >= since
+        ).order_by(
+            order_by if order_by is not None else SuspiciousActivity.last_seen_at.desc()
+        )
+
+        if limit:
+            query = query.limit(limit)
+        return query.all()
+
+    @staticmethod
+    def _row(kind, subject, at, user_id=None, wallet_id=None, transaction_id=None, audit_log_id=None,
+             actor_ip=None, amount=Decimal('0.00'), count=1, details=None):
+        return {
+            'kind': kind,
+            'subject': subject,
+            'user_id': user_id,
+            'wallet_id': wallet_id,
+            'transaction_id': transaction_id,
+            'audit_log_id': audit_log_id,
+            'actor_ip': actor_ip,
+            'amount': Decimal(str(amount)).quantize(Decimal('0.01')),
+            'count': count,
+            'details': details,
+            'first_seen_at': at,
+            'last_seen_at': at,
+            'updated_at': datetime.now(timezone.utc)
+        }
+
+    @staticmethod
+    def _upsert(rows, since):
+        if db.engine.dialect.name == 'postgresql':
+            from sqlalchemy.dialects.postgresql import insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert
+
+        table = SuspiciousActivity.__table__
+        statement = insert(table).values(rows)
+        return statement.on_conflict_do_update(
+            index_elements=['kind', 'subject'],
+            set_={
+                'amount': statement.excluded.amount,
+                'count': statement.excluded.count,
+                'details': statement.excluded.details,
+                # A wallet that went quiet for a whole window starts a new episode
+                'first_seen_at': case(
+                    (table.c.last_seen_at < since, statement.excluded.first_seen_at),
+                    else_=table.c.first_seen_at
+                ),
+                'last_seen_at': func.max(table.c.last_seen_at, statement.excluded.last_seen_at)
+                if db.engine.dialect.name == 'sqlite'
+                else func.greatest(table.c.last_seen_at, statement.excluded.last_seen_at),
+                'updated_at': statement.excluded.updated_at
+            }
+        )
+
+
+def _collect_suspicious_candidates(session):
+    transactions = []
+    failed_logins = []
+
+    for instance in session.new:
+        if isinstance(instance, Transaction):
+            transactions.append(TransactionEvent(instance.id, instance.sender_wallet_id, instance.amount, None))
+        elif isinstance(instance, AuditLog) and instance.action == 'login.failed':
+            failed_logins.append(FailedLoginEvent(
+                instance.id, instance.actor_id, instance.actor_ip, instance.error_message, None
+            ))
+
+    if transactions or failed_logins:
+        return transactions, failed_logins
+    return None
+
+
+def _detect_suspicious_activity(batches):
+    if not current_app.config.get('SUSPICIOUS_ACTIVITY_DETECTION', True):
+        return
+
+    SuspiciousActivityDetector.consume(
+        [candidate for transactions, _ in batches for candidate in transactions],
+        [candidate for _, failed_logins in batches for candidate in failed_logins]
+    )
+
+
+# scan() picks up what a failed detection missed
+register('suspicious_activity', _collect_suspicious_candidates, _detect_suspicious_activity)
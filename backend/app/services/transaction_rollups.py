@@ -0,0 +1,242 @@
+# services/transaction_rollups.py
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from sqlalchemy import func, select
+from ..extensions import db
+from ..models import Transaction, DailyTransactionRollup
+from .commit_hooks import attribute_values, has_changes, register, track_previous_values, utc_day
+
+# Rollup key columns, in key tuple order
+ROLLUP_KEY = ('day', 'transaction_type', 'status', 'source_country', 'destination_country', 'currency')
+
+# Transaction attributes the key and measures are derived from
+TRACKED_ATTRIBUTES = (
+    'transaction_type', 'status', 'source_country', 'destination_country', 'source_currency', 'amount', 'fee'
+)
+
+# Days recomputed per statement by rebuild()
+REBUILD_CHUNK_DAYS = 31
+
+
+def _value(member):
+    return getattr(member, 'value', member)
+
+
+class TransactionRollups:
+    """Per-day transaction totals in daily_transaction_rollups.
+
+    Every flush that creates, deletes or changes the status, amount, fee, type,
+    corridor or currency of a Transaction records the difference it makes to the
+    rollups (one row out, one row in for a status change), and the differences
+    are added with one upsert when the session commits, in a savepoint of the
+    same transaction. Dashboards then sum a few rows per day instead of grouping
+    transactions by date(created_at).
+
+    Rows written outside the ORM are not seen; rebuild() recomputes a range of
+    days from transactions and doubles as the catch-up job.
+    """
+
+    @staticmethod
+    def key_for(day, transaction_type, status, source_country, destination_country, currency):
+        return (
+            utc_day(day),
+            _value(transaction_type),
+            _value(status),
+            source_country or '',
+            destination_country or '',
+            currency or 'KES'
+        )
+
+    @classmethod
+    def apply(cls, deltas):
+        """Add {key: [count, amount, fee]} to the rollups in the caller's transaction"""
+        if db.engine.dialect.name == 'postgresql':
+            from sqlalchemy.dialects.postgresql import insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert
+
+        now = datetime.now(timezone.utc)
+        # Sorted, so concurrent commits lock shared rows in the same order
+        rows = [
+            {
+                **dict(zip(ROLLUP_KEY, key)),
+                'count': count,
+                'amount': amount,
+                'fee': fee,
+                'updated_at': now
+            }
+            for key, (count, amount, fee) in sorted(deltas.items())
+            if count or amount or fee
+        ]
+        if not rows:
+            return 0
+
+        table = DailyTransactionRollup.__table__
+        statement = insert(table).values(rows)
+        statement = statement.on_conflict_do_update(
+            index_elements=list(ROLLUP_KEY),
+            set_={
+                'count': table.c.count + statement.excluded.count,
+                'amount': table.c.amount + statement.excluded.amount,
+                'fee': table.c.fee + statement.excluded.fee,
+                'updated_at': statement.excluded.updated_at
+            }
+        )
+
+        db.session.execute(statement)
+        return len(rows)
+
+    @classmethod
+    def rebuild(cls, start=None, end=None):
+        """Recompute the rollups of days start..end (inclusive, default all) from transactions; returns rows written"""
+        if start is None:
+            start = utc_day(db.session.query(func.min(Transaction.created_at)).scalar())
+        end = end or datetime.now(timezone.utc).date()
+
+        if db.engine.dialect.name == 'postgresql':
+            day = func.date(func.timezone('UTC', Transaction.created_at))
+        else:
+            day = func.date(Transaction.created_at)
+
+        written = 0
+        chunk_start = start
+        while chunk_start <= end:
+            chunk_end = min(chunk_start + timedelta(days=REBUILD_CHUNK_DAYS - 1), end)
+
+            DailyTransactionRollup.query.filter(
+                DailyTransactionRollup.day >= chunk_start,
+                DailyTransactionRollup.day <= chunk_end
+            ).delete(synchronize_session=False)
+
+            grouped = db.session.execute(
+                select(
+                    day,
+                    Transaction.transaction_type,
+                    Transaction.status,
+                    Transaction.source_country,
+                    Transaction.destination_country,
+                    Transaction.source_currency,
+                    func.count(Transaction.id),
+                    func.coalesce(func.sum(Transaction.amount), 0),
+                    func.coalesce(func.sum(Transaction.fee), 0)
+                ).where(
+                    Transaction.created_at >= datetime.combine(chunk_start, datetime.min.time(), timezone.utc),
+                    Transaction.created_at < datetime.combine(chunk_end + timedelta(days=1), datetime.min.time(), timezone.utc)
+                ).group_by(
+                    day,
+                    Transaction.transaction_type,
+                    Transaction.status,
+                    Transaction.source_country,
+                    Transaction.destination_country,
+                    Transaction.source_currency
+                )
+            ).all()
+
+            # Several NULL/'' countries can fold into one key
+            deltas = {}
+            for *key, count, amount, fee in grouped:
+                totals = deltas.setdefault(cls.key_for(*key), [0, Decimal('0.00'), Decimal('0.00')])
+                totals[0] += count
+                totals[1] += Decimal(str(amount))
+                totals[2] += Decimal(str(fee))
+
+            written += cls.apply(deltas)
+            db.session.commit()
+            chunk_start = chunk_end + timedelta(days=1)
+
+        return written
+
+    @staticmethod
+    def totals(start, end, group_by=('day',), statuses=('completed',), **filters):
+        """Summed count, amount and fee for days start..end, grouped by rollup key columns.
+
+        filters narrow on key columns, e.g. source_country='KE'.
+        """
+        columns = [getattr(DailyTransactionRollup, name) for name in group_by]
+
+        query = db.session.query(
+            *columns,
+            func.sum(DailyTransactionRollup.count).label('count'),
+            func.sum(DailyTransactionRollup.amount).label('amount'),
+            func.sum(DailyTransactionRollup.fee).label('fee')
+        ).filter(
+            DailyTransactionRollup.day >= start,
+            DailyTransactionRollup.day <= end
+        )
+
+        if statuses:
+            query = query.filter(DailyTransactionRollup.status.in_([_value(status) for status in statuses]))
+        for name, value in filters.items():
+            query = query.filter(getattr(DailyTransactionRollup, name) == value)
+
+        return query.group_by(*columns).order_by(*columns).all()
+
+
+def _rollup_state(transaction, previous=False, created=False):
+    """(key, amount, fee) of a transaction as flushed, or as it was before this flush"""
+    values = attribute_values(transaction, TRACKED_ATTRIBUTES, previous)
+    if values is None:
+        return None
+
+    # created_at is a server default that is not loaded back; a row inserted in
+    # this flush is dated today
+    created_at = None if created else transaction.created_at
+
+    key = TransactionRollups.key_for(
+        created_at,
+        values['transaction_type'],
+        values['status'],
+        values['source_country'],
+        values['destination_country'],
+        values['source_currency']
+    )
+    return key, Decimal(str(values['amount'] or 0)), Decimal(str(values['fee'] or 0))
+
+
+def _add_delta(deltas, rollup_state, sign):
+    if rollup_state is None:
+        return
+
+    key, amount, fee = rollup_state
+    totals = deltas.setdefault(key, [0, Decimal('0.00'), Decimal('0.00')])
+    totals[0] += sign
+    totals[1] += sign * amount
+    totals[2] += sign * fee
+
+
+track_previous_values(Transaction, TRACKED_ATTRIBUTES)
+
+
+def _collect_rollup_deltas(session):
+    deltas = {}
+
+    for instance in session.new:
+        if isinstance(instance, Transaction):
+            _add_delta(deltas, _rollup_state(instance, created=True), 1)
+
+    for instance in session.dirty:
+        if isinstance(instance, Transaction) and has_changes(instance, TRACKED_ATTRIBUTES):
+            _add_delta(deltas, _rollup_state(instance, previous=True), -1)
+            _add_delta(deltas, _rollup_state(instance), 1)
+
+    for instance in session.deleted:
+        if isinstance(instance, Transaction):
+            _add_delta(deltas, _rollup_state(instance, previous=True), -1)
+
+    return deltas
+
+
+def _apply_rollup_deltas(batches):
+    deltas = {}
+    for batch in batches:
+        for key, (count, amount, fee) in batch.items():
+            totals = deltas.setdefault(key, [0, Decimal('0.00'), Decimal('0.00')])
+            totals[0] += count
+            totals[1] += amount
+            totals[2] += fee
+
+    TransactionRollups.apply(deltas)
+
+
+# rebuild() repairs the days a failed update missed
+register('transaction_rollups', _collect_rollup_deltas, _apply_rollup_deltas)
@@ -7,11 +7,17 @@ from app.models import Transaction, Wallet, LedgerEntry, User, Beneficiary, Audi
 from app.models.enums import TransactionStatus, TransactionType, PaymentProvider
 from app.services.currency_service import CurrencyService
 from app.services.compliance_service import ComplianceService
+from app.services.fee_engine import FeeEngine
+from app.services.risk_engine import RiskEngine
+from app.services.wallet_summary import WalletSummaryCache
+from app.serializers import TransactionRowSerializer
+from app.pagination import paginate
 
 class TransactionService:
     
     @staticmethod
-    def create_transfer(sender_user_id, receiver_wallet_id, amount, currency='KES', description=None):
+    def create_transfer(sender_user_id, receiver_wallet_id, amount, currency='KES', description=None,
+                        channel=None, ip_address=None, device_id=None):
         """Create a transfer with currency support"""
         from app.services.wallet_service import WalletService
         
@@ -50,6 +56,11 @@ class TransactionService:
         if not permission_check['allowed']:
             return {'success': False, 'message': permission_check['reason']}
         
+        # Check KYC-level usage limits
+        limit_check = ComplianceService.check_transaction_limit(sender_wallet.user, amount, currency=currency)
+        if not limit_check['allowed']:
+            return {'success': False, 'message': limit_check['reason']}
+        
         # Convert amount to sender's currency if needed
         if currency != sender_wallet.primary_currency:
             amount_in_sender_currency = CurrencyService.convert_amount(
@@ -88,6 +99,35 @@ class TransactionService:
         else:
             amount_in_receiver_currency = amount
         
+        # Screen against the in-process risk rules
+        signal = None
+        decision = None
+        if RiskEngine.is_enabled():
+            signal = RiskEngine.signal(
+                sender_wallet.id, receiver_wallet.id, amount_in_sender_currency,
+                device_id=device_id, ip_address=ip_address
+            )
+            decision = RiskEngine.evaluate(signal)
+            if decision.action == 'block':
+                AuditLog.log_user_action(
+                    actor_id=sender_user_id,
+                    action='transfer.blocked',
+                    resource_type='wallet',
+                    resource_id=sender_wallet.id,
+                    actor_ip=ip_address,
+                    new_values={
+                        'amount': float(amount_in_sender_currency),
+                        'receiver_wallet_id': receiver_wallet.id,
+                        'rules': decision.rules
+                    },
+                    status='failed',
+                    error_message='; '.join(decision.reasons)
+                )
+                db.session.commit()
+                return {'success': False, 'message': 'Transfer blocked by risk controls', 'rules': decision.rules}
+        
+        held = decision is not None and decision.action == 'hold'
+        
         try:
             with db.session.begin_nested():
                 # Create transaction with currency information
@@ -107,6 +147,9 @@ class TransactionService:
                     status=TransactionStatus.pending,
                     provider=PaymentProvider.internal,
                     description=description or f"Transfer to {receiver_wallet.user.get_full_name()}",
+                    channel=channel,
+                    ip_address=ip_address,
+                    device_id=device_id,
                     metadata={
                         'is_cross_border': is_cross_border,
                         'is_cross_region': is_cross_region,
@@ -118,70 +161,88 @@ class TransactionService:
                 db.session.add(transaction)
                 db.session.flush()
                 
-                # Create ledger entries with currency conversion
-                from app.models import LedgerEntry
-                
-                # Sender entry (debit)
-                sender_entry = LedgerEntry(
-                    wallet_id=sender_wallet.id,
-                    transaction_id=transaction.id,
-                    amount=-total_debit,
-                    balance_before=sender_wallet.balance,
-                    balance_after=sender_wallet.balance - total_debit,
-                    currency=sender_wallet.primary_currency,
-                    entry_type='debit',
-                    description=f"Transfer to {receiver_wallet.user.get_full_name()} ({receiver_wallet.user.country_code})"
-                )
-                db.session.add(sender_entry)
-                
-                # Update sender wallet
-                sender_wallet.balance -= total_debit
-                sender_wallet.available_balance -= total_debit
-                sender_wallet.last_transaction_at = datetime.utcnow()
-                
-                # Receiver entry (credit)
-                receiver_entry = LedgerEntry(
-                    wallet_id=receiver_wallet.id,
-                    transaction_id=transaction.id,
-                    amount=amount_in_receiver_currency,
-                    balance_before=receiver_wallet.balance,
-                    balance_after=receiver_wallet.balance + amount_in_receiver_currency,
-                    currency=receiver_wallet.primary_currency,
-                    entry_type='credit',
-                    description=f"Transfer from {sender_wallet.user.get_full_name()} ({sender_wallet.user.country_code})"
-                )
-                db.session.add(receiver_entry)
-                
-                # Update receiver wallet
-                receiver_wallet.balance += amount_in_receiver_currency
-                receiver_wallet.available_balance += amount_in_receiver_currency
-                receiver_wallet.last_transaction_at = datetime.utcnow()
-                
-                # Update transaction status
-                transaction.update_status(TransactionStatus.completed)
+                if held:
+                    # Funds stay locked against the pending transaction until the hold is reviewed
+                    from app.services.transfer_service import TransferService
+                    
+                    if not sender_wallet.lock_funds(total_debit, sender_wallet.primary_currency):
+                        raise ValueError('Failed to lock funds')
+                    TransferService._place_risk_hold(
+                        sender_user_id, sender_wallet, transaction, total_debit, decision,
+                        receiver_amount=amount_in_receiver_currency, is_cross_border=is_cross_border
+                    )
+                else:
+                    # Create ledger entries with currency conversion
+                    from app.models import LedgerEntry
+                    
+                    # Sender entry (debit)
+                    sender_entry = LedgerEntry(
+                        wallet_id=sender_wallet.id,
+                        transaction_id=transaction.id,
+                        amount=-total_debit,
+                        balance_before=sender_wallet.balance,
+                        balance_after=sender_wallet.balance - total_debit,
+                        currency=sender_wallet.primary_currency,
+                        entry_type='debit',
+                        description=f"Transfer to {receiver_wallet.user.get_full_name()} ({receiver_wallet.user.country_code})"
+                    )
+                    db.session.add(sender_entry)
+                    
+                    # Update sender wallet
+                    sender_wallet.balance -= total_debit
+                    sender_wallet.available_balance -= total_debit
+                    sender_wallet.last_transaction_at = datetime.utcnow()
+                    
+                    # Receiver entry (credit)
+                    receiver_entry = LedgerEntry(
+                        wallet_id=receiver_wallet.id,
+                        transaction_id=transaction.id,
+                        amount=amount_in_receiver_currency,
+                        balance_before=receiver_wallet.balance,
+                        balance_after=receiver_wallet.balance + amount_in_receiver_currency,
+                        currency=receiver_wallet.primary_currency,
+                        entry_type='credit',
+                        description=f"Transfer from {sender_wallet.user.get_full_name()} ({sender_wallet.user.country_code})"
+                    )
+                    db.session.add(receiver_entry)
+                    
+                    # Update receiver wallet
+                    receiver_wallet.balance += amount_in_receiver_currency
+                    receiver_wallet.available_balance += amount_in_receiver_currency
+                    receiver_wallet.last_transaction_at = datetime.utcnow()
+                    
+                    # Update transaction status
+                    transaction.update_status(TransactionStatus.completed)
+                    
+                    # Count the debit towards wallet and KYC limits
+                    sender_wallet.record_usage(transaction.usage_amount, is_cross_border)
+                    
+                    # Log the action
+                    AuditLog.log_user_action(
+                        actor_id=sender_user_id,
+                        action='transfer.create',
+                        resource_type='transaction',
+                        resource_id=transaction.id,
+                        new_values={
+                            'amount': float(amount_in_sender_currency),
+                            'fee': float(fee),
+                            'sender_currency': sender_wallet.primary_currency,
+                            'receiver_currency': receiver_wallet.primary_currency,
+                            'is_cross_border': is_cross_border
+                        },
+                        status='success'
+                    )
                 
-                # Log the action
-                AuditLog.log_user_action(
-                    actor_id=sender_user_id,
-                    action='transfer.create',
-                    resource_type='transaction',
-                    resource_id=transaction.id,
-                    new_values={
-                        'amount': float(amount_in_sender_currency),
-                        'fee': float(fee),
-                        'sender_currency': sender_wallet.primary_currency,
-                        'receiver_currency': receiver_wallet.primary_currency,
-                        'is_cross_border': is_cross_border
-                    },
-                    status='success'
-                )
-            
             db.session.commit()
             
+            if signal is not None:
+                RiskEngine.observe(signal)
+            
             return {
                 'success': True,
+                'status': 'held' if held else 'completed',
                 'transaction': transaction.to_dict(),
-                'message': 'Transfer completed successfully'
+                'message': 'Transfer is on hold pending review' if held else 'Transfer completed successfully'
             }
             
         except Exception as e:
@@ -191,42 +252,15 @@ class TransactionService:
     @staticmethod
     def calculate_fee(amount, transaction_type='transfer', is_cross_border=False, is_cross_region=False):
         """Calculate fees with international support"""
-        from flask import current_app
-        
-        amount = Decimal(str(amount))
-        fee_structure = current_app.config['FEE_STRUCTURE']
-        
-        if is_cross_border:
-            # International transfer fee
-            fee_config = fee_structure.get('international', {})
-        elif is_cross_region:
-            # Cross-region transfer fee
-            fee_config = fee_structure.get('cross_region', {})
-        else:
-            # Local transfer fee
-            fee_config = fee_structure.get('local_transfer', {}).get('default', {})
-        
-        # Calculate percentage fee
-        percentage_fee = amount * fee_config.get('percentage', Decimal('0.01'))
-        
-        # Add fixed fee
-        fixed_fee = fee_config.get('fixed', Decimal('10.00'))
-        total_fee = percentage_fee + fixed_fee
-        
-        # Apply minimum and maximum fees
-        min_fee = fee_config.get('min_fee', Decimal('0.00'))
-        max_fee = fee_config.get('max_fee', Decimal('5000.00'))
-        
-        total_fee = max(total_fee, min_fee)
-        total_fee = min(total_fee, max_fee)
-        
-        return total_fee.quantize(Decimal('0.01'))
+        fee_type = FeeEngine.fee_type_for(transaction_type, is_cross_border, is_cross_region)
+        return FeeEngine.calculate(fee_type, amount)
 
     
     @staticmethod
-    def get_user_transactions(user_id, page=1, per_page=20, transaction_type=None):
+    def get_user_transactions(user_id, page=1, per_page=20, transaction_type=None, fields=None, count='exact'):
         """
-        Get paginated transactions for a user
+        Get paginated transactions for a user, limited to fields when given;
+        count is the pagination mode (exact, estimate or none)
         """
         user_wallet = Wallet.query.filter_by(user_id=user_id).first()
         if not user_wallet:
@@ -243,13 +277,12 @@ class TransactionService:
         
         query = query.order_by(Transaction.created_at.desc())
         
-        pagination = query.paginate(page=page, per_page=per_page, error_out=False)
+        serializer = TransactionRowSerializer(fields=fields)
+        pagination = paginate(serializer.apply(query), page, per_page, count)
         
         return {
-            'transactions': [tx.to_dict() for tx in pagination.items],
-            'total': pagination.total,
-            'pages': pagination.pages,
-            'current_page': page
+            'transactions': serializer.dump_many(pagination.items),
+            **pagination.to_dict()
         }
     
     @staticmethod
@@ -327,46 +360,15 @@ class TransactionService:
         """
         Get transaction summary for a user
         """
-        user_wallet = Wallet.query.filter_by(user_id=user_id).first()
-        if not user_wallet:
+        wallet_id = db.session.query(Wallet.id).filter_by(user_id=user_id).scalar()
+        if not wallet_id:
             return {}
         
-        end_date = datetime.utcnow()
-        start_date = end_date - timedelta(days=days)
-        
-        # Count by status
-        completed = Transaction.query.filter(
-            (Transaction.sender_wallet_id == user_wallet.id) |
-            (Transaction.receiver_wallet_id == user_wallet.id),
-            Transaction.status == TransactionStatus.completed,
-            Transaction.created_at >= start_date
-        ).count()
-        
-        pending = Transaction.query.filter(
-            (Transaction.sender_wallet_id == user_wallet.id) |
-            (Transaction.receiver_wallet_id == user_wallet.id),
-            Transaction.status == TransactionStatus.pending,
-            Transaction.created_at >= start_date
-        ).count()
-        
-        failed = Transaction.query.filter(
-            (Transaction.sender_wallet_id == user_wallet.id) |
-            (Transaction.receiver_wallet_id == user_wallet.id),
-            Transaction.status == TransactionStatus.failed,
-            Transaction.created_at >= start_date
-        ).count()
-        
-        # Total amount (completed only)
-        total_amount = db.session.query(func.sum(Transaction.amount)).filter(
-            (Transaction.sender_wallet_id == user_wallet.id) |
-            (Transaction.receiver_wallet_id == user_wallet.id),
-            Transaction.status == TransactionStatus.completed,
-            Transaction.created_at >= start_date
-        ).scalar() or Decimal('0.00')
+        summary = WalletSummaryCache.get(wallet_id, days=days)
         
         return {
-            'completed': completed,
-            'pending': pending,
-            'failed': failed,
-            'total_amount': float(total_amount)
-        }
\ No newline at end of file
+            'completed': summary['completed'],
+            'pending': summary['pending'],
+            'failed': summary['failed'],
+            'total_amount': float(summary['total_amount'])
+        }
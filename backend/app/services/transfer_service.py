@@ -1,15 +1,17 @@
-from decimal import Decimal
+from decimal import Decimal, ROUND_HALF_UP
 from datetime import datetime, timezone
-import uuid
 from flask import current_app
 
 from ..extensions import db
 from ..models import Transaction, Wallet, Beneficiary, User, ExchangeRate, Fee, Hold, AuditLog
-from ..models.enums import TransactionStatus, TransactionType, PaymentProvider
+from ..models.enums import TransactionStatus, TransactionType, PaymentProvider, WalletStatus
 from .currency_service import CurrencyService
 from .compliance_service import ComplianceService
 from .otp_services import OTPService
 from .notification_service import NotificationService
+from .quote_store import QuoteStore
+from .fee_engine import FeeEngine
+from .risk_engine import RiskEngine
 
 class TransferService:
     
@@ -48,10 +50,16 @@ class TransferService:
         else:
             converted_amount = amount_decimal
         
-        check_result = sender_wallet.can_withdraw(converted_amount, sender_wallet.primary_currency)
+        check_result = sender_wallet.can_withdraw(converted_amount, sender_wallet.primary_currency, receiver_wallet.user.country_code)
         if not check_result['allowed']:
             return {'success': False, 'message': check_result['reason']}
         
+        kyc_check = ComplianceService.check_transaction_limit(
+            sender_wallet.user, converted_amount, currency=sender_wallet.primary_currency
+        )
+        if not kyc_check['allowed']:
+            return {'success': False, 'message': kyc_check['reason']}
+        
         is_cross_border = sender_wallet.user.country_code != receiver_wallet.user.country_code
         
         if is_cross_border:
@@ -75,18 +83,43 @@ class TransferService:
             return {'success': False, 'message': 'Insufficient balance to cover amount and fee'}
         
         exchange_rate = None
-        receiver_amount = amount_decimal
+        rate_entry = None
+        # Same-currency wallets receive what was debited, not the amount in the request currency
+        receiver_amount = converted_amount
         
         if sender_wallet.primary_currency != receiver_wallet.primary_currency:
-            exchange_rate = CurrencyService.get_exchange_rate(
+            rate_entry = CurrencyService.get_rate_entry(
                 sender_wallet.primary_currency,
                 receiver_wallet.primary_currency
             )
-            receiver_amount = converted_amount * exchange_rate
+            exchange_rate = rate_entry.rate
+            receiver_amount = (converted_amount * exchange_rate).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
+        
+        quote = QuoteStore.save(
+            quote_type='local',
+            user_id=sender_wallet.user_id,
+            ttl=current_app.config['QUOTE_EXPIRY'],
+            sender_wallet_id=sender_wallet.id,
+            receiver_wallet_id=receiver_wallet.id,
+            amount=amount_decimal,
+            currency=currency,
+            converted_amount=converted_amount,
+            sender_currency=sender_wallet.primary_currency,
+            receiver_amount=receiver_amount,
+            receiver_currency=receiver_wallet.primary_currency,
+            fee=fee,
+            total_amount=total_amount,
+            exchange_rate=exchange_rate,
+            fx_provider=rate_entry.provider if rate_entry else None,
+            fx_timestamp=rate_entry.last_updated if rate_entry else None,
+            is_cross_border=is_cross_border,
+            source_country=sender_wallet.user.country_code,
+            destination_country=receiver_wallet.user.country_code
+        )
         
         return {
             'success': True,
-            'quote_id': str(uuid.uuid4()),
+            'quote_id': quote.quote_id,
             'amount': float(amount_decimal),
             'currency': currency,
             'converted_amount': float(converted_amount),
@@ -98,11 +131,18 @@ class TransferService:
             'exchange_rate': float(exchange_rate) if exchange_rate else None,
             'is_cross_border': is_cross_border,
             'estimated_settlement': 'Instant',
-            'expires_at': (datetime.now(timezone.utc) + current_app.config['QUOTE_EXPIRY']).isoformat()
+            'expires_at': quote.expires_at.isoformat()
         }
     
     @staticmethod
-    def initiate_local_transfer(sender_user_id, amount, currency='KES', receiver_wallet_id=None, receiver_phone=None, description=None):
+    def initiate_local_transfer(sender_user_id, amount=None, currency='KES', receiver_wallet_id=None, receiver_phone=None, description=None, quote_id=None,
+                                channel=None, ip_address=None, device_id=None):
+        if quote_id:
+            return TransferService._initiate_local_from_quote(
+                sender_user_id, quote_id, description,
+                channel=channel, ip_address=ip_address, device_id=device_id
+            )
+        
         sender_wallet = Wallet.query.filter_by(user_id=sender_user_id).first()
         if not sender_wallet:
             return {'success': False, 'message': 'Sender wallet not found'}
@@ -137,6 +177,12 @@ class TransferService:
         if not check_result['allowed']:
             return {'success': False, 'message': check_result['reason']}
         
+        kyc_check = ComplianceService.check_transaction_limit(
+            sender_wallet.user, converted_amount, currency=sender_wallet.primary_currency
+        )
+        if not kyc_check['allowed']:
+            return {'success': False, 'message': kyc_check['reason']}
+        
         is_cross_border = sender_wallet.user.country_code != receiver_wallet.user.country_code
         
         if is_cross_border:
@@ -159,29 +205,129 @@ class TransferService:
         if sender_wallet.available_balance < total_amount:
             return {'success': False, 'message': 'Insufficient balance to cover amount and fee'}
         
+        exchange_rate = None
+        rate_entry = None
+        # Same-currency wallets receive what was debited, not the amount in the request currency
+        receiver_amount = converted_amount
+        
+        if sender_wallet.primary_currency != receiver_wallet.primary_currency:
+            rate_entry = CurrencyService.get_rate_entry(
+                sender_wallet.primary_currency,
+                receiver_wallet.primary_currency
+            )
+            exchange_rate = rate_entry.rate
+            receiver_amount = (converted_amount * exchange_rate).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
+        
+        return TransferService._execute_local_transfer(
+            sender_user_id=sender_user_id,
+            sender_wallet=sender_wallet,
+            receiver_wallet=receiver_wallet,
+            converted_amount=converted_amount,
+            fee=fee,
+            total_amount=total_amount,
+            exchange_rate=exchange_rate,
+            receiver_amount=receiver_amount,
+            is_cross_border=is_cross_border,
+            description=description,
+            fx_provider=rate_entry.provider if rate_entry else None,
+            fx_timestamp=rate_entry.last_updated if rate_entry else None,
+            channel=channel,
+            ip_address=ip_address,
+            device_id=device_id
+        )
+    
+    @staticmethod
+    def _initiate_local_from_quote(sender_user_id, quote_id, description=None, channel=None, ip_address=None, device_id=None):
+        """Execute a stored local quote: wallets, rate and fee are taken from the quote as issued"""
+        quote = QuoteStore.get(quote_id, user_id=sender_user_id, quote_type='local')
+        if not quote:
+            return {'success': False, 'message': 'Quote not found or expired'}
+        
+        sender_wallet = Wallet.query.get(quote.sender_wallet_id)
+        receiver_wallet = Wallet.query.get(quote.receiver_wallet_id)
+        if not sender_wallet or not receiver_wallet:
+            return {'success': False, 'message': 'Wallet not found'}
+        
+        if sender_wallet.status != WalletStatus.active:
+            return {'success': False, 'message': f'Wallet is {sender_wallet.status.value}'}
+
+        if receiver_wallet.status != WalletStatus.active:
+            return {'success': False, 'message': f'Receiver wallet is {receiver_wallet.status.value}'}
+        
+        if sender_wallet.available_balance < quote.total_amount:
+            return {'success': False, 'message': 'Insufficient balance to cover amount and fee'}
+        
+        # Limits depend on usage since the quote was issued, so they are checked again
+        check_result = sender_wallet.can_withdraw(
+            quote.converted_amount, quote.sender_currency, receiver_wallet.user.country_code
+        )
+        if not check_result['allowed']:
+            return {'success': False, 'message': check_result['reason']}
+        
+        kyc_check = ComplianceService.check_transaction_limit(
+            sender_wallet.user, quote.converted_amount, currency=quote.sender_currency
+        )
+        if not kyc_check['allowed']:
+            return {'success': False, 'message': kyc_check['reason']}
+        
+        return TransferService._execute_local_transfer(
+            sender_user_id=sender_user_id,
+            sender_wallet=sender_wallet,
+            receiver_wallet=receiver_wallet,
+            converted_amount=quote.converted_amount,
+            fee=quote.fee,
+            total_amount=quote.total_amount,
+            exchange_rate=quote.exchange_rate,
+            receiver_amount=quote.receiver_amount,
+            is_cross_border=quote.is_cross_border,
+            description=description,
+            fx_provider=quote.fx_provider,
+            fx_timestamp=quote.fx_timestamp,
+            quote_id=quote.quote_id,
+            channel=channel,
+            ip_address=ip_address,
+            device_id=device_id
+        )
+    
+    @staticmethod
+    def _execute_local_transfer(sender_user_id, sender_wallet, receiver_wallet, converted_amount, fee, total_amount,
+                                exchange_rate, receiver_amount, is_cross_border, description=None, fx_provider=None,
+                                fx_timestamp=None, quote_id=None, channel=None, ip_address=None, device_id=None):
+        signal = None
+        decision = None
+        if RiskEngine.is_enabled():
+            signal = RiskEngine.signal(
+                sender_wallet.id, receiver_wallet.id, converted_amount,
+                device_id=device_id, ip_address=ip_address
+            )
+            decision = RiskEngine.evaluate(signal)
+            
+            if decision.action == 'block':
+                AuditLog.log_user_action(
+                    actor_id=sender_user_id,
+                    action='transfer.blocked',
+                    resource_type='wallet',
+                    resource_id=sender_wallet.id,
+                    actor_ip=ip_address,
+                    new_values={
+                        'amount': float(converted_amount),
+                        'receiver_wallet_id': receiver_wallet.id,
+                        'rules': decision.rules
+                    },
+                    status='failed',
+                    error_message='; '.join(decision.reasons)
+                )
+                db.session.commit()
+                return {'success': False, 'message': 'Transfer blocked by risk controls', 'rules': decision.rules}
+        
+        held = decision is not None and decision.action == 'hold'
+        hold = None
+        
         try:
             with db.session.begin_nested():
                 if not sender_wallet.lock_funds(total_amount, sender_wallet.primary_currency):
                     return {'success': False, 'message': 'Failed to lock funds'}
                 
-                exchange_rate = None
-                receiver_amount = amount_decimal
-                
-                if sender_wallet.primary_currency != receiver_wallet.primary_currency:
-                    exchange_rate_record = ExchangeRate.query.filter_by(
-                        base_currency=sender_wallet.primary_currency,
-                        target_currency=receiver_wallet.primary_currency
-                    ).first()
-                    
-                    if not exchange_rate_record:
-                        exchange_rate_record = CurrencyService.update_exchange_rate(
-                            sender_wallet.primary_currency,
-                            receiver_wallet.primary_currency
-                        )
-                    
-                    exchange_rate = exchange_rate_record.rate
-                    receiver_amount = converted_amount * exchange_rate
-                
                 transaction = Transaction(
                     sender_wallet_id=sender_wallet.id,
                     receiver_wallet_id=receiver_wallet.id,
@@ -191,111 +337,63 @@ class TransferService:
                     source_currency=sender_wallet.primary_currency,
                     target_currency=receiver_wallet.primary_currency,
                     fx_rate=exchange_rate,
-                    fx_provider='internal',
-                    fx_timestamp=datetime.now(timezone.utc) if exchange_rate else None,
+                    fx_provider=fx_provider or 'internal',
+                    fx_timestamp=fx_timestamp,
                     source_country=sender_wallet.user.country_code,
                     destination_country=receiver_wallet.user.country_code,
                     is_cross_border=is_cross_border,
                     transaction_type=TransactionType.transfer,
                     status=TransactionStatus.processing,
                     provider=PaymentProvider.internal,
-                    description=description or f"Transfer to {receiver_wallet.user.get_full_name()}",
+                    channel=channel,
+                    ip_address=ip_address,
+                    device_id=device_id,
                     metadata={
-                        'sender_ip': '',
-                        'sender_device': '',
+                        'sender_ip': ip_address or '',
+                        'sender_device': device_id or '',
                         'is_cross_border': is_cross_border,
-                        'fx_rate_snapshot': float(exchange_rate) if exchange_rate else None
+                        'fx_rate_snapshot': float(exchange_rate) if exchange_rate else None,
+                        'quote_id': quote_id,
+                        # Transaction has no description column
+                        'description': description or f"Transfer to {receiver_wallet.user.get_full_name()}"
                     }
                 )
                 
                 db.session.add(transaction)
                 db.session.flush()
                 
-                from ..models import LedgerEntry
-                sender_sequence = LedgerEntry.get_next_sequence_number(sender_wallet.id)
-                
-                sender_entry = LedgerEntry(
-                    wallet_id=sender_wallet.id,
-                    transaction_id=transaction.id,
-                    amount=-total_amount,
-                    balance_before=sender_wallet.balance,
-                    balance_after=sender_wallet.balance - total_amount,
-                    currency=sender_wallet.primary_currency,
-                    fx_rate=exchange_rate,
-                    fx_provider='internal',
-                    entry_type='debit',
-                    entry_subtype='transfer',
-                    sequence_number=sender_sequence,
-                    description=f"Transfer to {receiver_wallet.user.get_full_name()}",
-                    metadata={
-                        'is_cross_border': is_cross_border,
-                        'receiver_country': receiver_wallet.user.country_code
-                    }
-                )
-                db.session.add(sender_entry)
-                
-                sender_wallet.balance = sender_entry.balance_after
-                sender_wallet.locked_balance -= total_amount
-                sender_wallet.last_transaction_at = datetime.now(timezone.utc)
-                
-                receiver_sequence = LedgerEntry.get_next_sequence_number(receiver_wallet.id)
-                
-                receiver_entry = LedgerEntry(
-                    wallet_id=receiver_wallet.id,
-                    transaction_id=transaction.id,
-                    amount=receiver_amount,
-                    balance_before=receiver_wallet.balance,
-                    balance_after=receiver_wallet.balance + receiver_amount,
-                    currency=receiver_wallet.primary_currency,
-                    fx_rate=exchange_rate,
-                    fx_provider='internal',
-                    entry_type='credit',
-                    entry_subtype='transfer',
-                    sequence_number=receiver_sequence,
-                    description=f"Transfer from {sender_wallet.user.get_full_name()}",
-                    metadata={
-                        'is_cross_border': is_cross_border,
-                        'sender_country': sender_wallet.user.country_code
-                    }
-                )
-                db.session.add(receiver_entry)
-                
-                receiver_wallet.balance = receiver_entry.balance_after
-                receiver_wallet.available_balance = receiver_entry.balance_after - receiver_wallet.locked_balance
-                receiver_wallet.last_transaction_at = datetime.now(timezone.utc)
-                
-                transaction.update_status(TransactionStatus.completed)
+                if quote_id and not QuoteStore.consume(quote_id, transaction_id=transaction.id):
+                    raise ValueError('Quote already used')
                 
-                if is_cross_border:
-                    sender_wallet.record_usage(converted_amount, is_cross_border=True)
+                if held:
+                    hold = TransferService._place_risk_hold(
+                        sender_user_id, sender_wallet, transaction, total_amount, decision,
+                        receiver_amount=receiver_amount, is_cross_border=is_cross_border, fx_provider=fx_provider
+                    )
                 else:
-                    sender_wallet.record_usage(converted_amount, is_cross_border=False)
+                    TransferService._settle_transfer(
+                        sender_user_id, transaction, sender_wallet, receiver_wallet, converted_amount, fee,
+                        total_amount, receiver_amount, exchange_rate, fx_provider, is_cross_border
+                    )
                 
-                AuditLog.log_user_action(
-                    actor_id=sender_user_id,
-                    action='transfer.completed',
-                    resource_type='transaction',
-                    resource_id=transaction.id,
-                    metadata={
-                        'amount': float(converted_amount),
-                        'fee': float(fee),
-                        'is_cross_border': is_cross_border,
-                        'receiver_id': receiver_wallet.user_id
-                    },
-                    status='success'
-                )
-                
-                NotificationService.send_transfer_notification(
-                    sender_user_id=sender_user_id,
-                    receiver_user_id=receiver_wallet.user_id,
-                    amount=float(converted_amount),
-                    currency=sender_wallet.primary_currency,
-                    transaction_id=transaction.id,
-                    is_cross_border=is_cross_border
-                )
-            
             db.session.commit()
             
+            if signal is not None:
+                RiskEngine.observe(signal)
+            
+            if held:
+                return {
+                    'success': True,
+                    'status': 'held',
+                    'message': 'Transfer is on hold pending review',
+                    'transaction_id': transaction.id,
+                    'reference': transaction.reference,
+                    'hold_id': str(hold.public_id),
+                    'amount': float(converted_amount),
+                    'fee': float(fee),
+                    'total': float(total_amount)
+                }
+            
             return {
                 'success': True,
                 'message': 'Transfer completed successfully',
@@ -313,6 +411,213 @@ class TransferService:
             db.session.rollback()
             return {'success': False, 'message': f'Transfer failed: {str(e)}'}
     
+    @staticmethod
+    def _settle_transfer(sender_user_id, transaction, sender_wallet, receiver_wallet, converted_amount, fee,
+                         total_amount, receiver_amount, exchange_rate, fx_provider, is_cross_border):
+        """Post the ledger entries and balances of a transfer whose funds are locked, and complete it"""
+        from ..models import LedgerEntry
+        sender_sequence = LedgerEntry.get_next_sequence_number(sender_wallet.id)
+        
+        sender_entry = LedgerEntry(
+            wallet_id=sender_wallet.id,
+            transaction_id=transaction.id,
+            amount=-total_amount,
+            balance_before=sender_wallet.balance,
+            balance_after=sender_wallet.balance - total_amount,
+            currency=sender_wallet.primary_currency,
+            fx_rate=exchange_rate,
+            fx_provider=fx_provider or 'internal',
+            entry_type='debit',
+            entry_subtype='transfer',
+            sequence_number=sender_sequence,
+            description=f"Transfer to {receiver_wallet.user.get_full_name()}",
+            metadata={
+                'is_cross_border': is_cross_border,
+                'receiver_country': receiver_wallet.user.country_code
+            }
+        )
+        db.session.add(sender_entry)
+        
+        sender_wallet.balance = sender_entry.balance_after
+        sender_wallet.locked_balance -= total_amount
+        sender_wallet.last_transaction_at = datetime.now(timezone.utc)
+        
+        receiver_sequence = LedgerEntry.get_next_sequence_number(receiver_wallet.id)
+        
+        receiver_entry = LedgerEntry(
+            wallet_id=receiver_wallet.id,
+            transaction_id=transaction.id,
+            amount=receiver_amount,
+            balance_before=receiver_wallet.balance,
+            balance_after=receiver_wallet.balance + receiver_amount,
+            currency=receiver_wallet.primary_currency,
+            fx_rate=exchange_rate,
+            fx_provider=fx_provider or 'internal',
+            entry_type='credit',
+            entry_subtype='transfer',
+            sequence_number=receiver_sequence,
+            description=f"Transfer from {sender_wallet.user.get_full_name()}",
+            metadata={
+                'is_cross_border': is_cross_border,
+                'sender_country': sender_wallet.user.country_code
+            }
+        )
+        db.session.add(receiver_entry)
+        
+        receiver_wallet.balance = receiver_entry.balance_after
+        receiver_wallet.available_balance = receiver_entry.balance_after - receiver_wallet.locked_balance
+        receiver_wallet.last_transaction_at = datetime.now(timezone.utc)
+        
+        transaction.update_status(TransactionStatus.completed)
+        
+        sender_wallet.record_usage(transaction.usage_amount, is_cross_border=is_cross_border)
+        
+        AuditLog.log_user_action(
+            actor_id=sender_user_id,
+            action='transfer.completed',
+            resource_type='transaction',
+            resource_id=transaction.id,
+            metadata={
+                'amount': float(converted_amount),
+                'fee': float(fee),
+                'is_cross_border': is_cross_border,
+                'receiver_id': receiver_wallet.user_id
+            },
+            status='success'
+        )
+        
+        NotificationService.send_transfer_notification(
+            sender_user_id=sender_user_id,
+            receiver_user_id=receiver_wallet.user_id,
+            amount=float(converted_amount),
+            currency=sender_wallet.primary_currency,
+            transaction_id=transaction.id,
+            is_cross_border=is_cross_border
+        )
+
+    @staticmethod
+    def _place_risk_hold(sender_user_id, sender_wallet, transaction, total_amount, decision,
+                         receiver_amount, is_cross_border=False, fx_provider=None):
+        """Keep the transfer pending with its funds locked until review_risk_hold settles or cancels it"""
+        transaction.status = TransactionStatus.pending
+        
+        hold = Hold(
+            wallet_id=sender_wallet.id,
+            transaction_id=transaction.id,
+            hold_type='risk',
+            reason='; '.join(decision.reasons),
+            amount=total_amount,
+            currency=sender_wallet.primary_currency,
+            reference=transaction.reference,
+            meta_data={
+                'rules': decision.rules,
+                'elapsed_ms': round(decision.elapsed_ms, 3),
+                # What settling the transfer on approval credits the receiver
+                'receiver_amount': str(receiver_amount),
+                'is_cross_border': is_cross_border,
+                'fx_provider': fx_provider
+            }
+        )
+        db.session.add(hold)
+        
+        AuditLog.log_user_action(
+            actor_id=sender_user_id,
+            action='transfer.held',
+            resource_type='transaction',
+            resource_id=transaction.id,
+            new_values={'rules': decision.rules, 'amount': float(total_amount)},
+            status='pending'
+        )
+        
+        return hold
+    
+    @staticmethod
+    def review_risk_hold(hold_id, reviewer_id, approve, reason=None):
+        """Settle (approve) or cancel (reject) a transfer held by the risk engine.
+        
+        Approving checks the sender's limits again, then posts the transfer from
+        the funds locked when it was held and records its usage; rejecting fails
+        the transaction and unlocks them.
+        """
+        import uuid
+        
+        try:
+            public_id = uuid.UUID(str(hold_id))
+        except ValueError:
+            return {'success': False, 'message': 'Hold not found'}
+        
+        hold = Hold.query.filter_by(public_id=public_id, hold_type='risk').first()
+        if not hold or not hold.transaction:
+            return {'success': False, 'message': 'Hold not found'}
+        
+        transaction = hold.transaction
+        if hold.status != 'active' or transaction.status != TransactionStatus.pending:
+            return {'success': False, 'message': 'Hold has already been reviewed'}
+        
+        sender_wallet = hold.wallet
+        receiver_wallet = transaction.receiver_wallet
+        meta = hold.meta_data or {}
+        
+        if approve and (receiver_wallet is None or receiver_wallet.status != WalletStatus.active):
+            return {'success': False, 'message': 'Receiver wallet is not active; reject the hold instead'}
+        
+        if approve:
+            # Usage may have grown while the transfer was held; its own funds are already locked
+            check_result = sender_wallet.can_withdraw(
+                transaction.amount, sender_wallet.primary_currency, receiver_wallet.user.country_code, check_balance=False
+            )
+            if not check_result['allowed']:
+                return {'success': False, 'message': f"{check_result['reason']}; reject the hold instead"}
+            
+            kyc_check = ComplianceService.check_transaction_limit(
+                sender_wallet.user, transaction.amount, currency=sender_wallet.primary_currency
+            )
+            if not kyc_check['allowed']:
+                return {'success': False, 'message': f"{kyc_check['reason']}; reject the hold instead"}
+        
+        try:
+            with db.session.begin_nested():
+                if approve:
+                    transaction.update_status(TransactionStatus.processing)
+                    TransferService._settle_transfer(
+                        sender_wallet.user_id, transaction, sender_wallet, receiver_wallet,
+                        Decimal(str(transaction.amount)), Decimal(str(transaction.fee)), Decimal(str(hold.amount)),
+                        Decimal(meta.get('receiver_amount', str(transaction.amount))),
+                        transaction.fx_rate, meta.get('fx_provider'), meta.get('is_cross_border', transaction.is_cross_border)
+                    )
+                    
+                    hold.status = 'released'
+                    hold.resolved_at = datetime.now(timezone.utc)
+                    hold.resolved_by = reviewer_id
+                    hold.resolution_reason = reason
+                    hold.resolution_action = 'release'
+                else:
+                    hold.release(resolved_by_user_id=reviewer_id, reason=reason)
+                    hold.resolution_action = 'refund'
+                    transaction.update_status(TransactionStatus.failed)
+                
+                AuditLog.log_admin_action(
+                    actor_id=reviewer_id,
+                    action='transfer.hold_approved' if approve else 'transfer.hold_rejected',
+                    resource_type='transaction',
+                    resource_id=transaction.id,
+                    new_values={'hold_id': str(hold.public_id), 'reason': reason},
+                    status='success'
+                )
+            
+            db.session.commit()
+            
+            return {
+                'success': True,
+                'message': 'Transfer approved and completed' if approve else 'Transfer rejected and funds released',
+                'transaction_id': transaction.id,
+                'status': transaction.status.value
+            }
+        
+        except Exception as e:
+            db.session.rollback()
+            return {'success': False, 'message': f'Hold review failed: {str(e)}'}
+    
     @staticmethod
     def get_international_transfer_quote(sender_user_id, amount, source_currency, target_currency, destination_country, receiver_details):
         sender_wallet = Wallet.query.filter_by(user_id=sender_user_id).first()
@@ -342,6 +647,12 @@ class TransferService:
         if not check_result['allowed']:
             return {'success': False, 'message': check_result['reason']}
         
+        kyc_check = ComplianceService.check_transaction_limit(
+            sender_wallet.user, converted_amount, currency=sender_wallet.primary_currency
+        )
+        if not kyc_check['allowed']:
+            return {'success': False, 'message': kyc_check['reason']}
+        
         compliance_check = ComplianceService.check_international_transfer(
             source_country=sender_wallet.user.country_code,
             destination_country=destination_country,
@@ -352,13 +663,7 @@ class TransferService:
         if not compliance_check['allowed']:
             return {'success': False, 'message': compliance_check['reason']}
         
-        exchange_rate_record = ExchangeRate.query.filter_by(
-            base_currency=source_currency,
-            target_currency=target_currency
-        ).first()
-        
-        if not exchange_rate_record:
-            exchange_rate_record = CurrencyService.update_exchange_rate(source_currency, target_currency)
+        exchange_rate_record = CurrencyService.get_rate_entry(source_currency, target_currency)
         
         exchange_rate = exchange_rate_record.rate
         
@@ -382,15 +687,44 @@ class TransferService:
             target_currency=target_currency
         )
         
+        quote_details = {
+            'estimated_settlement': estimated_settlement,
+            'compliance_required': compliance_check.get('compliance_required', []),
+            'receiver_requirements': compliance_check.get('receiver_requirements', {}),
+            'receiver_details': receiver_details
+        }
+        
+        quote = QuoteStore.save(
+            quote_type='international',
+            user_id=sender_user_id,
+            ttl=current_app.config['INTERNATIONAL_QUOTE_EXPIRY'],
+            details=quote_details,
+            sender_wallet_id=sender_wallet.id,
+            amount=amount_decimal,
+            currency=source_currency,
+            converted_amount=converted_amount,
+            sender_currency=sender_wallet.primary_currency,
+            receiver_amount=target_amount.quantize(Decimal('0.01'), rounding=ROUND_HALF_UP),
+            receiver_currency=target_currency,
+            fee=fee,
+            total_amount=total_amount,
+            exchange_rate=exchange_rate,
+            fx_provider=exchange_rate_record.provider,
+            fx_timestamp=exchange_rate_record.last_updated,
+            is_cross_border=sender_wallet.user.country_code != destination_country,
+            source_country=sender_wallet.user.country_code,
+            destination_country=destination_country
+        )
+        
         return {
             'success': True,
-            'quote_id': str(uuid.uuid4()),
+            'quote_id': quote.quote_id,
             'amount': float(amount_decimal),
             'source_currency': source_currency,
             'target_amount': float(target_amount),
             'target_currency': target_currency,
             'exchange_rate': float(exchange_rate),
-            'fx_provider': exchange_rate_record.fx_provider if hasattr(exchange_rate_record, 'fx_provider') else 'internal',
+            'fx_provider': exchange_rate_record.provider,
             'fx_timestamp': exchange_rate_record.last_updated.isoformat() if exchange_rate_record.last_updated else None,
             'fee': float(fee),
             'total_amount': float(total_amount),
@@ -399,63 +733,25 @@ class TransferService:
             'estimated_settlement': estimated_settlement,
             'compliance_required': compliance_check.get('compliance_required', []),
             'receiver_requirements': compliance_check.get('receiver_requirements', {}),
-            'expires_at': (datetime.now(timezone.utc) + current_app.config['INTERNATIONAL_QUOTE_EXPIRY']).isoformat()
+            'expires_at': quote.expires_at.isoformat()
         }
     
     @staticmethod
     def initiate_international_transfer(sender_user_id, quote_id, receiver_details, funding_source_id=None, ip_address=None, user_agent=None):
+        quote = QuoteStore.get(quote_id, user_id=sender_user_id, quote_type='international')
+        if not quote:
+            return {'success': False, 'message': 'Quote not found or expired'}
+        
         return {'success': False, 'message': 'International transfers coming soon'}
     
     @staticmethod
     def calculate_transfer_fee(amount, is_cross_border=False, is_cross_region=False):
-        fee_config = current_app.config['FEE_STRUCTURE']
-        
-        if is_cross_border:
-            fee_type = 'international'
-        elif is_cross_region:
-            fee_type = 'cross_region'
-        else:
-            fee_type = 'local_transfer'
-        
-        config = fee_config.get(fee_type, {})
-        
-        if isinstance(config, dict) and 'percentage' in config:
-            percentage_fee = amount * (config['percentage'] / Decimal('100'))
-            fixed_fee = config.get('fixed', Decimal('0'))
-            fee = percentage_fee + fixed_fee
-            
-            min_fee = config.get('min_fee', Decimal('0'))
-            max_fee = config.get('max_fee', Decimal('10000'))
-            
-            fee = max(fee, min_fee)
-            fee = min(fee, max_fee)
-        else:
-            fee = Decimal('10.00')
-        
-        return fee.quantize(Decimal('0.01'))
+        fee_type = FeeEngine.fee_type_for('transfer', is_cross_border, is_cross_region)
+        return FeeEngine.calculate(fee_type, amount)
     
     @staticmethod
     def calculate_international_fee(amount, source_country, destination_country, target_currency):
-        fee_config = current_app.config['INTERNATIONAL_FEE_STRUCTURE']
-        
-        route_key = f"{source_country}_{destination_country}"
-        
-        if route_key in fee_config:
-            config = fee_config[route_key]
-        else:
-            config = fee_config.get('default', {})
-        
-        percentage_fee = amount * (config.get('percentage', Decimal('5')) / Decimal('100'))
-        fixed_fee = config.get('fixed', Decimal('500'))
-        fee = percentage_fee + fixed_fee
-        
-        min_fee = config.get('min_fee', Decimal('1000'))
-        max_fee = config.get('max_fee', Decimal('10000'))
-        
-        fee = max(fee, min_fee)
-        fee = min(fee, max_fee)
-        
-        return fee.quantize(Decimal('0.01'))
+        return FeeEngine.calculate('international', amount, source_country, destination_country)
     
     @staticmethod
     def get_estimated_settlement_time(source_country, destination_country, target_currency):
@@ -0,0 +1,88 @@
+# services/usage_aggregates.py
+from datetime import datetime, timezone
+from decimal import Decimal, ROUND_HALF_UP
+from flask import current_app
+from sqlalchemy import tuple_
+from ..extensions import db
+from ..models import UserUsageAggregate
+from .velocity_counters import Usage
+
+
+def _periods(at):
+    if at.tzinfo is None:
+        at = at.replace(tzinfo=timezone.utc)
+    day = at.astimezone(timezone.utc).date()
+    return {'day': day, 'month': day.replace(day=1)}
+
+
+class UsageAggregates:
+    """Per-user outgoing totals for each UTC calendar day and month.
+
+    record() upserts the current day and month rows in the caller's transaction,
+    alongside the ledger write, so current() is a primary-key read of two rows
+    instead of a SUM over the user's transactions.
+    """
+
+    @staticmethod
+    def in_limit_currency(amount, currency=None):
+        amount = Decimal(str(amount))
+        limit_currency = current_app.config.get('KYC_LIMIT_CURRENCY', 'KES')
+
+        if currency and currency != limit_currency:
+            from .currency_service import CurrencyService
+            amount = amount * CurrencyService.get_exchange_rate(currency, limit_currency)
+
+        return amount.quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
+
+    @classmethod
+    def record(cls, user_id, amount, currency=None, at=None):
+        if db.engine.dialect.name == 'postgresql':
+            from sqlalchemy.dialects.postgresql import insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert
+
+        now = datetime.now(timezone.utc)
+        amount = cls.in_limit_currency(amount, currency)
+
+        table = UserUsageAggregate.__table__
+        statement = insert(table).values([
+            {
+                'user_id': user_id,
+                'period': period,
+                'period_start': period_start,
+                'amount': amount,
+                'count': 1,
+                'updated_at': now
+            }
+            for period, period_start in _periods(at or now).items()
+        ])
+        statement = statement.on_conflict_do_update(
+            index_elements=['user_id', 'period', 'period_start'],
+            set_={
+                'amount': table.c.amount + statement.excluded.amount,
+                'count': table.c.count + statement.excluded.count,
+                'updated_at': statement.excluded.updated_at
+            }
+        )
+
+        db.session.execute(statement)
+
+    @staticmethod
+    def current(user_id, now=None):
+        """{'day': Usage, 'month': Usage} for the current UTC day and month"""
+        periods = _periods(now or datetime.now(timezone.utc))
+
+        rows = db.session.query(
+            UserUsageAggregate.period,
+            UserUsageAggregate.amount,
+            UserUsageAggregate.count
+        ).filter(
+            UserUsageAggregate.user_id == user_id,
+            tuple_(UserUsageAggregate.period, UserUsageAggregate.period_start).in_(list(periods.items()))
+        ).all()
+
+        usage = {period: Usage(amount=Decimal('0.00'), count=0) for period in periods}
+        for period, amount, count in rows:
+            usage[period] = Usage(amount=Decimal(str(amount)).quantize(Decimal('0.01')), count=count)
+
+        return usage
@@ -0,0 +1,49 @@
+# services/user_search.py
+from sqlalchemy import case, func, or_
+from ..extensions import db
+from ..models import User
+
+# Fields a search term is matched against, in User.search_document() order
+SEARCH_FIELDS = ('email', 'username', 'phone_number', 'first_name', 'last_name')
+
+
+class UserSearch:
+    """Ranked substring search over users' email, username, phone and names.
+
+    Terms are matched with LIKE '%term%' against User.search_document(), the
+    lower-cased fields joined by spaces, so "jane doe" finds first plus last
+    name. On PostgreSQL that expression has a pg_trgm GIN index
+    (idx_users_search) and the filter is an index scan instead of a sequential
+    scan of users; matches are ranked by trigram word similarity. Elsewhere
+    (SQLite in tests) the same filter runs unindexed and users with a field
+    starting with the term rank first.
+    """
+
+    @staticmethod
+    def normalize(term):
+        return ' '.join((term or '').lower().split())
+
+    @classmethod
+    def filter(cls, query, term):
+        term = cls.normalize(term)
+        if not term:
+            return query
+        return query.filter(User.search_document().contains(term, autoescape=True))
+
+    @classmethod
+    def ranking(cls, term):
+        """ORDER BY clauses putting the closest matches first"""
+        term = cls.normalize(term)
+
+        if db.engine.dialect.name == 'postgresql':
+            return [func.word_similarity(term, User.search_document()).desc(), User.id]
+
+        prefix = or_(*[
+            func.lower(getattr(User, name)).startswith(term, autoescape=True) for name in SEARCH_FIELDS
+        ])
+        return [case((prefix, 0), else_=1), User.id]
+
+    @classmethod
+    def search(cls, query, term):
+        """query (which must select from or join users) filtered to term, best matches first"""
+        return cls.filter(query, term).order_by(*cls.ranking(term))
@@ -0,0 +1,215 @@
+# services/velocity_counters.py
+from datetime import datetime, timedelta, timezone
+from collections import namedtuple
+from decimal import Decimal
+from sqlalchemy import and_, or_, case, func
+from ..extensions import db
+from ..models import WalletVelocityCounter
+
+Usage = namedtuple('Usage', ['amount', 'count'])
+
+# Finest to coarsest, with the bucket size in seconds; buckets are aligned to the UTC epoch
+GRANULARITIES = (('minute', 60), ('hour', 3600), ('day', 86400))
+
+# How long each granularity is kept. A window edge older than a granularity's
+# retention is widened back to the next coarser bucket boundary
+RETENTION = {
+    'minute': timedelta(days=1),
+    'hour': timedelta(days=35),
+    'day': timedelta(days=400)
+}
+
+DAILY_WINDOW = timedelta(days=1)
+MONTHLY_WINDOW = timedelta(days=30)
+
+# Rolling windows behind the wallet limits, keyed like the old usage columns
+LIMIT_WINDOWS = {
+    'daily_usage': ('local', DAILY_WINDOW),
+    'monthly_usage': ('local', MONTHLY_WINDOW),
+    'cross_border_daily_usage': ('cross_border', DAILY_WINDOW),
+    'cross_border_monthly_usage': ('cross_border', MONTHLY_WINDOW)
+}
+
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def _seconds(value):
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return int((value - EPOCH).total_seconds())
+
+
+def _at(seconds):
+    return EPOCH + timedelta(seconds=seconds)
+
+
+class VelocityCounters:
+    """Time-bucketed debit counters per wallet.
+
+    Every recorded debit bumps one minute, one hour and one day bucket for its
+    scope ('local' or 'cross_border') with a single upsert. A rolling window is
+    answered by tiling it with the coarsest whole buckets that fit - minutes at
+    the ragged edges, then hours, then days - so a check reads at most a few
+    hundred small rows however many debits the wallet made, and never touches
+    the ledger or the wallet row.
+
+    Windows have one-minute resolution and always include the current minute.
+    """
+
+    @staticmethod
+    def scope_for(is_cross_border):
+        return 'cross_border' if is_cross_border else 'local'
+
+    @classmethod
+    def record(cls, wallet_id, amount, is_cross_border=False, at=None):
+        """Add a debit to the wallet's buckets; runs in the caller's transaction"""
+        if db.engine.dialect.name == 'postgresql':
+            from sqlalchemy.dialects.postgresql import insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert
+
+        amount = Decimal(str(amount)).quantize(Decimal('0.01'))
+        seconds = _seconds(at or datetime.now(timezone.utc))
+        scope = cls.scope_for(is_cross_border)
+
+        table = WalletVelocityCounter.__table__
+        statement = insert(table).values([
+            {
+                'wallet_id': wallet_id,
+                'scope': scope,
+                'granularity': granularity,
+                'bucket_start': _at(seconds - seconds % size),
+                'amount': amount,
+                'count': 1
+            }
+            for granularity, size in GRANULARITIES
+        ])
+        statement = statement.on_conflict_do_update(
+            index_elements=['wallet_id', 'scope', 'granularity', 'bucket_start'],
+            set_={
+                'amount': table.c.amount + statement.excluded.amount,
+                'count': table.c.count + statement.excluded.count
+            }
+        )
+
+        db.session.execute(statement)
+
+    @classmethod
+    def usage(cls, wallet_id, windows, now=None):
+        """Usage per named window, in one query.
+
+        windows maps a name to (scope, timedelta); each window ends now.
+        """
+        return cls.usage_many([wallet_id], windows, now=now)[wallet_id]
+
+    @classmethod
+    def usage_many(cls, wallet_ids, windows, now=None):
+        """usage() for several wallets, in one grouped query; {wallet_id: {name: Usage}}"""
+        now = now or datetime.now(timezone.utc)
+        end = _seconds(now) // 60 * 60 + 60
+
+        columns = []
+        earliest = end
+        for scope, window in windows.values():
+            start = cls._window_start(end - int(window.total_seconds()), now)
+            earliest = min(earliest, start)
+
+            in_window = and_(
+                WalletVelocityCounter.scope == scope,
+                or_(*[
+                    and_(
+                        WalletVelocityCounter.granularity == granularity,
+                        WalletVelocityCounter.bucket_start >= _at(bucket_from),
+                        WalletVelocityCounter.bucket_start < _at(bucket_to)
+                    )
+                    for granularity, bucket_from, bucket_to in cls.cover(start, end)
+                ])
+            )
+            columns.append(func.coalesce(func.sum(case((in_window, WalletVelocityCounter.amount), else_=0)), 0))
+            columns.append(func.coalesce(func.sum(case((in_window, WalletVelocityCounter.count), else_=0)), 0))
+
+        rows = {}
+        if wallet_ids:
+            rows = {
+                row[0]: row[1:]
+                for row in db.session.query(WalletVelocityCounter.wallet_id, *columns).filter(
+                    WalletVelocityCounter.wallet_id.in_(wallet_ids),
+                    WalletVelocityCounter.bucket_start >= _at(earliest)
+                ).group_by(WalletVelocityCounter.wallet_id).all()
+            }
+
+        usage = {}
+        for wallet_id in wallet_ids:
+            # Wallets without counters in range have no usage
+            values = rows.get(wallet_id, (0,) * len(columns))
+            usage[wallet_id] = {
+                name: Usage(
+                    amount=Decimal(str(values[2 * index])).quantize(Decimal('0.01')),
+                    count=int(values[2 * index + 1])
+                )
+                for index, name in enumerate(windows)
+            }
+
+        return usage
+
+    @classmethod
+    def total(cls, wallet_id, start, end=None, is_cross_border=False):
+        """Debit total between start and end (default now)"""
+        end = end or datetime.now(timezone.utc)
+        usage = cls.usage(
+            wallet_id,
+            {'total': (cls.scope_for(is_cross_border), end - start)},
+            now=end
+        )
+        return usage['total'].amount
+
+    @staticmethod
+    def cover(start, end):
+        """(granularity, start, end) ranges, in epoch seconds, tiling [start, end) with the fewest buckets"""
+        ranges = []
+
+        for index, (granularity, size) in enumerate(GRANULARITIES):
+            if index + 1 == len(GRANULARITIES):
+                ranges.append((granularity, start, end))
+                break
+
+            coarser = GRANULARITIES[index + 1][1]
+            head = -(-start // coarser) * coarser
+            tail = end // coarser * coarser
+            if head >= tail:
+                ranges.append((granularity, start, end))
+                break
+
+            if start < head:
+                ranges.append((granularity, start, head))
+            if tail < end:
+                ranges.append((granularity, tail, end))
+            start, end = head, tail
+
+        return [(granularity, start, end) for granularity, start, end in ranges if start < end]
+
+    @staticmethod
+    def _window_start(start, now):
+        start -= start % GRANULARITIES[0][1]
+        now_seconds = _seconds(now)
+
+        for (granularity, _), (_, coarser) in zip(GRANULARITIES, GRANULARITIES[1:]):
+            if now_seconds - start > RETENTION[granularity].total_seconds():
+                start -= start % coarser
+
+        return start
+
+    @staticmethod
+    def prune(now=None):
+        """Delete buckets past their granularity's retention; returns the number removed"""
+        now = now or datetime.now(timezone.utc)
+        removed = 0
+
+        for granularity, _ in GRANULARITIES:
+            removed += WalletVelocityCounter.query.filter(
+                WalletVelocityCounter.granularity == granularity,
+                WalletVelocityCounter.bucket_start < now - RETENTION[granularity]
+            ).delete(synchronize_session=False)
+
+        db.session.commit()
+        return removed
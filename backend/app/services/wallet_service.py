@@ -4,6 +4,7 @@ from sqlalchemy import func
 from ..extensions import db
 from app.models import Wallet, Transaction, LedgerEntry, AuditLog
 from app.models.enums import TransactionStatus, TransactionType, PaymentProvider
+from .wallet_summary import WalletSummaryCache
 
 class WalletService:
     
@@ -31,51 +32,16 @@ class WalletService:
         """
         Get wallet analytics including transaction trends
         """
-        wallet = Wallet.query.filter_by(user_id=user_id).first()
-        if not wallet:
+        wallet_id = db.session.query(Wallet.id).filter_by(user_id=user_id).scalar()
+        if not wallet_id:
             return {}
         
         # Last 30 days
-        thirty_days_ago = datetime.utcnow() - timedelta(days=30)
-        
-        # Get deposits
-        deposits = Transaction.query.filter(
-            Transaction.receiver_wallet_id == wallet.id,
-            Transaction.transaction_type == TransactionType.deposit,
-            Transaction.status == TransactionStatus.completed,
-            Transaction.created_at >= thirty_days_ago
-        ).all()
-        total_deposits = sum([tx.amount for tx in deposits], Decimal('0.00'))
-        
-        # Get withdrawals
-        withdrawals = Transaction.query.filter(
-            Transaction.sender_wallet_id == wallet.id,
-            Transaction.transaction_type == TransactionType.withdrawal,
-            Transaction.status == TransactionStatus.completed,
-            Transaction.created_at >= thirty_days_ago
-        ).all()
-        total_withdrawals = sum([tx.amount for tx in withdrawals], Decimal('0.00'))
-        
-        # Get transfers (sent)
-        transfers = Transaction.query.filter(
-            Transaction.sender_wallet_id == wallet.id,
-            Transaction.transaction_type == TransactionType.transfer,
-            Transaction.status == TransactionStatus.completed,
-            Transaction.created_at >= thirty_days_ago
-        ).all()
-        total_transfers = sum([tx.amount for tx in transfers], Decimal('0.00'))
-        
-        # Total transaction count
-        transaction_count = Transaction.query.filter(
-            (Transaction.sender_wallet_id == wallet.id) |
-            (Transaction.receiver_wallet_id == wallet.id),
-            Transaction.status == TransactionStatus.completed,
-            Transaction.created_at >= thirty_days_ago
-        ).count()
+        summary = WalletSummaryCache.get(wallet_id, days=30)
         
         return {
-            'total_deposits': float(total_deposits),
-            'total_withdrawals': float(total_withdrawals),
-            'total_transfers': float(total_transfers),
-            'transaction_count': transaction_count
-        }
\ No newline at end of file
+            'total_deposits': float(summary['total_deposits']),
+            'total_withdrawals': float(summary['total_withdrawals']),
+            'total_transfers': float(summary['total_transfers']),
+            'transaction_count': summary['completed']
+        }
@@ -0,0 +1,105 @@
+# services/wallet_summary.py
+from datetime import datetime, timedelta
+from decimal import Decimal
+from sqlalchemy import event, func, or_
+from sqlalchemy.orm import Session
+from ..cache import TTLCache
+from ..extensions import db
+from ..models import Transaction, LedgerEntry
+from ..models.enums import TransactionStatus, TransactionType
+
+
+class WalletSummaryCache:
+    """Per-wallet activity summaries, computed in one aggregate query and cached.
+
+    An entry is keyed by (wallet_id, days) and a hit costs no query. Commits in
+    this process drop the entries of every wallet whose ledger or transactions
+    they touched. What other processes commit - new transactions, or a status
+    change such as pending to failed - is not seen until the entry expires, so
+    summaries can lag them by up to WALLET_SUMMARY_TTL seconds.
+    """
+
+    _entries = TTLCache('WALLET_SUMMARY_TTL', 60, 'WALLET_SUMMARY_CACHE_SIZE', 10000)
+
+    @classmethod
+    def get(cls, wallet_id, days=30):
+        key = (wallet_id, days)
+
+        summary = cls._entries.get(key)
+        if summary is None:
+            summary = cls.summarize(wallet_id, days)
+            cls._entries.set(key, summary)
+        return summary
+
+    @staticmethod
+    def summarize(wallet_id, days=30):
+        """Totals over the last days for a wallet, in a single pass over its transactions"""
+        start_date = datetime.utcnow() - timedelta(days=days)
+
+        completed = Transaction.status == TransactionStatus.completed
+        sent = Transaction.sender_wallet_id == wallet_id
+        received = Transaction.receiver_wallet_id == wallet_id
+
+        row = db.session.query(
+            func.count(Transaction.id).filter(completed),
+            func.count(Transaction.id).filter(Transaction.status == TransactionStatus.pending),
+            func.count(Transaction.id).filter(Transaction.status == TransactionStatus.failed),
+            func.sum(Transaction.amount).filter(completed),
+            func.sum(Transaction.amount).filter(
+                completed, received, Transaction.transaction_type == TransactionType.deposit
+            ),
+            func.sum(Transaction.amount).filter(
+                completed, sent, Transaction.transaction_type == TransactionType.withdrawal
+            ),
+            func.sum(Transaction.amount).filter(
+                completed, sent, Transaction.transaction_type == TransactionType.transfer
+            )
+        ).filter(
+            or_(sent, received),
+            Transaction.created_at >= start_date
+        ).one()
+
+        return {
+            'completed': row[0],
+            'pending': row[1],
+            'failed': row[2],
+            'total_amount': row[3] or Decimal('0.00'),
+            'total_deposits': row[4] or Decimal('0.00'),
+            'total_withdrawals': row[5] or Decimal('0.00'),
+            'total_transfers': row[6] or Decimal('0.00')
+        }
+
+    @classmethod
+    def invalidate(cls, wallet_ids=None):
+        if wallet_ids is None:
+            cls._entries.clear()
+        else:
+            cls._entries.discard_where(lambda key: key[0] in wallet_ids)
+
+
+@event.listens_for(Session, 'after_flush')
+def _track_wallet_activity(session, flush_context):
+    wallet_ids = set()
+
+    for instance in (*session.new, *session.dirty):
+        if isinstance(instance, LedgerEntry):
+            wallet_ids.add(instance.wallet_id)
+        elif isinstance(instance, Transaction):
+            wallet_ids.update((instance.sender_wallet_id, instance.receiver_wallet_id))
+
+    wallet_ids.discard(None)
+    if wallet_ids:
+        session.info.setdefault('wallet_summaries_changed', set()).update(wallet_ids)
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_wallet_summaries(session):
+    wallet_ids = session.info.pop('wallet_summaries_changed', None)
+    if wallet_ids:
+        WalletSummaryCache.invalidate(wallet_ids)
+
+
+@event.listens_for(Session, 'after_soft_rollback')
+def _discard_wallet_activity(session, previous_transaction):
+    if not previous_transaction.nested:
+        session.info.pop('wallet_summaries_changed', None)
@@ -1,3 +0,0 @@
-from .test_models import test_models
-
-__all__ = ['test_models']
@@ -251,4 +251,590 @@ class TestAdminRoutes:
         
         for endpoint in endpoints:
             response = client.get(endpoint)
-            assert response.status_code == 401
\ No newline at end of file
+            assert response.status_code == 401
+
+class TestSystemAnalytics:
+    """Test system analytics aggregates and their snapshot"""
+    
+    def test_transaction_aggregates(self, db_session, regular_user, second_user):
+        """Test filtered aggregates count completed volume and fees only"""
+        from app.models import Transaction
+        from app.models.enums import TransactionStatus, TransactionType, PaymentProvider
+        from app.services.analytics_service import AnalyticsService
+        
+        for amount, status in (('1000.00', TransactionStatus.completed),
+                               ('2500.00', TransactionStatus.completed),
+                               ('9000.00', TransactionStatus.failed)):
+            db_session.add(Transaction(
+                sender_wallet_id=regular_user.wallet.id,
+                receiver_wallet_id=second_user.wallet.id,
+                amount=Decimal(amount),
+                fee=Decimal('10.00'),
+                transaction_type=TransactionType.transfer,
+                status=status,
+                provider=PaymentProvider.internal
+            ))
+        db_session.commit()
+        
+        transactions = AnalyticsService.get_system_analytics()['transactions']
+        assert transactions['total_last_30_days'] == 3
+        assert transactions['completed_last_30_days'] == 2
+        assert transactions['volume_last_30_days'] == 3500.0
+        assert transactions['fees_last_30_days'] == 20.0
+        assert transactions['today_count'] == 3
+        assert transactions['today_volume'] == 3500.0
+    
+    def test_snapshot_served_until_stale(self, app, db_session, regular_user, second_user):
+        """Test a fresh snapshot is reused and a stale one is rebuilt"""
+        from app.services.analytics_snapshot import AnalyticsSnapshot
+        
+        app.config['ANALYTICS_SNAPSHOT_MAX_AGE'] = 300
+        AnalyticsSnapshot.invalidate()
+        try:
+            total = AnalyticsSnapshot.get()['users']['total']
+            second_user.is_active = False
+            db_session.commit()
+            assert AnalyticsSnapshot.get()['users']['active'] == total
+            
+            app.config['ANALYTICS_SNAPSHOT_MAX_AGE'] = 0
+            assert AnalyticsSnapshot.get()['users']['active'] == total - 1
+        finally:
+            app.config['ANALYTICS_SNAPSHOT_MAX_AGE'] = 0
+            AnalyticsSnapshot.invalidate()
+
+    
+    def test_rollups_follow_status_changes(self, db_session, regular_user, second_user):
+        """Test a status change moves a transaction between rollup rows"""
+        from app.models import Transaction
+        from app.models.enums import TransactionStatus, TransactionType, PaymentProvider
+        from app.services.transaction_rollups import TransactionRollups
+        
+        transaction = Transaction(
+            sender_wallet_id=regular_user.wallet.id,
+            receiver_wallet_id=second_user.wallet.id,
+            amount=Decimal('1200.00'),
+            fee=Decimal('12.00'),
+            source_country='KE',
+            destination_country='UG',
+            transaction_type=TransactionType.transfer,
+            status=TransactionStatus.pending,
+            provider=PaymentProvider.internal
+        )
+        db_session.add(transaction)
+        db_session.commit()
+        
+        transaction.status = TransactionStatus.completed
+        db_session.commit()
+        
+        today = datetime.utcnow().date()
+        rows = TransactionRollups.totals(today, today, group_by=('status', 'destination_country'), statuses=None)
+        assert [(row.status, row.destination_country, row.count, row.fee) for row in rows] == [
+            ('completed', 'UG', 1, Decimal('12.00')),
+            ('pending', 'UG', 0, Decimal('0.00'))
+        ]
+    
+    def test_rebuild_matches_incremental_rollups(self, db_session, regular_user, second_user):
+        """Test rebuilding from transactions reproduces the incremental rollups"""
+        from app.models import Transaction
+        from app.models.enums import TransactionStatus, TransactionType, PaymentProvider
+        from app.services.transaction_rollups import TransactionRollups
+        
+        for amount, status in (('100.00', TransactionStatus.completed),
+                               ('250.00', TransactionStatus.failed),
+                               ('400.00', TransactionStatus.completed)):
+            db_session.add(Transaction(
+                sender_wallet_id=regular_user.wallet.id,
+                receiver_wallet_id=second_user.wallet.id,
+                amount=Decimal(amount),
+                fee=Decimal('1.00'),
+                transaction_type=TransactionType.transfer,
+                status=status,
+                provider=PaymentProvider.internal
+            ))
+            db_session.commit()
+        
+        today = datetime.utcnow().date()
+        incremental = TransactionRollups.totals(today, today, group_by=('status',), statuses=None)
+        TransactionRollups.rebuild(today, today)
+        
+        assert TransactionRollups.totals(today, today, group_by=('status',), statuses=None) == incremental
+        assert [(row.status, row.count, row.amount) for row in incremental] == [
+            ('completed', 2, Decimal('500.00')),
+            ('failed', 1, Decimal('250.00'))
+        ]
+    
+    def test_corridor_report(self, db_session, regular_user, second_user):
+        """Test corridor figures follow completions and match a rebuild"""
+        from app.models import Transaction, ExchangeRateHistory
+        from app.models.enums import TransactionStatus, TransactionType, PaymentProvider
+        from app.services.corridor_analytics import CorridorAnalytics
+        
+        db_session.add(ExchangeRateHistory(
+            base_currency='KES',
+            target_currency='UGX',
+            rate=Decimal('28.000000'),
+            recorded_at=datetime.utcnow() - timedelta(hours=1)
+        ))
+        transactions = []
+        for amount, status in (('1000.00', TransactionStatus.processing),
+                               ('3000.00', TransactionStatus.completed),
+                               ('500.00', TransactionStatus.failed)):
+            transaction = Transaction(
+                sender_wallet_id=regular_user.wallet.id,
+                receiver_wallet_id=second_user.wallet.id,
+                amount=Decimal(amount),
+                fee=Decimal('10.00'),
+                source_currency='KES',
+                target_currency='UGX',
+                fx_rate=Decimal('27.720000'),
+                source_country='KE',
+                destination_country='UG',
+                is_cross_border=True,
+                transaction_type=TransactionType.transfer,
+                status=status,
+                provider=PaymentProvider.internal
+            )
+            db_session.add(transaction)
+            transactions.append(transaction)
+        db_session.commit()
+        
+        transactions[0].status = TransactionStatus.completed
+        transactions[0].completed_at = datetime.utcnow()
+        db_session.commit()
+        
+        today = datetime.utcnow().date()
+        [corridor] = CorridorAnalytics.report(today, today)
+        assert corridor['source_country'] == 'KE'
+        assert corridor['destination_country'] == 'UG'
+        assert corridor['transaction_count'] == 3
+        assert corridor['completed_count'] == 2
+        assert corridor['failure_rate'] == pytest.approx(1 / 3)
+        assert corridor['volume'] == 4000.0
+        assert corridor['fees'] == 20.0
+        assert corridor['fx_spread_bps'] == pytest.approx(100.0)
+        assert corridor['avg_settlement_seconds'] is not None
+        
+        CorridorAnalytics.rebuild(today, today)
+        assert CorridorAnalytics.report(today, today) == [corridor]
+
+class TestSuspiciousActivity:
+    """Test suspicious activity detection on commit"""
+    
+    def _transfer(self, db_session, sender, receiver, amount):
+        from app.models import Transaction
+        from app.models.enums import TransactionStatus, TransactionType, PaymentProvider
+        
+        db_session.add(Transaction(
+            sender_wallet_id=sender.wallet.id,
+            receiver_wallet_id=receiver.wallet.id,
+            amount=Decimal(amount),
+            fee=Decimal('0.00'),
+            transaction_type=TransactionType.transfer,
+            status=TransactionStatus.completed,
+            provider=PaymentProvider.internal
+        ))
+    
+    def test_detections_recorded_on_commit(self, db_session, regular_user, second_user):
+        """Test large and high-frequency transfers are listed once committed"""
+        from app.services.analytics_service import AnalyticsService
+        
+        self._transfer(db_session, regular_user, second_user, '150000.00')
+        db_session.commit()
+        for _ in range(10):
+            self._transfer(db_session, regular_user, second_user, '100.00')
+            db_session.commit()
+        
+        activities = AnalyticsService.get_suspicious_activities()
+        assert [tx['amount'] for tx in activities['large_transactions']] == [150000.0]
+        assert activities['large_transactions'][0]['user_id'] == regular_user.id
+        assert activities['suspicious_users'] == [{
+            'wallet_id': regular_user.wallet.id,
+            'user_id': regular_user.id,
+            'transaction_count': 11,
+            'total_amount': 151000.0
+        }]
+    
+    def test_failed_login_recorded(self, client, regular_user):
+        """Test a failed login is audited and listed"""
+        from app.services.analytics_service import AnalyticsService
+        
+        response = client.post('/api/v1/auth/login', json={'email': regular_user.email, 'password': 'wrong'})
+        assert response.status_code == 401
+        
+        failed_logins = AnalyticsService.get_suspicious_activities()['failed_logins']
+        assert len(failed_logins) == 1
+        assert failed_logins[0]['actor_id'] == regular_user.id
+        assert failed_logins[0]['error_message'] == 'Invalid credentials'
+    
+    def test_rolled_back_rows_not_detected(self, db_session, regular_user, second_user):
+        """Test nothing is recorded for a transaction that rolls back"""
+        from app.models import SuspiciousActivity
+        
+        self._transfer(db_session, regular_user, second_user, '150000.00')
+        db_session.flush()
+        db_session.rollback()
+        
+        assert SuspiciousActivity.query.count() == 0
+    
+    def test_failing_hook_keeps_other_hooks(self, db_session, regular_user, second_user, monkeypatch):
+        """Test a commit hook that fails rolls back its own savepoint only"""
+        from app.models import SuspiciousActivity
+        from app.services import commit_hooks
+        
+        def fail(batches):
+            raise RuntimeError('hook failed')
+        
+        failing = commit_hooks.CommitHook('failing', lambda session: True, fail)
+        monkeypatch.setattr(commit_hooks, '_hooks', commit_hooks._hooks + [failing])
+        
+        self._transfer(db_session, regular_user, second_user, '150000.00')
+        db_session.commit()
+        
+        assert SuspiciousActivity.query.count() == 1
+
+
+class TestColumnarExport:
+    """Test columnar exports of transactions"""
+    
+    def _transfers(self, db_session, sender, receiver, count):
+        from app.models import Transaction
+        from app.models.enums import TransactionStatus, TransactionType, PaymentProvider
+        
+        for i in range(count):
+            db_session.add(Transaction(
+                sender_wallet_id=sender.wallet.id,
+                receiver_wallet_id=receiver.wallet.id,
+                amount=Decimal('100.00') + i,
+                fee=Decimal('1.00'),
+                transaction_type=TransactionType.transfer,
+                status=TransactionStatus.completed,
+                provider=PaymentProvider.internal
+            ))
+        db_session.commit()
+    
+    def test_export_resumes_from_watermark(self, tmp_path, db_session, regular_user, second_user):
+        """Test a second export only writes rows added since the first"""
+        import pyarrow.dataset as ds
+        from app.services.columnar_export import ColumnarExport
+        
+        self._transfers(db_session, regular_user, second_user, 3)
+        first = ColumnarExport.export('transactions', output_dir=str(tmp_path), batch_size=2)
+        assert first['rows'] >= 3
+        
+        self._transfers(db_session, regular_user, second_user, 2)
+        second = ColumnarExport.export('transactions', output_dir=str(tmp_path))
+        assert second['rows'] == 2
+        assert second['since_id'] == first['watermark']
+        
+        exported = ds.dataset(str(tmp_path / 'transactions'), format='parquet', partitioning='hive').to_table()
+        assert exported.num_rows == first['rows'] + 2
+        ids = exported.column('id').to_pylist()
+        assert len(set(ids)) == len(ids)
+        assert max(ids) == second['watermark']
+        assert set(exported.column('status').to_pylist()) == {'completed'}
+    
+    def test_export_holds_back_recent_rows(self, app, tmp_path, db_session, regular_user, second_user):
+        """Test rows younger than the commit lag wait for the next export"""
+        from app.services.columnar_export import ColumnarExport
+    
+        self._transfers(db_session, regular_user, second_user, 2)
+        first = ColumnarExport.export('transactions', output_dir=str(tmp_path))
+    
+        app.config['EXPORT_COMMIT_LAG'] = timedelta(minutes=5)
+        try:
+            self._transfers(db_session, regular_user, second_user, 2)
+            held = ColumnarExport.export('transactions', output_dir=str(tmp_path))
+            assert held['rows'] == 0
+            assert held['watermark'] == first['watermark']
+        finally:
+            app.config['EXPORT_COMMIT_LAG'] = timedelta(0)
+    
+        assert ColumnarExport.export('transactions', output_dir=str(tmp_path))['rows'] == 2
+    
+    def test_full_export_replaces_incremental_parts(self, tmp_path, db_session, regular_user, second_user):
+        """Test a full export leaves one copy of every row"""
+        import pyarrow.dataset as ds
+        from app.services.columnar_export import ColumnarExport
+    
+        self._transfers(db_session, regular_user, second_user, 2)
+        ColumnarExport.export('transactions', output_dir=str(tmp_path))
+        self._transfers(db_session, regular_user, second_user, 2)
+        ColumnarExport.export('transactions', output_dir=str(tmp_path))
+    
+        full = ColumnarExport.export('transactions', output_dir=str(tmp_path), full=True)
+    
+        exported = ds.dataset(str(tmp_path / 'transactions'), format='parquet', partitioning='hive').to_table()
+        ids = exported.column('id').to_pylist()
+        assert len(set(ids)) == len(ids) == full['rows']
+        assert ColumnarExport.read_watermark(str(tmp_path / 'transactions')) == full['watermark']
+    
+    def test_stream_arrow_endpoint(self, client, admin_headers, db_session, regular_user, second_user):
+        """Test the endpoint streams rows above since_id with the new watermark"""
+        import pyarrow as pa
+        
+        self._transfers(db_session, regular_user, second_user, 3)
+        
+        response = client.get('/api/v1/admin/exports/transactions?format=arrow&since_id=0',
+                            headers=admin_headers)
+        
+        assert response.status_code == 200
+        exported = pa.ipc.open_stream(response.data).read_all()
+        assert exported.num_rows >= 3
+        assert max(exported.column('id').to_pylist()) == int(response.headers['X-Export-Watermark'])
+        assert exported.schema.field('amount').type == pa.decimal128(12, 2)
+
+
+class TestListQueryCounts:
+    """Test list endpoints run a constant number of queries however long the page"""
+    
+    def _transfers(self, db_session, sender, receiver, count):
+        from app.models import Transaction
+        from app.models.enums import TransactionStatus, TransactionType, PaymentProvider
+        
+        for _ in range(count):
+            db_session.add(Transaction(
+                sender_wallet_id=sender.wallet.id,
+                receiver_wallet_id=receiver.wallet.id,
+                amount=Decimal('100.00'),
+                fee=Decimal('1.00'),
+                transaction_type=TransactionType.transfer,
+                status=TransactionStatus.completed,
+                provider=PaymentProvider.internal
+            ))
+        db_session.commit()
+    
+    def _count_queries(self, client, query_counter, url, headers):
+        from app.services.identity_cache import IdentityCache
+        
+        # Each measured request authenticates from scratch
+        IdentityCache.invalidate()
+        with query_counter as counter:
+            response = client.get(url, headers=headers)
+        assert response.status_code == 200
+        return counter.count
+    
+    @pytest.mark.parametrize('url, as_admin', [
+        ('/api/v1/admin/transactions?per_page=50', True),
+        ('/api/v1/transfers/history?per_page=50', False),
+        ('/api/v1/user/transactions?per_page=50', False)
+    ])
+    def test_transaction_lists(self, client, query_counter, db_session, regular_user, second_user,
+                               auth_headers, admin_headers, url, as_admin):
+        """Test transaction lists load wallets and users with the page"""
+        headers = admin_headers if as_admin else auth_headers
+        
+        self._transfers(db_session, regular_user, second_user, 2)
+        short_page = self._count_queries(client, query_counter, url, headers)
+        
+        self._transfers(db_session, regular_user, second_user, 20)
+        long_page = self._count_queries(client, query_counter, url, headers)
+        
+        assert long_page == short_page
+        assert long_page <= 5
+    
+    def test_pending_kyc_list(self, client, query_counter, db_session, admin_headers, admin_user,
+                              regular_user, second_user, unverified_user):
+        """Test the pending KYC list loads users with the page"""
+        from app.models.enums import KYCStatus
+        
+        counts = []
+        for user in (unverified_user, regular_user, second_user):
+            # Every user is created with a KYC record
+            user.kyc_verification.status = KYCStatus.pending
+            user.kyc_verification.submitted_at = datetime.utcnow()
+            db_session.commit()
+            counts.append(self._count_queries(client, query_counter, '/api/v1/admin/kyc/pending', admin_headers))
+        
+        assert counts[0] == counts[-1]
+    
+    def _users(self, db_session, start, count):
+        from app.models import User, Wallet, Account, UserAccount
+        from app.models.enums import KYCStatus
+        
+        for i in range(start, start + count):
+            user = User(
+                email=f'listed{i}@test.com',
+                username=f'listed{i}',
+                phone_number=f'+2547100{i:05d}',
+                first_name='Listed',
+                last_name=f'User{i}',
+                is_active=True,
+                kyc_status=KYCStatus.verified
+            )
+            user.set_password('password123')
+            db_session.add(user)
+            db_session.flush()
+            
+            if not user.wallet:
+                db_session.add(Wallet(user_id=user.id, balance=Decimal('100')))
+            account = Account(
+                legal_name=f'Listed {i}',
+                country_of_incorporation='KE',
+                primary_email=user.email,
+                primary_phone=user.phone_number
+            )
+            db_session.add(account)
+            db_session.flush()
+            db_session.add(UserAccount(user_id=user.id, account_id=account.id, is_primary=True))
+        db_session.commit()
+    
+    @pytest.mark.parametrize('url', [
+        '/api/v1/admin/users?per_page=50&include_accounts=true',
+        '/api/v1/admin/wallets?per_page=50'
+    ])
+    def test_user_and_wallet_lists(self, client, query_counter, db_session, admin_headers, admin_user, url):
+        """Test user and wallet lists batch-load wallets, usage, KYC and accounts"""
+        self._users(db_session, 0, 2)
+        short_page = self._count_queries(client, query_counter, url, admin_headers)
+        
+        self._users(db_session, 2, 20)
+        long_page = self._count_queries(client, query_counter, url, admin_headers)
+        
+        assert long_page == short_page
+        assert long_page <= 8
+
+
+
+class TestSparseFieldsets:
+    """Test fields= limits list responses and the columns they select"""
+    
+    def _transfer(self, db_session, sender, receiver):
+        from app.models import Transaction
+        from app.models.enums import TransactionStatus, TransactionType, PaymentProvider
+        
+        db_session.add(Transaction(
+            sender_wallet_id=sender.wallet.id,
+            receiver_wallet_id=receiver.wallet.id,
+            amount=Decimal('100.00'),
+            fee=Decimal('1.00'),
+            transaction_type=TransactionType.transfer,
+            status=TransactionStatus.completed,
+            provider=PaymentProvider.internal,
+            meta_data={'note': 'rent'}
+        ))
+        db_session.commit()
+    
+    @pytest.mark.parametrize('url, as_admin', [
+        ('/api/v1/admin/transactions', True),
+        ('/api/v1/transfers/history', False),
+        ('/api/v1/user/transactions', False)
+    ])
+    def test_transaction_fields(self, client, query_counter, db_session, regular_user, second_user,
+                                auth_headers, admin_headers, url, as_admin):
+        """Test transaction lists return and select only the requested fields"""
+        self._transfer(db_session, regular_user, second_user)
+        headers = admin_headers if as_admin else auth_headers
+        
+        with query_counter as counter:
+            response = client.get(f'{url}?fields=id,amount,status,receiver', headers=headers)
+        assert response.status_code == 200
+        
+        transaction = response.get_json()['transactions'][0]
+        assert set(transaction) == {'id', 'amount', 'status', 'receiver'}
+        assert transaction['amount'] == 100.0
+        assert transaction['receiver']['user_id'] == second_user.id
+        
+        selects = [statement for statement in counter.statements if 'FROM transactions' in statement]
+        assert selects and not any('meta_data' in statement for statement in selects)
+        
+        response = client.get(f'{url}?fields=metadata', headers=headers)
+        assert response.get_json()['transactions'][0] == {'metadata': {'note': 'rent'}}
+    
+    def test_unknown_field_rejected(self, client, auth_headers, admin_headers):
+        """Test an unknown field name is a bad request"""
+        response = client.get('/api/v1/transfers/history?fields=id,password_hash', headers=auth_headers)
+        assert response.status_code == 400
+        assert 'password_hash' in response.get_json()['message']
+        
+        response = client.get('/api/v1/admin/audit-logs?fields=user_agent', headers=admin_headers)
+        assert response.status_code == 400
+    
+    def test_wallet_and_audit_log_fields(self, client, query_counter, db_session, admin_headers, admin_user, regular_user):
+        """Test wallet and audit log lists leave out unrequested JSONB columns"""
+        from app.models import AuditLog
+        
+        db_session.add(AuditLog(
+            actor_id=admin_user.id,
+            actor_type='admin',
+            action='wallet_frozen',
+            resource_type='wallet',
+            resource_id=regular_user.wallet.id,
+            new_values={'status': 'frozen'}
+        ))
+        db_session.commit()
+        
+        with query_counter as counter:
+            response = client.get('/api/v1/admin/wallets?fields=id,balance,daily_usage', headers=admin_headers)
+        assert response.status_code == 200
+        for wallet in response.get_json()['wallets']:
+            assert set(wallet) == {'id', 'balance', 'daily_usage'}
+        page = [statement for statement in counter.statements if statement.startswith('SELECT wallets.')]
+        assert page and not any('currency_balances' in statement for statement in page)
+        
+        with query_counter as counter:
+            response = client.get('/api/v1/admin/audit-logs?fields=id,action,created_at', headers=admin_headers)
+        assert response.status_code == 200
+        assert response.get_json()['audit_logs'][0]['action'] == 'wallet_frozen'
+        assert set(response.get_json()['audit_logs'][0]) == {'id', 'action', 'created_at'}
+        page = [statement for statement in counter.statements if statement.startswith('SELECT audit_logs.')]
+        assert page and not any('new_values' in statement for statement in page)
+
+
+class TestPagination:
+    """Test the exact, estimate and none count modes of list endpoints"""
+    
+    def _transfers(self, db_session, sender, receiver, count):
+        from app.models import Transaction
+        from app.models.enums import TransactionStatus, TransactionType, PaymentProvider
+        
+        for _ in range(count):
+            db_session.add(Transaction(
+                sender_wallet_id=sender.wallet.id,
+                receiver_wallet_id=receiver.wallet.id,
+                amount=Decimal('100.00'),
+                fee=Decimal('1.00'),
+                transaction_type=TransactionType.transfer,
+                status=TransactionStatus.completed,
+                provider=PaymentProvider.internal
+            ))
+        db_session.commit()
+    
+    def _page(self, client, query_counter, headers, query):
+        with query_counter as counter:
+            response = client.get(f'/api/v1/admin/transactions?per_page=2&{query}', headers=headers)
+        assert response.status_code == 200
+        counts = [statement for statement in counter.statements if 'count(' in statement.lower()]
+        return json.loads(response.data), counts
+    
+    def test_count_modes(self, client, query_counter, db_session, admin_headers, regular_user, second_user):
+        """Test each mode's total, pages and has_more, and that none runs no count"""
+        from app.pagination import CountCache
+        
+        self._transfers(db_session, regular_user, second_user, 5)
+        CountCache.clear()
+        
+        exact, counts = self._page(client, query_counter, admin_headers, 'count=exact')
+        assert (exact['total'], exact['pages'], exact['has_more']) == (5, 3, True)
+        assert not exact['total_is_estimate'] and len(counts) == 1
+        
+        estimate, _ = self._page(client, query_counter, admin_headers, 'count=estimate')
+        assert estimate['total'] == 5 and estimate['has_more']
+        
+        none, counts = self._page(client, query_counter, admin_headers, 'count=none')
+        assert (none['total'], none['pages'], none['has_more']) == (None, None, True)
+        assert len(none['transactions']) == 2 and counts == []
+        
+        last, counts = self._page(client, query_counter, admin_headers, 'count=none&page=3')
+        assert (last['total'], last['has_more'], len(last['transactions'])) == (5, False, 1)
+        assert counts == []
+    
+    def test_exact_is_default_for_admin_transactions(self, client, db_session, admin_headers, regular_user, second_user):
+        """Test admin transactions count exactly by default and reject unknown modes"""
+        self._transfers(db_session, regular_user, second_user, 3)
+        
+        response = client.get('/api/v1/admin/transactions?per_page=2', headers=admin_headers)
+        data = json.loads(response.data)
+        assert data['total'] == 3 and not data['total_is_estimate']
+        
+        response = client.get('/api/v1/admin/transactions?count=approximate', headers=admin_headers)
+        assert response.status_code == 400
@@ -229,4 +229,48 @@ class TestAuthRoutes:
         
         assert response.status_code == 200
         response_data = json.loads(response.data)
-        assert response_data['message'] == 'Logged out successfully'
\ No newline at end of file
+        assert response_data['message'] == 'Logged out successfully'
+
+class TestIdentityCache:
+    """Test token_required serves identities from cache and drops them on change"""
+    
+    def _history(self, client, query_counter, auth_headers):
+        with query_counter as counter:
+            response = client.get('/api/v1/transfers/history', headers=auth_headers)
+        return response, [statement for statement in counter.statements if 'FROM users' in statement]
+    
+    def test_repeat_requests_skip_user_query(self, client, query_counter, auth_headers, regular_user):
+        """Test a cached identity authenticates without loading the user"""
+        from app.services.identity_cache import IdentityCache
+        
+        IdentityCache.invalidate()
+        response, _ = self._history(client, query_counter, auth_headers)
+        assert response.status_code == 200
+        
+        response, user_queries = self._history(client, query_counter, auth_headers)
+        assert response.status_code == 200
+        assert user_queries == []
+    
+    def test_deactivation_takes_effect_immediately(self, client, query_counter, auth_headers, regular_user, db_session):
+        """Test committing a deactivation drops the cached identity"""
+        self._history(client, query_counter, auth_headers)
+        
+        regular_user.is_active = False
+        db_session.commit()
+        
+        response, _ = self._history(client, query_counter, auth_headers)
+        assert response.status_code == 401
+    
+    def test_wallet_loaded_once_per_request(self, app, query_counter, regular_user):
+        """Test the authenticated user's wallet is memoized for the request"""
+        from app.services.identity_cache import IdentityCache, AuthenticatedUser
+        
+        IdentityCache.invalidate()
+        current_user = AuthenticatedUser(IdentityCache.get(regular_user.id))
+        
+        with query_counter as counter:
+            first = current_user.wallet
+            second = current_user.wallet
+        assert first is second and first.user_id == regular_user.id
+        assert counter.count <= 1
+        assert current_user.email == regular_user.email
@@ -194,4 +194,123 @@ class TestBeneficiaryRoutes:
         
         assert response.status_code == 400
         response_data = json.loads(response.data)
-        assert 'daily limit' in response_data['message'].lower()
\ No newline at end of file
+        assert 'daily limit' in response_data['message'].lower()
+
+class TestUserSearch:
+    """Test the indexed user search behind beneficiary and admin lookups"""
+    
+    def _user(self, db_session, index, username, first_name, last_name):
+        from app.models import User
+        
+        user = User(
+            email=f'search{index}@test.com',
+            username=username,
+            phone_number=f'+25471200000{index}',
+            first_name=first_name,
+            last_name=last_name,
+            is_active=True,
+            is_verified=True
+        )
+        user.set_password('password123')
+        db_session.add(user)
+        db_session.commit()
+        return user
+    
+    def test_matches_across_fields_and_ranks_prefixes_first(self, app, db_session):
+        """Test a full name matches first plus last name and prefix matches rank first"""
+        from app.models import User
+        from app.services.user_search import UserSearch
+        
+        inner = self._user(db_session, 1, 'the_markus', 'Ann', 'Lee')
+        prefix = self._user(db_session, 2, 'markham', 'Mark', 'Otieno')
+        
+        found = UserSearch.search(User.query, 'MARK').all()
+        assert [user.id for user in found[:2]] == [prefix.id, inner.id]
+        assert UserSearch.search(User.query, '  mark   otieno ').all() == [prefix]
+    
+    def test_wildcards_are_literal(self, client, auth_headers, second_user):
+        """Test LIKE wildcards in the query are matched literally"""
+        response = client.get('/api/beneficiaries/search?q=___', headers=auth_headers)
+        
+        assert response.status_code == 200
+        assert json.loads(response.data)['users'] == []
+    
+    def test_admin_user_search(self, client, admin_headers, db_session):
+        """Test the admin user list searches names and ranks by relevance"""
+        inner = self._user(db_session, 3, 'rosemary_w', 'Wanjiru', 'Kamau')
+        prefix = self._user(db_session, 4, 'mary_k', 'Mary', 'Njeri')
+        
+        response = client.get('/api/v1/admin/users?search=mary', headers=admin_headers)
+        
+        assert response.status_code == 200
+        assert [user['id'] for user in json.loads(response.data)['users']] == [prefix.id, inner.id]
+
+
+class TestBeneficiarySearch:
+    """Test beneficiary search runs batched queries and caches type-ahead results"""
+    
+    def _search(self, client, query_counter, auth_headers, q):
+        from app.services.identity_cache import IdentityCache
+        
+        # Each measured request authenticates from scratch
+        IdentityCache.invalidate()
+        with query_counter as counter:
+            response = client.get(f'/api/beneficiaries/search?q={q}', headers=auth_headers)
+        assert response.status_code == 200
+        return json.loads(response.data)['users'], counter.count
+    
+    def _users(self, db_session, start, stop):
+        from decimal import Decimal
+        from app.models import User, Wallet
+        
+        for index in range(start, stop):
+            user = User(
+                email=f'payee{index}@test.com',
+                username=f'payee{index}',
+                phone_number=f'+25471300{index:04d}',
+                first_name='Payee',
+                last_name=f'Number{index}',
+                is_active=True,
+                is_verified=True
+            )
+            user.set_password('password123')
+            db_session.add(user)
+            db_session.commit()
+            if not user.wallet:
+                db_session.add(Wallet(user_id=user.id, balance=Decimal('0')))
+                db_session.commit()
+    
+    def test_query_count_independent_of_results(self, client, query_counter, auth_headers, db_session):
+        """Test results are enriched with one wallet join and one beneficiary IN query"""
+        from app.services.beneficiary_search import BeneficiarySearch
+        
+        self._users(db_session, 0, 2)
+        BeneficiarySearch.invalidate()
+        few, few_queries = self._search(client, query_counter, auth_headers, 'payee')
+        
+        self._users(db_session, 2, 17)
+        BeneficiarySearch.invalidate()
+        many, many_queries = self._search(client, query_counter, auth_headers, 'payee')
+        
+        assert len(few) < len(many)
+        assert few_queries == many_queries
+    
+    def test_type_ahead_served_from_cache(self, client, query_counter, auth_headers, db_session, regular_user):
+        """Test longer terms are filtered from a complete cached prefix and adding a beneficiary refreshes it"""
+        from app.models import Beneficiary, User
+        from app.services.beneficiary_search import BeneficiarySearch
+        
+        self._users(db_session, 0, 3)
+        BeneficiarySearch.invalidate()
+        _, first_queries = self._search(client, query_counter, auth_headers, 'payee')
+        
+        narrowed, cached_queries = self._search(client, query_counter, auth_headers, 'payee1')
+        assert [user['username'] for user in narrowed] == ['payee1']
+        assert cached_queries < first_queries
+        assert not narrowed[0]['is_already_beneficiary']
+        
+        db_session.add(Beneficiary(user_id=regular_user.id, beneficiary_wallet_id=narrowed[0]['wallet_id']))
+        db_session.commit()
+        
+        refreshed, _ = self._search(client, query_counter, auth_headers, 'payee1')
+        assert refreshed[0]['is_already_beneficiary']
@@ -0,0 +1,291 @@
+import pytest
+from decimal import Decimal
+from datetime import datetime, timezone, timedelta
+
+class TestFXRateCache:
+    """Test the in-process exchange rate matrix"""
+    
+    def _rate(self, base, target, rate, age_minutes=0):
+        from app.models import ExchangeRate
+        return ExchangeRate(
+            base_currency=base,
+            target_currency=target,
+            rate=Decimal(rate),
+            fx_provider='exchangerate_api',
+            last_updated=datetime.now(timezone.utc) - timedelta(minutes=age_minutes)
+        )
+    
+    def test_matrix_contains_direct_inverse_and_cross_pairs(self, app):
+        """Test matrix is built from USD-anchored rows"""
+        from app.services.fx_rate_cache import RateMatrix
+        
+        matrix = RateMatrix.build([
+            self._rate('USD', 'KES', '150.00'),
+            self._rate('USD', 'EUR', '0.92')
+        ])
+        
+        assert matrix.get('USD', 'KES').rate == Decimal('150.00')
+        assert matrix.get('KES', 'USD').rate == Decimal('0.006667')
+        assert matrix.get('KES', 'EUR').rate == Decimal('0.006133')
+        assert matrix.get('KES', 'EUR').provider == 'triangulated'
+    
+    def test_cross_rate_uses_oldest_leg_timestamp(self, app):
+        """Test a cross rate is never fresher than its legs"""
+        from app.services.fx_rate_cache import RateMatrix
+        
+        kes = self._rate('USD', 'KES', '150.00', age_minutes=1)
+        eur = self._rate('USD', 'EUR', '0.92', age_minutes=20)
+        matrix = RateMatrix.build([kes, eur])
+        
+        assert matrix.get('KES', 'EUR').last_updated == eur.last_updated
+    
+    def test_get_exchange_rate_served_from_cache(self, app, db_session):
+        """Test repeated conversions do not query exchange_rates"""
+        from app.services.currency_service import CurrencyService
+        from app.services.fx_rate_cache import FXRateCache
+        from sqlalchemy import event
+        
+        db_session.add(self._rate('USD', 'KES', '150.00'))
+        db_session.add(self._rate('USD', 'GBP', '0.79'))
+        db_session.commit()
+        FXRateCache.invalidate()
+        
+        CurrencyService.get_exchange_rate('KES', 'GBP')
+        
+        statements = []
+        listener = lambda *args: statements.append(args[2])
+        event.listen(db_session.get_bind(), 'before_cursor_execute', listener)
+        try:
+            for _ in range(10):
+                CurrencyService.get_exchange_rate('KES', 'GBP')
+                CurrencyService.convert_amount(Decimal('100'), 'GBP', 'KES')
+        finally:
+            event.remove(db_session.get_bind(), 'before_cursor_execute', listener)
+        
+        assert statements == []
+
+
+class TestFXRateRefresh:
+    """Test bulk exchange rate refresh"""
+    
+    def test_update_all_rates_single_provider_call(self, app, db_session, monkeypatch):
+        """Test one provider call fills every supported pair"""
+        from app.models import ExchangeRate, AuditLog
+        from app.services.currency_service import CurrencyService
+        
+        calls = []
+        
+        def fake_fetch(base_currency):
+            calls.append(base_currency)
+            return {'KES': 150.0, 'EUR': 0.92, 'GBP': 0.79, 'NGN': 800.0, 'GHS': 12.5,
+                    'ZAR': 18.5, 'UGX': 3700.0, 'TZS': 2500.0, 'RWF': 1200.0, 'JPY': 145.0}
+        
+        monkeypatch.setitem(app.config, 'EXCHANGE_RATE_PROVIDER', 'exchangerate_api')
+        monkeypatch.setattr(CurrencyService, '_fetch_from_exchangerate_api', staticmethod(fake_fetch))
+        
+        initial_log_count = AuditLog.query.count()
+        
+        rates = CurrencyService.update_all_rates('USD')
+        
+        assert calls == ['USD']
+        assert len(rates) == 9
+        assert ExchangeRate.query.filter_by(base_currency='USD').count() == 9
+        assert AuditLog.query.count() == initial_log_count + 1
+        
+        # Second refresh updates rows in place
+        CurrencyService.update_all_rates('USD')
+        assert ExchangeRate.query.filter_by(base_currency='USD').count() == 9
+
+
+class TestFXRateRefresher:
+    """Test stale-while-revalidate FX refresh"""
+    
+    def test_stale_rate_served_while_refreshing(self, app, db_session, monkeypatch):
+        """Test a stale rate is returned and a refresh is scheduled"""
+        from app.models import ExchangeRate
+        from app.services.currency_service import CurrencyService
+        from app.services.fx_rate_cache import FXRateCache
+        from app.services.fx_refresher import FXRateRefresher
+        
+        db_session.add(ExchangeRate(
+            base_currency='USD',
+            target_currency='KES',
+            rate=Decimal('100.00'),
+            fx_provider='exchangerate_api',
+            last_updated=datetime.now(timezone.utc) - timedelta(hours=2)
+        ))
+        db_session.commit()
+        FXRateCache.invalidate()
+        
+        scheduled = []
+        monkeypatch.setattr(FXRateRefresher, 'request_refresh', classmethod(lambda cls, base: scheduled.append(base)))
+        
+        assert CurrencyService.get_exchange_rate('USD', 'KES') == Decimal('100.00')
+        assert scheduled == ['USD']
+    
+    def test_single_flight_per_base_currency(self, app):
+        """Test only one refresh per base currency can be in flight"""
+        from app.services.fx_refresher import FXRateRefresher
+        
+        FXRateRefresher._last_attempt.pop('EUR', None)
+        
+        event, owner = FXRateRefresher._claim('EUR', app)
+        second_event, second_owner = FXRateRefresher._claim('EUR', app)
+        
+        assert owner is True
+        assert second_owner is False
+        assert second_event is event
+        
+        FXRateRefresher._in_flight.pop('EUR', None)
+        event.set()
+    
+    def test_refresher_refreshes_on_start(self, app, monkeypatch):
+        """Test the refresh thread refreshes before its first wait"""
+        import threading
+        from app.services.fx_refresher import FXRateRefresher
+        
+        scheduled = []
+        done = threading.Event()
+        done.set()
+        monkeypatch.setattr(FXRateRefresher, '_base_currencies', staticmethod(lambda app: ['USD', 'EUR']))
+        monkeypatch.setattr(FXRateRefresher, 'request_refresh', classmethod(lambda cls, base: scheduled.append(base) or done))
+        
+        FXRateRefresher.stop()
+        try:
+            FXRateRefresher._run()
+        finally:
+            FXRateRefresher._stop.clear()
+        
+        assert scheduled == ['USD', 'EUR']
+    
+    def test_fx_metrics_admin(self, client, admin_headers):
+        """Test admin can read rate age metrics"""
+        response = client.get('/api/v1/admin/fx/metrics', headers=admin_headers)
+        
+        assert response.status_code == 200
+        assert 'rate_age_seconds' in response.get_json()
+
+
+class TestHistoricalRates:
+    """Test local as-of exchange rate lookups"""
+    
+    def test_historical_rate_as_of(self, app, db_session):
+        """Test the rate in force at a past time is returned"""
+        from app.models import ExchangeRateHistory
+        from app.services.currency_service import CurrencyService
+        
+        now = datetime.now(timezone.utc)
+        for rate, age in [('140.00', 48), ('150.00', 24), ('160.00', 1)]:
+            db_session.add(ExchangeRateHistory(
+                base_currency='USD',
+                target_currency='KES',
+                rate=Decimal(rate),
+                fx_provider='exchangerate_api',
+                recorded_at=now - timedelta(hours=age)
+            ))
+        db_session.commit()
+        
+        assert CurrencyService.get_historical_rate('USD', 'KES', now - timedelta(hours=30)) == Decimal('140.00')
+        assert CurrencyService.get_historical_rate('USD', 'KES', now - timedelta(hours=2)) == Decimal('150.00')
+        assert CurrencyService.get_historical_rate('KES', 'USD', now) == Decimal('0.00625')
+        assert CurrencyService.get_historical_rate('USD', 'KES', now - timedelta(hours=72)) is None
+        assert CurrencyService.get_historical_rate('USD', 'NGN', now) is None
+    
+    def test_refresh_appends_history(self, app, db_session, monkeypatch):
+        """Test every refresh is recorded"""
+        from app.models import ExchangeRateHistory
+        from app.services.currency_service import CurrencyService
+        
+        monkeypatch.setitem(app.config, 'EXCHANGE_RATE_PROVIDER', 'internal')
+        initial_count = ExchangeRateHistory.query.count()
+        
+        CurrencyService.update_all_rates('USD')
+        CurrencyService.update_all_rates('USD')
+        
+        assert ExchangeRateHistory.query.count() == initial_count + 18
+
+
+class TestBatchConversion:
+    """Test vectorized currency conversion"""
+    
+    def _seed_rates(self, db_session):
+        from app.models import ExchangeRate
+        from app.services.fx_rate_cache import FXRateCache
+        
+        for target, rate in [('KES', '150.123457'), ('EUR', '0.921234'), ('UGX', '3700.500000')]:
+            db_session.add(ExchangeRate(
+                base_currency='USD',
+                target_currency=target,
+                rate=Decimal(rate),
+                fx_provider='exchangerate_api',
+                last_updated=datetime.now(timezone.utc)
+            ))
+        db_session.commit()
+        FXRateCache.invalidate()
+    
+    def test_convert_batch_matches_convert_amount(self, app, db_session):
+        """Test batch results equal the per-item Decimal conversion"""
+        from app.services.currency_service import CurrencyService
+        
+        self._seed_rates(db_session)
+        
+        amounts = [Decimal('0.01'), Decimal('1000.50'), Decimal('99999999.99'), Decimal('12.34'), Decimal('5.00')]
+        from_currencies = ['USD', 'KES', 'UGX', 'EUR', 'KES']
+        to_currencies = ['UGX', 'EUR', 'KES', 'KES', 'KES']
+        
+        converted, rates = CurrencyService.convert_batch(amounts, from_currencies, to_currencies)
+        
+        assert len(rates) == 5
+        assert converted == [
+            CurrencyService.convert_amount(amount, from_currency, to_currency)
+            for amount, from_currency, to_currency in zip(amounts, from_currencies, to_currencies)
+        ]
+    
+    def test_convert_batch_endpoint(self, client, auth_headers, db_session):
+        """Test the batch endpoint converts every item"""
+        self._seed_rates(db_session)
+        
+        response = client.post('/api/v1/transfers/currencies/convert/batch', json={
+            'conversions': [
+                {'amount': 100, 'from_currency': 'USD', 'to_currency': 'KES'},
+                {'amount': '2.50', 'from_currency': 'eur', 'to_currency': 'usd'}
+            ]
+        }, headers=auth_headers)
+        
+        assert response.status_code == 200
+        data = response.get_json()
+        assert data['count'] == 2
+        assert data['conversions'][0]['to_amount'] == 15012.35
+        assert data['conversions'][1]['from_currency'] == 'EUR'
+    
+    def test_convert_batch_endpoint_rejects_invalid_amount(self, client, auth_headers):
+        """Test a bad item fails the whole batch with its index"""
+        response = client.post('/api/v1/transfers/currencies/convert/batch', json={
+            'conversions': [
+                {'amount': 10, 'from_currency': 'USD', 'to_currency': 'KES'},
+                {'amount': -1, 'from_currency': 'USD', 'to_currency': 'KES'}
+            ]
+        }, headers=auth_headers)
+        
+        assert response.status_code == 400
+        assert 'index 1' in response.get_json()['message']
+    
+    def test_convert_batch_endpoint_rejects_bad_currency(self, client, auth_headers):
+        """Test non-string and unsupported currencies are rejected with their index"""
+        for bad in [123, 'XYZ']:
+            response = client.post('/api/v1/transfers/currencies/convert/batch', json={
+                'conversions': [
+                    {'amount': 10, 'from_currency': 'USD', 'to_currency': 'KES'},
+                    {'amount': 10, 'from_currency': bad, 'to_currency': 'KES'}
+                ]
+            }, headers=auth_headers)
+            
+            assert response.status_code == 400
+            assert 'index 1' in response.get_json()['message']
+    
+    def test_convert_batch_rejects_unsupported_currency(self, app):
+        """Test an unknown currency raises instead of converting 1:1"""
+        from app.services.currency_service import CurrencyService
+        
+        with pytest.raises(ValueError):
+            CurrencyService.convert_batch([Decimal('10')], ['USD'], ['XYZ'])
@@ -143,6 +143,50 @@ class TestWalletModel:
         # Cannot unlock more than locked
         result = wallet.unlock_funds(Decimal('200.00'))
         assert result == False
+    
+    def test_wallet_usage_rolls_over_year_boundary(self, db_session, regular_user):
+        """Test rolling usage windows from the velocity counters"""
+        from datetime import timezone
+        from app.services.velocity_counters import VelocityCounters, LIMIT_WINDOWS
+        
+        wallet = regular_user.wallet
+        now = datetime(2026, 1, 1, 0, 30, tzinfo=timezone.utc)
+        
+        VelocityCounters.record(wallet.id, Decimal('100.00'), at=now - timedelta(minutes=10))
+        VelocityCounters.record(wallet.id, Decimal('200.00'), at=now - timedelta(hours=20))
+        VelocityCounters.record(wallet.id, Decimal('400.00'), at=now - timedelta(days=3))  # Last December
+        VelocityCounters.record(wallet.id, Decimal('800.00'), at=now - timedelta(days=45))
+        VelocityCounters.record(wallet.id, Decimal('50.00'), is_cross_border=True, at=now - timedelta(hours=2))
+        db_session.commit()
+        
+        usage = VelocityCounters.usage(wallet.id, LIMIT_WINDOWS, now=now)
+        assert usage['daily_usage'].amount == Decimal('300.00')
+        assert usage['daily_usage'].count == 2
+        assert usage['monthly_usage'].amount == Decimal('700.00')
+        assert usage['cross_border_daily_usage'].amount == Decimal('50.00')
+        assert usage['cross_border_monthly_usage'].amount == Decimal('50.00')
+    
+    def test_wallet_limit_check_is_read_only(self, db_session, regular_user):
+        """Test that limit checks read the counters without modifying the wallet"""
+        wallet = regular_user.wallet
+        wallet.balance = Decimal('1000.00')
+        wallet.available_balance = Decimal('1000.00')
+        wallet.daily_limit = Decimal('500.00')
+        db_session.commit()
+        
+        wallet.record_usage(Decimal('450.00'))
+        db_session.commit()
+        version = wallet.version
+        
+        result = wallet.can_withdraw(Decimal('100.00'))
+        assert result['allowed'] == False
+        assert 'daily limit' in result['reason']
+        assert not db_session.is_modified(wallet)
+        assert wallet.version == version
+        
+        assert wallet.can_withdraw(Decimal('50.00'))['allowed'] == True
+        assert wallet.to_dict(include_usage=True)['daily_usage'] == 450.0
+        assert 'daily_usage' not in wallet.to_dict()
 
 class TestTransactionModel:
     """Test Transaction model"""
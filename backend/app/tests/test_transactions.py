@@ -182,4 +182,558 @@ class TestTransactionRoutes:
         
         assert response.status_code == 400
         response_data = json.loads(response.data)
-        assert 'frozen' in response_data['message'].lower()
\ No newline at end of file
+        assert 'frozen' in response_data['message'].lower()
+
+class TestTransferQuotes:
+    """Test persisted transfer quotes"""
+    
+    def _save_quote(self, user, ttl=timedelta(minutes=15), quote_type='local'):
+        from app.services.quote_store import QuoteStore
+        
+        return QuoteStore.save(
+            quote_type=quote_type,
+            user_id=user.id,
+            ttl=ttl,
+            sender_wallet_id=user.wallet.id,
+            receiver_wallet_id=user.wallet.id,
+            amount=Decimal('1000.00'),
+            currency='KES',
+            converted_amount=Decimal('1000.00'),
+            sender_currency='KES',
+            receiver_amount=Decimal('1000.00'),
+            receiver_currency='KES',
+            fee=Decimal('20.00'),
+            total_amount=Decimal('1020.00'),
+            is_cross_border=False
+        )
+    
+    def test_quote_survives_cache_loss(self, regular_user, db_session):
+        """Test a quote issued by another worker is read back from the table"""
+        from app.services.quote_store import QuoteStore
+        
+        quote = self._save_quote(regular_user)
+        QuoteStore.clear()
+        
+        stored = QuoteStore.get(quote.quote_id, user_id=regular_user.id, quote_type='local')
+        
+        assert stored.total_amount == Decimal('1020.00')
+        assert stored.fee == Decimal('20.00')
+    
+    def test_quote_is_single_use(self, regular_user, db_session):
+        """Test a consumed quote cannot be initiated again"""
+        from app.services.quote_store import QuoteStore
+        
+        quote = self._save_quote(regular_user)
+        
+        assert QuoteStore.consume(quote.quote_id) is True
+        assert QuoteStore.consume(quote.quote_id) is False
+        assert QuoteStore.get(quote.quote_id) is None
+    
+    def test_quote_expired_or_foreign(self, regular_user, second_user, db_session):
+        """Test expired quotes and other users' quotes are rejected"""
+        from app.services.quote_store import QuoteStore
+        
+        expired = self._save_quote(regular_user, ttl=timedelta(seconds=-1))
+        active = self._save_quote(regular_user)
+        
+        assert QuoteStore.get(expired.quote_id) is None
+        assert QuoteStore.get(active.quote_id, user_id=second_user.id) is None
+        assert QuoteStore.get('not-a-uuid') is None
+    
+    def test_international_initiate_keeps_quote(self, regular_user, db_session):
+        """Test initiating an international transfer checks the quote without using it up"""
+        from app.services.quote_store import QuoteStore
+        from app.services.transfer_service import TransferService
+        
+        quote = self._save_quote(regular_user, quote_type='international')
+        
+        result = TransferService.initiate_international_transfer(regular_user.id, quote.quote_id, {})
+        assert result['message'] == 'International transfers coming soon'
+        assert QuoteStore.get(quote.quote_id, quote_type='international') is not None
+    
+    def test_transfer_credits_rounded_receiver_amount(self, regular_user, second_user, db_session):
+        """Test a transfer without a quote credits the converted amount rounded to cents"""
+        from app.models import ExchangeRate
+        from app.services.fx_rate_cache import FXRateCache
+        from app.services.transfer_service import TransferService
+        
+        second_user.wallet.primary_currency = 'USD'
+        db_session.add(ExchangeRate(
+            base_currency='KES',
+            target_currency='USD',
+            rate=Decimal('0.007712'),
+            fx_provider='exchangerate_api',
+            last_updated=datetime.utcnow()
+        ))
+        db_session.commit()
+        FXRateCache.invalidate()
+        
+        result = TransferService.initiate_local_transfer(regular_user.id, amount=1000, receiver_wallet_id=second_user.wallet.id)
+        
+        assert result['success'], result
+        assert result['receiver_amount'] == 7.71
+    
+    def test_initiate_with_unknown_quote(self, client, auth_headers):
+        """Test initiating with an unknown quote id fails cleanly"""
+        response = client.post('/api/v1/transfers/local/initiate',
+                              headers=auth_headers,
+                              json={'quote_id': '00000000-0000-0000-0000-000000000000'})
+        
+        assert response.status_code == 400
+        assert response.get_json()['message'] == 'Quote not found or expired'
+    
+    def test_quote_rechecks_limits_and_receiver(self, regular_user, second_user, db_session):
+        """Test usage since the quote was issued and a frozen receiver stop its execution"""
+        from app.models.enums import WalletStatus
+        from app.services.transfer_service import TransferService
+        
+        wallet = regular_user.wallet
+        wallet.daily_limit = Decimal('1500.00')
+        db_session.commit()
+        
+        first = TransferService.get_local_transfer_quote(wallet.id, 1000, receiver_wallet_id=second_user.wallet.id)
+        second = TransferService.get_local_transfer_quote(wallet.id, 1000, receiver_wallet_id=second_user.wallet.id)
+        assert first['success'] and second['success']
+        
+        assert TransferService.initiate_local_transfer(regular_user.id, quote_id=first['quote_id'])['success']
+        
+        result = TransferService.initiate_local_transfer(regular_user.id, quote_id=second['quote_id'])
+        assert result['success'] == False
+        assert 'daily limit' in result['message']
+        
+        wallet.daily_limit = Decimal('500000.00')
+        second_user.wallet.status = WalletStatus.frozen
+        db_session.commit()
+        
+        result = TransferService.initiate_local_transfer(regular_user.id, quote_id=second['quote_id'])
+        assert result['success'] == False
+        assert 'frozen' in result['message']
+
+
+class TestFeeEngine:
+    """Test the compiled fee schedule"""
+    
+    def test_config_schedule_matches_routes(self, app, db_session):
+        """Test config fee structures are compiled per corridor"""
+        from app.services.fee_engine import FeeEngine
+        
+        FeeEngine.invalidate()
+        
+        assert FeeEngine.calculate('local_transfer', Decimal('1000.00')) == Decimal('20.00')
+        assert FeeEngine.calculate('international', Decimal('10000.00'), 'KE', 'NG') == Decimal('900.00')
+        assert FeeEngine.calculate('international', Decimal('10000.00'), 'KE', 'ZA') == Decimal('1000.00')
+        assert FeeEngine.calculate('withdrawal', Decimal('1000.00')) == Decimal('27.50')
+        assert FeeEngine.calculate('deposit', Decimal('1000.00')) == Decimal('0.00')
+    
+    def test_fee_rows_override_config(self, app, db_session):
+        """Test an active Fee row wins over config and committing it invalidates the schedule"""
+        from app.models import Fee
+        from app.services.fee_engine import FeeEngine
+        
+        FeeEngine.calculate('local_transfer', Decimal('3000.00'), 'KE', 'KE')
+        
+        db_session.add(Fee(
+            fee_type='local_transfer',
+            name='Kenya tiered',
+            calculation_type='tiered',
+            tiers=[{'min': 0, 'max': 1000, 'rate': 0.5}, {'min': 1000, 'max': None, 'rate': 1}],
+            source_countries=['KE'],
+            destination_countries=[],
+            effective_from=datetime.utcnow() - timedelta(days=1)
+        ))
+        db_session.commit()
+        
+        assert FeeEngine._schedule is None
+        assert FeeEngine.calculate('local_transfer', Decimal('3000.00'), 'KE', 'KE') == Decimal('25.00')
+        assert FeeEngine.calculate('local_transfer', Decimal('3000.00'), 'UG', 'UG') == Decimal('40.00')
+    
+    def test_fee_rows_use_fee_vocabulary(self, app, db_session):
+        """Test Fee rows typed transfer_fee or withdrawal_fee price the matching transactions"""
+        from app.models import Fee
+        from app.services.fee_engine import FeeEngine
+        
+        assert FeeEngine.fee_type_for('withdrawal_fee') == 'withdrawal'
+        assert FeeEngine.fee_type_for('transfer_fee', is_cross_border=True) == 'international'
+        
+        for fee_type, rate in (('transfer_fee', Decimal('2.0')), ('withdrawal_fee', Decimal('30.00'))):
+            db_session.add(Fee(
+                fee_type=fee_type,
+                name=fee_type,
+                calculation_type='percentage' if fee_type == 'transfer_fee' else 'flat',
+                rate=rate,
+                source_countries=['KE'],
+                destination_countries=[],
+                effective_from=datetime.utcnow() - timedelta(days=1)
+            ))
+        db_session.commit()
+        
+        assert FeeEngine.calculate(FeeEngine.fee_type_for('transfer'), Decimal('1000.00'), 'KE', 'KE') == Decimal('20.00')
+        assert FeeEngine.calculate(FeeEngine.fee_type_for('withdrawal'), Decimal('1000.00'), 'KE') == Decimal('30.00')
+        assert FeeEngine.calculate('withdrawal', Decimal('1000.00'), 'UG') == Decimal('27.50')
+    
+    def test_lookups_do_not_query(self, app, db_session):
+        """Test fee lookups are served from the compiled schedule"""
+        from app.services.fee_engine import FeeEngine
+        from sqlalchemy import event
+        
+        FeeEngine.invalidate()
+        FeeEngine.calculate('local_transfer', Decimal('100.00'))
+        
+        statements = []
+        listener = lambda *args: statements.append(args[2])
+        event.listen(db_session.get_bind(), 'before_cursor_execute', listener)
+        try:
+            for _ in range(100):
+                FeeEngine.calculate('cross_region', Decimal('5000.00'))
+        finally:
+            event.remove(db_session.get_bind(), 'before_cursor_execute', listener)
+        
+        assert statements == []
+
+
+class TestFeeBacktest:
+    """Test the vectorized fee schedule backtester"""
+    
+    CANDIDATE = {
+        'FEE_STRUCTURE': {
+            'local_transfer': {
+                'tiers': [{'min': 0, 'max': 1000, 'rate': 0.5}, {'min': 1000, 'max': None, 'rate': 1.25}],
+                'fixed': 5,
+                'min_fee': 10,
+                'max_fee': 3000
+            }
+        },
+        'INTERNATIONAL_FEE_STRUCTURE': {
+            'KE_NG': {'percentage': 4.1234, 'fixed': 400}
+        }
+    }
+    
+    def test_array_fees_match_fee_engine(self, app):
+        """Test vectorized pricing equals FeeEngine.apply to the cent"""
+        import numpy as np
+        from app.services.fee_backtest import FeeBacktester
+        from app.services.fee_engine import FeeEngine
+        
+        backtester = FeeBacktester.from_schedule(self.CANDIDATE)
+        amounts = [1, 99, 1000, 100050, 123457, 2500000, 25000000]
+        
+        for fee_type, source, destination in (('local_transfer', 'KE', 'KE'), ('international', 'KE', 'NG')):
+            rule = backtester.schedule.find(fee_type, Decimal('0'), source, destination)
+            codes = np.full(len(amounts), backtester._rule_code(rule), dtype=np.int64)
+            fees = backtester.candidate_fees(codes, np.array(amounts, dtype=np.int64))
+            
+            expected = [int(FeeEngine.apply(rule, Decimal(amount) / 100) * 100) for amount in amounts]
+            assert fees.tolist() == expected
+    
+    def test_backtest_reports_by_corridor(self, app, db_session, regular_user, second_user):
+        """Test completed transactions are replayed and grouped"""
+        from app.models import Transaction
+        from app.models.enums import TransactionStatus, TransactionType, PaymentProvider
+        from app.services.fee_backtest import FeeBacktester
+        
+        for amount, fee, status in (('1000.00', '20.00', TransactionStatus.completed),
+                                    ('5000.00', '60.00', TransactionStatus.completed),
+                                    ('7000.00', '80.00', TransactionStatus.failed)):
+            db_session.add(Transaction(
+                sender_wallet_id=regular_user.wallet.id,
+                receiver_wallet_id=second_user.wallet.id,
+                amount=Decimal(amount),
+                fee=Decimal(fee),
+                source_country='KE',
+                destination_country='KE',
+                transaction_type=TransactionType.transfer,
+                status=status,
+                provider=PaymentProvider.internal
+            ))
+        db_session.commit()
+        
+        report = FeeBacktester.from_schedule({
+            'FEE_STRUCTURE': {'local_transfer': {'percentage': 2, 'fixed': 0}}
+        }, chunk_size=1).run()
+        
+        assert report['transactions'] == 2
+        assert report['by_corridor']['KE-KE']['current_fees'] == 80.0
+        assert report['by_corridor']['KE-KE']['candidate_fees'] == 120.0
+        assert report['by_amount_band']['1000-10000']['difference'] == 40.0
+    
+    def test_backtest_command(self, app, db_session, tmp_path):
+        """Test the backtest-fees command reads the schedule and writes the report"""
+        schedule, output = tmp_path / 'schedule.json', tmp_path / 'report.json'
+        schedule.write_text(json.dumps(self.CANDIDATE))
+        
+        result = app.test_cli_runner().invoke(args=['backtest-fees', str(schedule), '--output', str(output)])
+        
+        assert result.exit_code == 0, result.output
+        assert 'Replayed 0 completed transactions' in result.output
+        assert json.loads(output.read_text())['transactions'] == 0
+
+
+class TestKYCLimits:
+    """Test KYC-level usage limits"""
+    
+    def test_limit_counts_recorded_usage(self, regular_user, db_session):
+        """Test daily usage recorded with the ledger write counts against the KYC limit"""
+        from app.services.compliance_service import ComplianceService
+        
+        regular_user.kyc_level = 0
+        db_session.commit()
+        
+        assert ComplianceService.check_transaction_limit(regular_user, Decimal('4000.00'))['allowed'] == True
+        
+        regular_user.wallet.record_usage(Decimal('3000.00'))
+        db_session.commit()
+        
+        result = ComplianceService.check_transaction_limit(regular_user, Decimal('2500.00'))
+        assert result['allowed'] == False
+        assert 'daily limit' in result['reason']
+        assert ComplianceService.check_transaction_limit(regular_user, Decimal('2000.00'))['allowed'] == True
+    
+    def test_usage_rolls_over_by_calendar_period(self, regular_user, db_session):
+        """Test earlier days count towards the month only, and a new month starts from zero"""
+        from datetime import timezone
+        from app.services.usage_aggregates import UsageAggregates
+        
+        UsageAggregates.record(regular_user.id, Decimal('16000.00'), at=datetime(2026, 12, 1, 9, tzinfo=timezone.utc))
+        UsageAggregates.record(regular_user.id, Decimal('1000.00'), at=datetime(2026, 12, 31, 9, tzinfo=timezone.utc))
+        db_session.commit()
+        
+        usage = UsageAggregates.current(regular_user.id, now=datetime(2026, 12, 31, 18, tzinfo=timezone.utc))
+        assert usage['day'].amount == Decimal('1000.00')
+        assert usage['month'].amount == Decimal('17000.00')
+        assert usage['month'].count == 2
+        
+        usage = UsageAggregates.current(regular_user.id, now=datetime(2027, 1, 1, tzinfo=timezone.utc))
+        assert usage['day'].amount == Decimal('0.00')
+        assert usage['month'].amount == Decimal('0.00')
+    
+    def test_transfer_usage_matches_backfill(self, app, regular_user, second_user, db_session):
+        """Test a transfer records the same usage the aggregates migration backfills"""
+        import importlib.util
+        import os
+        from sqlalchemy import text
+        from app.services.transfer_service import TransferService
+        from app.services.usage_aggregates import UsageAggregates
+        
+        result = TransferService.initiate_local_transfer(regular_user.id, amount=1000, receiver_wallet_id=second_user.wallet.id)
+        assert result['success'], result
+        
+        path = os.path.join(os.path.dirname(app.root_path), 'migrations', 'versions', '3c8e5f1a9b62_add_user_usage_aggregates.py')
+        spec = importlib.util.spec_from_file_location('usage_aggregates_migration', path)
+        migration = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(migration)
+        
+        backfilled = db_session.execute(
+            text(f"SELECT SUM(amount) FROM ({migration.OUTGOING}) outgoing WHERE user_id = :user_id"),
+            {'user_id': regular_user.id}
+        ).scalar()
+        
+        assert Decimal(str(backfilled)) == Decimal(str(result['total']))
+        assert UsageAggregates.current(regular_user.id)['day'].amount == Decimal(str(result['total']))
+
+
+class TestRiskEngine:
+    """Test the in-process transfer risk rules"""
+    
+    RULES = [
+        {'name': 'burst', 'dimension': 'wallet', 'metric': 'count', 'window': 60, 'limit': 2, 'action': 'block'},
+        {'name': 'volume', 'dimension': 'wallet', 'metric': 'sum', 'window': 3600, 'limit': 1000, 'action': 'hold'},
+        {'name': 'fan_out', 'dimension': 'device', 'metric': 'distinct_counterparties', 'window': 3600, 'limit': 2, 'action': 'hold'},
+        {'name': 'large', 'dimension': 'transfer', 'metric': 'amount', 'limit': 5000, 'action': 'hold'}
+    ]
+    
+    @pytest.fixture(autouse=True)
+    def reset_engine(self, app):
+        """Start and leave every test with the engine's class-level state cleared"""
+        from app.services.risk_engine import RiskEngine
+        
+        RiskEngine.reset()
+        yield
+        RiskEngine.reset()
+    
+    def test_rules_fire_and_windows_expire(self, app):
+        """Test count, sum and distinct rules fire on the transfer that crosses them, then expire"""
+        from app.services.risk_engine import RiskEngine
+        
+        RiskEngine.configure(self.RULES)
+        signal = lambda counterparty, amount, at: RiskEngine.signal(1, counterparty, amount, device_id='d1', at=at)
+        
+        RiskEngine.observe(signal(2, 400, 1000))
+        RiskEngine.observe(signal(3, 400, 1010))
+        assert RiskEngine.evaluate(signal(2, 100, 1020)).rules == ['burst']
+        
+        decision = RiskEngine.evaluate(signal(4, 300, 1070))
+        assert decision.action == 'hold'
+        assert decision.rules == ['volume', 'fan_out']
+        
+        assert RiskEngine.evaluate(signal(4, 300, 4700)).action == 'allow'
+    
+    def test_most_severe_action_wins(self, app):
+        """Test a block outranks a hold when both fire"""
+        from app.services.risk_engine import RiskEngine
+        
+        RiskEngine.configure(self.RULES)
+        for at in (0, 1):
+            RiskEngine.observe(RiskEngine.signal(1, 2, 10, at=at))
+        
+        decision = RiskEngine.evaluate(RiskEngine.signal(1, 2, 6000, at=2))
+        assert decision.action == 'block'
+        assert set(decision.rules) == {'burst', 'volume', 'large'}
+    
+    def test_invalid_rule_rejected(self, app):
+        """Test rules with an unknown metric or action fail to compile"""
+        from app.services.risk_engine import RiskEngine
+        
+        with pytest.raises(ValueError):
+            RiskEngine.configure([{'name': 'x', 'dimension': 'wallet', 'metric': 'median', 'window': 60, 'limit': 1}])
+        with pytest.raises(ValueError):
+            RiskEngine.configure([{'name': 'x', 'dimension': 'wallet', 'metric': 'count', 'window': 60, 'limit': 1, 'action': 'alert'}])
+
+    
+    def test_held_transfer_is_approved_or_rejected(self, app, client, admin_headers, regular_user, second_user, db_session):
+        """Test reviewing a risk hold settles the transfer or releases its funds"""
+        from app.models import Transaction
+        from app.models.enums import TransactionStatus
+        from app.services.risk_engine import RiskEngine
+        from app.services.transfer_service import TransferService
+        
+        app.config['RISK_ENGINE_ENABLED'] = True
+        RiskEngine.configure([{'name': 'large', 'dimension': 'transfer', 'metric': 'amount', 'limit': 500, 'action': 'hold'}])
+        sender, receiver = regular_user.wallet, second_user.wallet
+        balance, receiver_balance = sender.balance, receiver.balance
+        
+        try:
+            approved = TransferService.initiate_local_transfer(regular_user.id, amount=1000, receiver_wallet_id=receiver.id)
+            rejected = TransferService.initiate_local_transfer(regular_user.id, amount=2000, receiver_wallet_id=receiver.id)
+        finally:
+            app.config['RISK_ENGINE_ENABLED'] = False
+        assert approved['status'] == rejected['status'] == 'held'
+        
+        response = client.post(f"/api/v1/admin/holds/{approved['hold_id']}/review",
+                               headers=admin_headers, json={'action': 'approve'})
+        assert response.status_code == 200
+        assert db_session.get(Transaction, approved['transaction_id']).status == TransactionStatus.completed
+        assert receiver.balance == receiver_balance + Decimal('1000')
+        
+        response = client.post(f"/api/v1/admin/holds/{rejected['hold_id']}/review",
+                               headers=admin_headers, json={'action': 'reject', 'reason': 'Suspected fraud'})
+        assert response.status_code == 200
+        assert db_session.get(Transaction, rejected['transaction_id']).status == TransactionStatus.failed
+        assert sender.balance == balance - Decimal(str(approved['total']))
+        assert sender.locked_balance == Decimal('0')
+        
+        response = client.post(f"/api/v1/admin/holds/{rejected['hold_id']}/review",
+                               headers=admin_headers, json={'action': 'approve'})
+        assert response.status_code == 400
+    
+    def test_hold_approval_rechecks_limits(self, app, regular_user, second_user, db_session):
+        """Test approving a hold checks usage since it was placed and records the transfer's usage"""
+        from app.services.risk_engine import RiskEngine
+        from app.services.transfer_service import TransferService
+        
+        app.config['RISK_ENGINE_ENABLED'] = True
+        RiskEngine.configure([{'name': 'large', 'dimension': 'transfer', 'metric': 'amount', 'limit': 500, 'action': 'hold'}])
+        wallet = regular_user.wallet
+        wallet.daily_limit = Decimal('1500.00')
+        db_session.commit()
+        
+        try:
+            held = TransferService.initiate_local_transfer(regular_user.id, amount=1000, receiver_wallet_id=second_user.wallet.id)
+        finally:
+            app.config['RISK_ENGINE_ENABLED'] = False
+        assert held['status'] == 'held'
+        
+        wallet.record_usage(Decimal('1000.00'))
+        db_session.commit()
+        
+        result = TransferService.review_risk_hold(held['hold_id'], None, approve=True)
+        assert result['success'] == False
+        assert 'daily limit' in result['message']
+        
+        wallet.daily_limit = Decimal('5000.00')
+        db_session.commit()
+        
+        assert TransferService.review_risk_hold(held['hold_id'], None, approve=True)['success']
+        assert wallet.get_usage()['daily_usage'] == Decimal('1000.00') + Decimal(str(held['total']))
+    
+    def test_blocked_transfer_is_audited(self, app, regular_user, second_user, db_session):
+        """Test a transfer the rules block leaves a transfer.blocked audit entry"""
+        from app.models import AuditLog
+        from app.services.risk_engine import RiskEngine
+        from app.services.transaction_service import TransactionService
+        
+        app.config['RISK_ENGINE_ENABLED'] = True
+        RiskEngine.configure([{'name': 'large', 'dimension': 'transfer', 'metric': 'amount', 'limit': 500, 'action': 'block'}])
+        
+        try:
+            result = TransactionService.create_transfer(regular_user.id, second_user.wallet.id, 1000)
+        finally:
+            app.config['RISK_ENGINE_ENABLED'] = False
+        
+        assert result['success'] == False
+        log = AuditLog.query.filter_by(action='transfer.blocked').one()
+        assert log.status == 'failed'
+
+
+class TestJSONSerialization:
+    """Test the orjson provider and column-projected transaction rows"""
+    
+    def test_provider_encodes_model_values(self, app):
+        """Test Decimal, datetime, UUID and Enum values encode like to_dict() converts them"""
+        import uuid
+        from app.models.enums import TransactionStatus
+        
+        key = uuid.uuid4()
+        at = datetime(2024, 3, 1, 12, 30, 15, 250000)
+        encoded = app.json.loads(app.json.dumps({
+            'amount': Decimal('100.50'),
+            'at': at,
+            'key': key,
+            'status': TransactionStatus.completed
+        }))
+        
+        assert encoded == {
+            'amount': 100.5,
+            'at': at.isoformat(),
+            'key': str(key),
+            'status': TransactionStatus.completed.value
+        }
+    
+    def test_projected_rows_match_to_dict(self, app, db_session, regular_user, second_user):
+        """Test projected rows encode to the same JSON as Transaction.to_dict()"""
+        from app.models import Transaction
+        from app.models.enums import TransactionStatus, TransactionType, PaymentProvider
+        from app.serializers import TransactionRowSerializer
+        
+        db_session.add_all([
+            Transaction(
+                sender_wallet_id=regular_user.wallet.id,
+                receiver_wallet_id=second_user.wallet.id,
+                amount=Decimal('250.00'),
+                fee=Decimal('2.50'),
+                fx_rate=Decimal('0.0077'),
+                source_currency='KES',
+                target_currency='USD',
+                transaction_type=TransactionType.transfer,
+                status=TransactionStatus.completed,
+                provider=PaymentProvider.internal,
+                completed_at=datetime.utcnow()
+            ),
+            Transaction(
+                sender_wallet_id=None,
+                receiver_wallet_id=regular_user.wallet.id,
+                amount=Decimal('1000.00'),
+                fee=Decimal('0.00'),
+                transaction_type=TransactionType.deposit,
+                status=TransactionStatus.pending,
+                provider=PaymentProvider.mpesa
+            )
+        ])
+        db_session.commit()
+        
+        query = Transaction.query.order_by(Transaction.id)
+        for include_wallets in (True, False):
+            serializer = TransactionRowSerializer(include_wallets=include_wallets)
+            projected = serializer.dump_many(serializer.apply(query).all())
+            expected = [transaction.to_dict(include_wallets=include_wallets) for transaction in query.all()]
+            
+            assert app.json.loads(app.json.dumps(projected)) == app.json.loads(app.json.dumps(expected))
@@ -256,4 +256,78 @@ class TestWalletRoutes:
                              headers=headers,
                              json=data)
         
-        assert response.status_code == 403
\ No newline at end of file
+        assert response.status_code == 403
+
+
+class TestWalletSummary:
+    """Test wallet summaries and their cache"""
+    
+    def test_summary_totals(self, db_session, regular_user, second_user):
+        """Test one aggregate query splits totals by status and type"""
+        from app.models import Transaction
+        from app.models.enums import TransactionStatus, TransactionType, PaymentProvider
+        from app.services.wallet_summary import WalletSummaryCache
+        
+        wallet_id = regular_user.wallet.id
+        for amount, transaction_type, status, sender, receiver in (
+            ('500.00', TransactionType.deposit, TransactionStatus.completed, None, wallet_id),
+            ('200.00', TransactionType.withdrawal, TransactionStatus.completed, wallet_id, None),
+            ('100.00', TransactionType.transfer, TransactionStatus.completed, wallet_id, second_user.wallet.id),
+            ('300.00', TransactionType.transfer, TransactionStatus.pending, wallet_id, second_user.wallet.id),
+            ('900.00', TransactionType.transfer, TransactionStatus.failed, wallet_id, second_user.wallet.id)
+        ):
+            db_session.add(Transaction(
+                sender_wallet_id=sender,
+                receiver_wallet_id=receiver,
+                amount=Decimal(amount),
+                fee=Decimal('0.00'),
+                transaction_type=transaction_type,
+                status=status,
+                provider=PaymentProvider.internal
+            ))
+        db_session.commit()
+        
+        summary = WalletSummaryCache.summarize(wallet_id, days=30)
+        assert summary['completed'] == 3
+        assert summary['pending'] == 1
+        assert summary['failed'] == 1
+        assert summary['total_amount'] == Decimal('800.00')
+        assert summary['total_deposits'] == Decimal('500.00')
+        assert summary['total_withdrawals'] == Decimal('200.00')
+        assert summary['total_transfers'] == Decimal('100.00')
+    
+    def test_cache_invalidated_on_commit(self, db_session, regular_user, second_user):
+        """Test a commit touching the wallet drops its cached summary"""
+        from app.models import Transaction
+        from app.models.enums import TransactionStatus, TransactionType, PaymentProvider
+        from app.services.wallet_summary import WalletSummaryCache
+        
+        wallet_id = regular_user.wallet.id
+        WalletSummaryCache.invalidate()
+        assert WalletSummaryCache.get(wallet_id)['completed'] == 0
+        assert (wallet_id, 30) in WalletSummaryCache._entries
+        
+        db_session.add(Transaction(
+            sender_wallet_id=wallet_id,
+            receiver_wallet_id=second_user.wallet.id,
+            amount=Decimal('250.00'),
+            fee=Decimal('0.00'),
+            transaction_type=TransactionType.transfer,
+            status=TransactionStatus.completed,
+            provider=PaymentProvider.internal
+        ))
+        db_session.commit()
+        
+        assert (wallet_id, 30) not in WalletSummaryCache._entries
+        assert WalletSummaryCache.get(wallet_id)['total_transfers'] == Decimal('250.00')
+    
+    def test_cache_hit_runs_no_query(self, db_session, query_counter, regular_user):
+        """Test a cached summary is served without touching the database"""
+        from app.services.wallet_summary import WalletSummaryCache
+        
+        wallet_id = regular_user.wallet.id
+        summary = WalletSummaryCache.get(wallet_id)
+        
+        with query_counter as counter:
+            assert WalletSummaryCache.get(wallet_id) == summary
+        assert counter.count == 0
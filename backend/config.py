@@ -129,9 +129,16 @@ class Config:
             'fixed': Decimal('500.00'),
             'max_fee': Decimal('10000.00'),
             'min_fee': Decimal('1000.00')
+        },
+        'withdrawal': {
+            'percentage': Decimal('0.0'),
+            'fixed': Decimal('27.50')
         }
     }
     
+    # Seconds between checks of the fees table version by the compiled fee engine
+    FEE_ENGINE_CHECK_INTERVAL = 30
+    
     INTERNATIONAL_FEE_STRUCTURE = {
         'KE_NG': {
             'percentage': Decimal('4.5'),
@@ -224,10 +231,65 @@ class Config:
     FX_MIN_FEE = Decimal('10.00')
     FX_MAX_FEE = Decimal('500.00')
     
-    HISTORICAL_RATE_API = os.environ.get('HISTORICAL_RATE_API', '')
-    
     EXCHANGE_RATE_UPDATE_INTERVAL = 900
     
+    # Background refresh keeps rates fresh ahead of EXCHANGE_RATE_UPDATE_INTERVAL.
+    # gunicorn_config.py starts it in web workers unless FX_REFRESH_IN_WORKERS is
+    # false; FX_REFRESH_ON_CREATE_APP starts it in every process that creates the
+    # app instead (flask run, flask commands)
+    FX_REFRESH_IN_WORKERS = os.environ.get('FX_REFRESH_IN_WORKERS', 'true').lower() != 'false'
+    FX_REFRESH_ON_CREATE_APP = os.environ.get('FX_REFRESH_ON_CREATE_APP', 'false').lower() == 'true'
+    FX_REFRESH_ASYNC = True
+    FX_REFRESH_INTERVAL = 720
+    FX_REFRESH_BASES = ['USD']
+    FX_REFRESH_WAIT_SECONDS = 10
+    FX_REFRESH_RETRY_SECONDS = 60
+    
+    FX_SUPPORTED_CURRENCIES = ['KES', 'USD', 'EUR', 'GBP', 'NGN', 'GHS', 'ZAR', 'UGX', 'TZS', 'RWF']
+    FX_BATCH_MAX_ITEMS = 10000
+    
+    # Admin dashboard statistics are served from a snapshot rebuilt every
+    # ANALYTICS_SNAPSHOT_INTERVAL seconds; a snapshot older than ANALYTICS_SNAPSHOT_MAX_AGE
+    # is still served while a rebuild runs. Like the FX refresh, the rebuild
+    # thread is started in gunicorn workers (ANALYTICS_REFRESH_IN_WORKERS) or, if
+    # ANALYTICS_REFRESH_ON_CREATE_APP is set, in every process that creates the app
+    ANALYTICS_REFRESH_IN_WORKERS = os.environ.get('ANALYTICS_REFRESH_IN_WORKERS', 'true').lower() != 'false'
+    ANALYTICS_REFRESH_ON_CREATE_APP = os.environ.get('ANALYTICS_REFRESH_ON_CREATE_APP', 'false').lower() == 'true'
+    ANALYTICS_REFRESH_ASYNC = True
+    ANALYTICS_SNAPSHOT_INTERVAL = 60
+    ANALYTICS_SNAPSHOT_MAX_AGE = 120
+    
+    # Per-wallet dashboard summaries are cached for WALLET_SUMMARY_TTL seconds; commits
+    # in the same process drop them at once, other processes' show up on expiry
+    WALLET_SUMMARY_TTL = 60
+    WALLET_SUMMARY_CACHE_SIZE = 10000
+    
+    # token_required reads users' active/admin/KYC flags and wallet id from a
+    # per-process cache; other processes see deactivations within this many seconds
+    AUTH_IDENTITY_TTL = 10
+    AUTH_IDENTITY_CACHE_SIZE = 50000
+    
+    # List endpoints' count=estimate mode: planner estimates below this are
+    # replaced by an exact count; elsewhere than PostgreSQL, exact counts are
+    # cached for PAGINATION_COUNT_CACHE_TTL seconds
+    PAGINATION_EXACT_COUNT_BELOW = 1000
+    PAGINATION_COUNT_CACHE_TTL = 60
+    PAGINATION_COUNT_CACHE_SIZE = 1000
+    
+    # Beneficiary type-ahead results are cached per (user, term) this many seconds
+    BENEFICIARY_SEARCH_TTL = 30
+    BENEFICIARY_SEARCH_CACHE_SIZE = 5000
+    
+    # Columnar exports of transactions and ledger entries (flask export-columnar,
+    # /admin/exports/<table>) are read and written EXPORT_BATCH_SIZE rows at a time
+    EXPORT_DIR = os.environ.get('EXPORT_DIR', 'exports')
+    EXPORT_BATCH_SIZE = 50000
+    EXPORT_MAX_OPEN_PARTITIONS = 8
+    # Rows created less than this long ago are left for the next export, so a
+    # lower id still being committed is not skipped; keep it at least twice the
+    # longest write transaction
+    EXPORT_COMMIT_LAG = timedelta(minutes=5)
+    
     QUOTE_EXPIRY = timedelta(minutes=15)
     INTERNATIONAL_QUOTE_EXPIRY = timedelta(minutes=30)
     
@@ -285,13 +347,56 @@ class Config:
         'reporting_threshold': Decimal('1000000.00'),
         'suspicious_amount': Decimal('500000.00')
     }
+    
+    # Outgoing daily/monthly (UTC calendar) limits per KYC level, in KYC_LIMIT_CURRENCY
+    KYC_LIMIT_CURRENCY = 'KES'
+    KYC_TRANSACTION_LIMITS = {
+        0: {'daily': Decimal('5000.00'), 'monthly': Decimal('20000.00')},  # Basic
+        1: {'daily': Decimal('50000.00'), 'monthly': Decimal('500000.00')},  # Verified
+        2: {'daily': Decimal('500000.00'), 'monthly': Decimal('5000000.00')},  # Enhanced
+    }
+    
+    # In-process risk rules, evaluated on every transfer. window is in seconds and the
+    # metric includes the transfer being evaluated; 'sum' and 'amount' limits are in the
+    # sender wallet's currency
+    RISK_ENGINE_ENABLED = True
+    RISK_RULES = [
+        {'name': 'wallet_burst', 'dimension': 'wallet', 'metric': 'count', 'window': 60, 'limit': 5, 'action': 'block'},
+        {'name': 'wallet_hourly_volume', 'dimension': 'wallet', 'metric': 'sum', 'window': 3600, 'limit': Decimal('500000.00'), 'action': 'hold'},
+        {'name': 'wallet_fan_out', 'dimension': 'wallet', 'metric': 'distinct_counterparties', 'window': 3600, 'limit': 10, 'action': 'hold'},
+        {'name': 'device_fan_out', 'dimension': 'device', 'metric': 'distinct_counterparties', 'window': 3600, 'limit': 15, 'action': 'hold'},
+        {'name': 'ip_burst', 'dimension': 'ip', 'metric': 'count', 'window': 600, 'limit': 30, 'action': 'block'},
+        {'name': 'large_transfer', 'dimension': 'transfer', 'metric': 'amount', 'limit': Decimal('200000.00'), 'action': 'hold'},
+    ]
+    RISK_ENGINE_BUDGET_MS = 1.0
+    RISK_ENGINE_OVER_BUDGET_ACTION = 'hold'
+    RISK_ENGINE_MAX_KEYS = 100000
+    
+    # Suspicious activity detection, run as transactions and failed logins commit;
+    # the admin view lists what was seen within the last window_hours
+    SUSPICIOUS_ACTIVITY_DETECTION = True
+    SUSPICIOUS_ACTIVITY = {
+        'window_hours': 24,
+        'large_transaction_amount': Decimal('100000.00'),
+        'high_frequency_count': 10  # Transactions per sender wallet within the window
+    }
 
 class DevelopmentConfig(Config):
     DEBUG = True
     
 class TestingConfig(Config):
     TESTING = True
-    SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
+    # In-memory SQLite unless TEST_DATABASE_URL points the suite at PostgreSQL
+    SQLALCHEMY_DATABASE_URI = os.environ.get('TEST_DATABASE_URL', 'sqlite:///:memory:')
+    FX_REFRESH_IN_WORKERS = False
+    FX_REFRESH_ON_CREATE_APP = False
+    FX_REFRESH_ASYNC = False
+    ANALYTICS_REFRESH_IN_WORKERS = False
+    ANALYTICS_REFRESH_ON_CREATE_APP = False
+    ANALYTICS_REFRESH_ASYNC = False
+    ANALYTICS_SNAPSHOT_MAX_AGE = 0
+    RISK_ENGINE_ENABLED = False
+    EXPORT_COMMIT_LAG = timedelta(0)
     
 class ProductionConfig(Config):
     DEBUG = False
@@ -23,3 +23,16 @@ max_requests_jitter = 50
 accesslog = "-"
 errorlog = "-"
 loglevel = "info"
+
+
+def post_worker_init(worker):
+    # FX rates and the analytics snapshot are refreshed in background threads
+    # in web workers only, not in every process that creates the app
+    from app.services.analytics_snapshot import AnalyticsSnapshot
+    from app.services.fx_refresher import FXRateRefresher
+
+    config = worker.wsgi.config
+    if config.get('FX_REFRESH_IN_WORKERS', True):
+        FXRateRefresher.start()
+    if config.get('ANALYTICS_REFRESH_IN_WORKERS', True):
+        AnalyticsSnapshot.start()
@@ -0,0 +1,39 @@
+"""add trigram user search index
+
+Revision ID: e3b9a7c1f482
+Revises: b6d2f8a4c3e1
+Create Date: 2026-10-19 21:12:08.540317
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e3b9a7c1f482'
+down_revision = 'b6d2f8a4c3e1'
+branch_labels = None
+depends_on = None
+
+# Must match User.search_document() for the planner to use the index
+SEARCH_DOCUMENT = "lower(email || ' ' || username || ' ' || phone_number || ' ' || first_name || ' ' || last_name)"
+
+
+def upgrade():
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+
+    # Built concurrently so signups and profile updates are not blocked meanwhile
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'idx_users_search',
+            'users',
+            [sa.text(f'{SEARCH_DOCUMENT} gin_trgm_ops')],
+            unique=False,
+            postgresql_using='gin',
+            postgresql_concurrently=True
+        )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index('idx_users_search', table_name='users', postgresql_concurrently=True)